@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""Offline per-plugin conversion benchmark.
+
+Generates a synthetic corpus (docx/pptx/xlsx/html/svg/wav/gif at several sizes),
+runs every registered plugin directly through ``ConversionPlugin.convert`` and
+reports throughput plus p50/p95 latency as JSON. No API, broker or credentials
+are required; plugins whose external tool (soffice/ffmpeg/inkscape) is missing
+are reported with ``status=error`` instead of aborting the run.
+
+Usage:
+    PYTHONPATH=src python scripts/bench_plugins.py --iterations 5 --output bench.json
+    PYTHONPATH=src python scripts/bench_plugins.py --baseline bench_baseline.json --threshold 0.2
+    PYTHONPATH=src python scripts/bench_plugins.py --write-baseline bench_baseline.json
+
+Exit code is 1 when any plugin regresses beyond ``--threshold`` against the baseline.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import math
+import shutil
+import struct
+import sys
+import time
+import wave
+import zipfile
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any, Callable, Dict, Iterable, List
+
+from rag_converter.plugins.base import ConversionInput
+from rag_converter.plugins.registry import DEFAULT_PLUGIN_MODULES, REGISTRY, load_plugins
+
+# Relative scale per size bucket; every generator multiplies its base unit by this factor.
+SIZES: Dict[str, int] = {"small": 1, "medium": 10, "large": 50}
+FORMATS = ("docx", "pptx", "xlsx", "html", "svg", "wav", "gif")
+
+_LOREM = (
+    "Knowledge transformer benchmark paragraph with mixed content 知识库转换基准测试段落，"
+    "used to exercise layout, fonts and text extraction paths. "
+)
+
+
+# ---------------------------------------------------------------------------
+# Synthetic corpus generators
+# ---------------------------------------------------------------------------
+
+
+def _write_zip(path: Path, members: Dict[str, str]) -> None:
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+
+
+def _make_docx(path: Path, scale: int) -> None:
+    body: List[str] = []
+    for idx in range(20 * scale):
+        if idx % 10 == 0:
+            body.append(
+                '<w:p><w:pPr><w:pStyle w:val="Heading1"/></w:pPr>'
+                f"<w:r><w:t>Section {idx // 10 + 1}</w:t></w:r></w:p>"
+            )
+        body.append(f"<w:p><w:r><w:t xml:space=\"preserve\">{_LOREM * 3}</w:t></w:r></w:p>")
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{''.join(body)}</w:body></w:document>"
+    )
+    _write_zip(
+        path,
+        {
+            "[Content_Types].xml": (
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                '<Default Extension="xml" ContentType="application/xml"/>'
+                '<Override PartName="/word/document.xml" '
+                'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+                "</Types>"
+            ),
+            "_rels/.rels": (
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                '<Relationship Id="rId1" '
+                'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+                'Target="word/document.xml"/></Relationships>'
+            ),
+            "word/document.xml": document,
+        },
+    )
+
+
+def _make_pptx(path: Path, scale: int) -> None:
+    slide_count = 2 * scale
+    ns = (
+        'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" '
+        'xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"'
+    )
+    members: Dict[str, str] = {}
+    overrides = [
+        '<Override PartName="/ppt/presentation.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.presentationml.presentation.main+xml"/>'
+    ]
+    slide_ids: List[str] = []
+    rels: List[str] = []
+    for idx in range(1, slide_count + 1):
+        members[f"ppt/slides/slide{idx}.xml"] = (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            f"<p:sld {ns}><p:cSld><p:spTree>"
+            '<p:sp><p:nvSpPr><p:cNvPr id="2" name="Title"/><p:cNvSpPr/><p:nvPr><p:ph type="title"/></p:nvPr></p:nvSpPr>'
+            f"<p:txBody><a:p><a:r><a:t>Slide {idx}</a:t></a:r></a:p></p:txBody></p:sp>"
+            '<p:sp><p:nvSpPr><p:cNvPr id="3" name="Body"/><p:cNvSpPr/><p:nvPr/></p:nvSpPr>'
+            f"<p:txBody><a:p><a:r><a:t>{_LOREM * 2}</a:t></a:r></a:p></p:txBody></p:sp>"
+            "</p:spTree></p:cSld></p:sld>"
+        )
+        overrides.append(
+            f'<Override PartName="/ppt/slides/slide{idx}.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.presentationml.slide+xml"/>'
+        )
+        slide_ids.append(f'<p:sldId id="{255 + idx}" r:id="rId{idx}"/>')
+        rels.append(
+            f'<Relationship Id="rId{idx}" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/slide" '
+            f'Target="slides/slide{idx}.xml"/>'
+        )
+
+    members["[Content_Types].xml"] = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        f"{''.join(overrides)}</Types>"
+    )
+    members["_rels/.rels"] = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="ppt/presentation.xml"/></Relationships>'
+    )
+    members["ppt/presentation.xml"] = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f"<p:presentation {ns}><p:sldIdLst>{''.join(slide_ids)}</p:sldIdLst>"
+        '<p:sldSz cx="9144000" cy="6858000"/></p:presentation>'
+    )
+    members["ppt/_rels/presentation.xml.rels"] = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        f"{''.join(rels)}</Relationships>"
+    )
+    _write_zip(path, members)
+
+
+def _make_xlsx(path: Path, scale: int) -> None:
+    from openpyxl import Workbook  # converter extra; imported lazily
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("bench")
+    sheet.append(["id", "name", "amount", "comment"])
+    for idx in range(200 * scale):
+        sheet.append([idx, f"row-{idx}", idx * 1.5, _LOREM[:60]])
+    workbook.save(str(path))
+
+
+def _make_html(path: Path, scale: int) -> None:
+    parts = ["<html><body>"]
+    for idx in range(10 * scale):
+        parts.append(f"<h2>Chapter {idx + 1}</h2>")
+        parts.append(f"<p>{_LOREM * 4}</p>")
+        parts.append("<ul>" + "".join(f"<li>item {i}</li>" for i in range(5)) + "</ul>")
+        parts.append(
+            "<table><tr><th>k</th><th>v</th></tr>"
+            + "".join(f"<tr><td>{i}</td><td>{i * i}</td></tr>" for i in range(5))
+            + "</table>"
+        )
+    parts.append("</body></html>")
+    path.write_text("".join(parts), encoding="utf-8")
+
+
+def _make_svg(path: Path, scale: int) -> None:
+    shapes = "".join(
+        f"<circle cx='{(i * 37) % 640}' cy='{(i * 53) % 640}' r='{5 + i % 20}' fill='#{(i * 2654435761) % 0xFFFFFF:06x}'/>"
+        for i in range(100 * scale)
+    )
+    path.write_text(
+        f"<svg xmlns='http://www.w3.org/2000/svg' width='640' height='640'>{shapes}</svg>",
+        encoding="utf-8",
+    )
+
+
+def _make_wav(path: Path, scale: int) -> None:
+    rate = 16000
+    seconds = 2 * scale
+    frames = bytearray()
+    for i in range(rate * seconds):
+        frames += struct.pack("<h", int(8000 * math.sin(2 * math.pi * 440 * i / rate)))
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(bytes(frames))
+
+
+def _lzw_uncompressed(pixels: bytes) -> bytes:
+    """Encode 8-bit pixels as GIF LZW data without compression (clear code every 254 literals)."""
+
+    clear, end, width = 256, 257, 9
+    out = bytearray()
+    acc = 0
+    nbits = 0
+
+    def emit(code: int) -> None:
+        nonlocal acc, nbits
+        acc |= code << nbits
+        nbits += width
+        while nbits >= 8:
+            out.append(acc & 0xFF)
+            acc >>= 8
+            nbits -= 8
+
+    for start in range(0, len(pixels), 254):
+        emit(clear)
+        for value in pixels[start : start + 254]:
+            emit(value)
+    emit(end)
+    if nbits:
+        out.append(acc & 0xFF)
+
+    blocks = io.BytesIO()
+    for start in range(0, len(out), 255):
+        chunk = out[start : start + 255]
+        blocks.write(bytes([len(chunk)]) + chunk)
+    blocks.write(b"\x00")
+    return bytes(blocks.getvalue())
+
+
+def _make_gif(path: Path, scale: int) -> None:
+    width = height = 64
+    frame_count = 5 * scale
+    palette = b"".join(bytes(((i * 7) % 256, (i * 13) % 256, (i * 29) % 256)) for i in range(256))
+    data = bytearray(b"GIF89a")
+    data += struct.pack("<HHBBB", width, height, 0xF7, 0, 0)
+    data += palette
+    data += b"!\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00"
+    for frame in range(frame_count):
+        data += b"!\xf9\x04\x04" + struct.pack("<H", 10) + b"\x00\x00"
+        data += b"," + struct.pack("<HHHHB", 0, 0, width, height, 0)
+        pixels = bytes(((x + y + frame * 8) % 256) for y in range(height) for x in range(width))
+        data += b"\x08" + _lzw_uncompressed(pixels)
+    data += b";"
+    path.write_bytes(bytes(data))
+
+
+GENERATORS: Dict[str, Callable[[Path, int], None]] = {
+    "docx": _make_docx,
+    "pptx": _make_pptx,
+    "xlsx": _make_xlsx,
+    "html": _make_html,
+    "svg": _make_svg,
+    "wav": _make_wav,
+    "gif": _make_gif,
+}
+
+
+def build_corpus(root: Path, formats: Iterable[str], sizes: Iterable[str]) -> Dict[str, Dict[str, Path]]:
+    """Generate ``{fmt: {size: path}}`` under ``root``."""
+
+    corpus: Dict[str, Dict[str, Path]] = {}
+    root.mkdir(parents=True, exist_ok=True)
+    for fmt in formats:
+        for size in sizes:
+            path = root / f"{fmt}_{size}.{fmt}"
+            GENERATORS[fmt](path, SIZES[size])
+            corpus.setdefault(fmt, {})[size] = path
+    return corpus
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+
+def _percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile; returns 0 for empty input."""
+
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def _bench_case(plugin, source: Path, iterations: int, workdir: Path) -> Dict[str, Any]:
+    latencies: List[float] = []
+    input_bytes = source.stat().st_size
+    for run in range(iterations):
+        run_dir = workdir / f"{plugin.slug}_{source.stem}_{run}"
+        run_dir.mkdir(parents=True, exist_ok=True)
+        # Plugins write next to their input, so every run gets a private copy.
+        run_input = run_dir / source.name
+        shutil.copyfile(source, run_input)
+        payload = ConversionInput(
+            source_format=plugin.source_format,
+            target_format=plugin.target_format,
+            input_path=run_input,
+            metadata={"requested_by": "bench"},
+        )
+        start = time.perf_counter()
+        try:
+            plugin.convert(payload)
+        except Exception as exc:  # noqa: BLE001 - report every failure mode
+            return {
+                "status": "error",
+                "error": f"{exc.__class__.__name__}: {exc}",
+                "input_bytes": input_bytes,
+            }
+        finally:
+            shutil.rmtree(run_dir, ignore_errors=True)
+        latencies.append(time.perf_counter() - start)
+
+    total = sum(latencies)
+    return {
+        "status": "ok",
+        "runs": len(latencies),
+        "input_bytes": input_bytes,
+        "p50_ms": round(_percentile(latencies, 0.5) * 1000, 3),
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 3),
+        "mean_ms": round(total / len(latencies) * 1000, 3),
+        "files_per_sec": round(len(latencies) / total, 3) if total else None,
+        "mb_per_sec": round(input_bytes * len(latencies) / total / (1024 * 1024), 3) if total else None,
+    }
+
+
+def run_benchmark(
+    corpus: Dict[str, Dict[str, Path]],
+    *,
+    iterations: int,
+    workdir: Path,
+    plugin_filter: set[str] | None = None,
+) -> Dict[str, Any]:
+    report: Dict[str, Any] = {}
+    for plugin in sorted(REGISTRY.list(), key=lambda item: item.slug):
+        if plugin_filter and plugin.slug not in plugin_filter:
+            continue
+        inputs = corpus.get(plugin.source_format.lower())
+        if not inputs:
+            continue
+        report[plugin.slug] = {
+            size: _bench_case(plugin, path, iterations, workdir) for size, path in inputs.items()
+        }
+    return report
+
+
+def compare_with_baseline(
+    report: Dict[str, Any], baseline: Dict[str, Any], threshold: float
+) -> List[Dict[str, Any]]:
+    """Return regressions where p95 grew or throughput dropped by more than ``threshold``."""
+
+    regressions: List[Dict[str, Any]] = []
+    for slug, sizes in report.items():
+        for size, current in sizes.items():
+            previous = (baseline.get(slug) or {}).get(size)
+            if not previous or previous.get("status") != "ok" or current.get("status") != "ok":
+                continue
+            if previous["p95_ms"] and current["p95_ms"] > previous["p95_ms"] * (1 + threshold):
+                regressions.append(
+                    {"plugin": slug, "size": size, "metric": "p95_ms",
+                     "baseline": previous["p95_ms"], "current": current["p95_ms"]}
+                )
+            if previous.get("mb_per_sec") and (current.get("mb_per_sec") or 0) < previous["mb_per_sec"] * (1 - threshold):
+                regressions.append(
+                    {"plugin": slug, "size": size, "metric": "mb_per_sec",
+                     "baseline": previous["mb_per_sec"], "current": current.get("mb_per_sec")}
+                )
+    return regressions
+
+
+def _load_available_plugins(modules: Iterable[str]) -> List[str]:
+    """Import plugin modules one by one so a missing optional dependency only skips that module."""
+
+    skipped: List[str] = []
+    for module in modules:
+        try:
+            load_plugins([module])
+        except ImportError as exc:
+            skipped.append(f"{module}: {exc}")
+    return skipped
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--formats", nargs="+", default=list(FORMATS), choices=FORMATS)
+    parser.add_argument("--sizes", nargs="+", default=list(SIZES), choices=list(SIZES))
+    parser.add_argument("--iterations", type=int, default=3, help="Runs per plugin and size (default 3)")
+    parser.add_argument("--plugins", nargs="*", help="Restrict to these plugin slugs")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    parser.add_argument("--baseline", help="Baseline JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative regression (default 0.2)")
+    parser.add_argument("--write-baseline", help="Store this run's results as the new baseline")
+    parser.add_argument("--keep-corpus", help="Generate the corpus into this directory and keep it")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = parse_args(argv)
+    skipped_modules = _load_available_plugins(DEFAULT_PLUGIN_MODULES)
+
+    with TemporaryDirectory(prefix="rag-bench-") as tmpdir:
+        tmp_root = Path(tmpdir)
+        corpus_root = Path(args.keep_corpus) if args.keep_corpus else tmp_root / "corpus"
+        corpus = build_corpus(corpus_root, args.formats, args.sizes)
+        results = run_benchmark(
+            corpus,
+            iterations=max(1, args.iterations),
+            workdir=tmp_root / "runs",
+            plugin_filter=set(args.plugins) if args.plugins else None,
+        )
+
+    report: Dict[str, Any] = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "iterations": args.iterations,
+        "skipped_modules": skipped_modules,
+        "results": results,
+    }
+
+    exit_code = 0
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare_with_baseline(results, baseline.get("results", {}), args.threshold)
+        report["baseline"] = args.baseline
+        report["threshold"] = args.threshold
+        report["regressions"] = regressions
+        exit_code = 1 if regressions else 0
+
+    rendered = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(rendered, encoding="utf-8")
+    else:
+        print(rendered)
+    if args.write_baseline:
+        Path(args.write_baseline).write_text(rendered, encoding="utf-8")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Benchmark the slicer's structural signal extraction.
+
+Builds synthetic mixed documents (headings, lists, tables, code, CJK prose) at
+doubling sizes, times ``extract_signals_from_samples`` on each and reports
+throughput as JSON. Scaling is linear when seconds-per-MB stays flat across
+sizes; ``--max-drift`` fails the run when the largest size is that much slower
+per MB than the smallest. ``--legacy`` also times the previous multi-pass
+implementation for comparison.
+
+Usage:
+    PYTHONPATH=src python scripts/bench_slicer_signals.py --sizes-mb 1 2 4 8 16 32
+    PYTHONPATH=src python scripts/bench_slicer_signals.py --sizes-mb 1 4 --legacy
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from typing import Any, Callable, Dict, List, Sequence
+
+from slicer_service.recommendation import _quantile, extract_signals_from_samples
+
+_BLOCKS = (
+    "# 第{n}章 概述\n\n",
+    "{n}.1 Background and scope of the knowledge base\n",
+    "- bullet item {n} with some words\n* another item\n",
+    "| col a | col b | col {n} |\n|---|---|---|\n| 1 | 2 | 3 |\n",
+    "def handler_{n}(event):\n    return process(event);\n",
+    "知识库切分基准测试段落，包含中文标点与数字 {n}，用于覆盖非 ASCII 路径。\n",
+    "Plain paragraph {n} describing a feature, with commas, numbers 12.5% and symbols (x/y).\n\n",
+)
+
+
+def _make_sample(size_bytes: int, seed: int = 39) -> str:
+    rng = random.Random(seed)
+    parts: List[str] = []
+    total = 0
+    n = 0
+    while total < size_bytes:
+        block = rng.choice(_BLOCKS).format(n=n)
+        parts.append(block)
+        total += len(block.encode("utf-8"))
+        n += 1
+    return "".join(parts)
+
+
+def _legacy_extract(samples: Sequence[str]) -> Dict[str, Any]:
+    lines = [line.strip() for text in samples if text for line in text.splitlines() if line.strip()]
+    total_lines = max(len(lines), 1)
+    heading = re.compile(r"^(#{1,6}\s+|\d+(?:\.\d+)*[\.\)]?\s*|\d+\.\[[^\]]*\]\s*|[一二三四五六七八九十]+、\s*)")
+    listing = re.compile(r"^(?:[-*+•]\s+|\d+\.\s+)")
+    table = re.compile(r"\|")
+    code = re.compile(r"(```|\bclass\b|\bdef\b|\bfunction\b|;\s*$)")
+    paras = [len(p.strip()) for text in samples if text for p in re.split(r"\n\s*\n", text) if p.strip()]
+    return {
+        "heading_ratio": sum(1 for line in lines if heading.match(line)) / total_lines,
+        "list_ratio": sum(1 for line in lines if listing.match(line)) / total_lines,
+        "table_ratio": sum(
+            1 for line in lines if (table.search(line) and line.count("|") >= 2) or line.count(",") >= 3
+        )
+        / total_lines,
+        "code_ratio": sum(1 for line in lines if code.search(line)) / total_lines,
+        "p90_para_len": int(_quantile(paras, 0.9)) if paras else 0,
+        "p50_para_len": int(_quantile(paras, 0.5)) if paras else 0,
+        "digit_symbol_ratio": sum(1 for ch in "".join(lines) if not ch.isalpha()) / max(len("".join(lines)), 1),
+        "samples": list(samples),
+    }
+
+
+def _time(fn: Callable[[Sequence[str]], Any], samples: Sequence[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(samples)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(sizes_mb: Sequence[float], repeat: int, legacy: bool) -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    for size_mb in sizes_mb:
+        samples = [_make_sample(int(size_mb * 1024 * 1024))]
+        row: Dict[str, Any] = {"size_mb": size_mb}
+        seconds = _time(extract_signals_from_samples, samples, repeat)
+        row.update(seconds=round(seconds, 4), sec_per_mb=round(seconds / size_mb, 4), mb_per_sec=round(size_mb / seconds, 2))
+        if legacy:
+            legacy_seconds = _time(_legacy_extract, samples, repeat)
+            row.update(legacy_seconds=round(legacy_seconds, 4), speedup=round(legacy_seconds / seconds, 2))
+        rows.append(row)
+    return rows
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--repeat", type=int, default=3, help="best-of-N timing per size")
+    parser.add_argument("--legacy", action="store_true", help="also time the previous multi-pass extractor")
+    parser.add_argument("--max-drift", type=float, default=0.5, help="allowed sec/MB growth, smallest to largest")
+    args = parser.parse_args(argv)
+
+    rows = run(sorted(args.sizes_mb), args.repeat, args.legacy)
+    drift = rows[-1]["sec_per_mb"] / max(rows[0]["sec_per_mb"], 1e-9) - 1
+    print(json.dumps({"results": rows, "sec_per_mb_drift": round(drift, 3)}, ensure_ascii=False, indent=2))
+    return 1 if drift > args.max_drift else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,14 +7,16 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional
 from uuid import uuid4
 
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, Query, Request, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
 
 from .celery_app import pipeline_celery
 from .config import get_settings
 from .logging_config import setup_logging
 from .minio_client import get_minio_client
-from .utils import normalize_source_format, prefer_markdown_target
+from .uploads import UploadError, get_chunked_uploader
+from .utils import conversion_priority, normalize_source_format, prefer_markdown_target
 
 
 class FilePayload(BaseModel):
@@ -37,12 +39,27 @@ class PipelineRequest(BaseModel):
     async_mode: bool = False
 
 
+class UploadSessionRequest(BaseModel):
+    filename: str
+    size_bytes: int
+    content_type: Optional[str] = None
+
+
 class PipelineResponse(BaseModel):
     task_id: str
     status: str = "accepted"
     result: Optional[Dict[str, Any]] = None
 
 
+def _ensure_bucket(client, bucket: str) -> None:
+    try:
+        if not client.bucket_exists(bucket):
+            client.make_bucket(bucket)
+    except Exception as exc:  # noqa: BLE001
+        if "already exists" not in str(exc):
+            raise HTTPException(status_code=500, detail=f"bucket check failed: {exc}")
+
+
 def create_app() -> FastAPI:
     setup_logging()
     settings = get_settings()
@@ -55,12 +72,7 @@ def create_app() -> FastAPI:
 
         client = get_minio_client()
         bucket = settings.minio_bucket
-        try:
-            if not client.bucket_exists(bucket):
-                client.make_bucket(bucket)
-        except Exception as exc:  # noqa: BLE001
-            if "already exists" not in str(exc):
-                raise HTTPException(status_code=500, detail=f"bucket check failed: {exc}")
+        _ensure_bucket(client, bucket)
 
         safe_name = Path(file.filename).name or "upload.bin"
         object_key = f"uploads/{uuid4().hex}_{safe_name}"
@@ -85,6 +97,61 @@ def create_app() -> FastAPI:
 
         return {"bucket": bucket, "object_key": object_key}
 
+    # Resumable chunked uploads: create -> PUT chunks (any order, in parallel) -> complete.
+    @app.post("/api/v1/pipeline/uploads")
+    def create_upload_session(req: UploadSessionRequest):
+        _ensure_bucket(get_minio_client(), settings.minio_bucket)
+        try:
+            session = get_chunked_uploader().create(req.filename, req.size_bytes, req.content_type)
+        except UploadError as exc:
+            raise HTTPException(status_code=exc.status_code, detail=str(exc)) from exc
+        return {
+            "upload_id": session.upload_id,
+            "object_key": session.object_key,
+            "chunk_size": session.chunk_size,
+            "total_chunks": session.total_chunks,
+        }
+
+    @app.put("/api/v1/pipeline/uploads/{upload_id}")
+    async def put_upload_chunk(upload_id: str, request: Request, offset: int = Query(..., ge=0)):
+        uploader = get_chunked_uploader()
+        try:
+            # Validate the session and offset before reading the body, then never buffer more than one chunk.
+            expected = await run_in_threadpool(uploader.chunk_length, upload_id, offset)
+            declared = request.headers.get("content-length")
+            if declared is not None and declared.isdigit() and int(declared) > expected:
+                raise UploadError(f"chunk at offset {offset} must be {expected} bytes", status_code=413)
+            data = bytearray()
+            async for piece in request.stream():
+                data += piece
+                if len(data) > expected:
+                    raise UploadError(f"chunk at offset {offset} must be {expected} bytes", status_code=413)
+            return await run_in_threadpool(uploader.put_chunk, upload_id, offset, bytes(data))
+        except UploadError as exc:
+            raise HTTPException(status_code=exc.status_code, detail=str(exc)) from exc
+
+    @app.get("/api/v1/pipeline/uploads/{upload_id}")
+    def get_upload_status(upload_id: str):
+        try:
+            return get_chunked_uploader().status(upload_id)
+        except UploadError as exc:
+            raise HTTPException(status_code=exc.status_code, detail=str(exc)) from exc
+
+    @app.post("/api/v1/pipeline/uploads/{upload_id}/complete")
+    def complete_upload(upload_id: str):
+        try:
+            return get_chunked_uploader().complete(upload_id)
+        except UploadError as exc:
+            raise HTTPException(status_code=exc.status_code, detail=str(exc)) from exc
+
+    @app.delete("/api/v1/pipeline/uploads/{upload_id}")
+    def abort_upload(upload_id: str):
+        try:
+            get_chunked_uploader().abort(upload_id)
+        except UploadError as exc:
+            raise HTTPException(status_code=exc.status_code, detail=str(exc)) from exc
+        return {"upload_id": upload_id, "status": "aborted"}
+
     @app.post("/api/v1/pipeline/recommend", response_model=PipelineResponse)
     def recommend(req: PipelineRequest):
         if not req.files:
@@ -130,7 +197,11 @@ def create_app() -> FastAPI:
             ).apply_async()
         else:
             workflow = pipeline_celery.signature(
-                "conversion.handle_batch", args=[payload], immutable=True, queue=settings.conversion_queue
+                "conversion.handle_batch",
+                args=[payload],
+                immutable=True,
+                queue=settings.conversion_queue,
+                priority=conversion_priority(req.priority),
             ) | pipeline_celery.signature("pipeline.extract_and_probe", queue=settings.pipeline_queue)
             async_result = workflow.apply_async()
 
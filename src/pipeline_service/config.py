@@ -24,6 +24,13 @@ class Settings(BaseSettings):
     minio_secret_key: str = Field("minioadmin", description="MinIO secret key")
     minio_bucket: str = Field("qadata", description="Bucket storing converted artifacts")
 
+    upload_chunk_size_mb: int = Field(16, ge=5, description="Resumable upload chunk size; S3 parts must be >= 5 MiB")
+    upload_max_size_mb: int = Field(20480, ge=1, description="Largest file accepted by resumable uploads")
+    upload_session_ttl_sec: int = Field(86400, ge=60, description="Idle lifetime of a resumable upload session")
+    upload_redis_url: Optional[str] = Field(
+        None, description="Redis holding upload session state (defaults to redis_backend)"
+    )
+
     file_manager_base_url: AnyUrl | str = Field(
         "http://10.88.162.151:8989", description="File management server base URL"
     )
@@ -60,6 +67,9 @@ class Settings(BaseSettings):
     sample_page_ratio: float = Field(0.2, description="比例抽页，基于文档页数，最大不超过10页")
     sample_char_limit: int = Field(5000, description="仅按字符抽取时的上限长度")
     probe_timeout_sec: int = Field(60, description="Timeout for probe tasks")
+    probe_cache_ttl_sec: int = Field(
+        3600, ge=0, description="Reuse probe/recommendation results for identical samples (0 disables)"
+    )
     conversion_timeout_sec: int = Field(180, description="Timeout for conversion task result")
 
     log_dir: str = Field("./logs", description="Directory for pipeline log files")
@@ -2,12 +2,16 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
 import random
 import tempfile
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List
 
+import redis
 from celery import chain
 from pypdf import PdfReader, PdfWriter
 
@@ -15,7 +19,13 @@ from .celery_app import pipeline_celery
 from .logging_config import setup_logging
 from .config import get_settings
 from .minio_client import get_minio_client
-from .utils import is_markdown_target, normalize_source_format, normalize_target_format, prefer_markdown_target
+from .utils import (
+    conversion_priority,
+    is_markdown_target,
+    normalize_source_format,
+    normalize_target_format,
+    prefer_markdown_target,
+)
 
 setup_logging()
 settings = get_settings()
@@ -38,6 +48,51 @@ def _round_scores(scores: Dict[str, Any] | None, places: int = 3) -> Dict[str, A
     return {k: _round_value(v, places) for k, v in scores.items()}
 
 
+# Bump together with slicer_service.cache.CACHE_VERSION (profile shape or scoring changes) so
+# recommendations cached before a slicer deploy are not served for probe_cache_ttl_sec.
+PROBE_CACHE_VERSION = "2"
+
+
+@lru_cache
+def _probe_cache_client() -> redis.Redis:
+    return redis.Redis.from_url(settings.redis_backend, socket_connect_timeout=0.2, socket_timeout=0.2)
+
+
+def _probe_cache_key(samples: List[str], source_format: str | None) -> str:
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{PROBE_CACHE_VERSION}|{source_format or ''}|{len(samples)}|".encode())
+    for text in samples:
+        data = text.encode("utf-8", "surrogatepass")
+        digest.update(b"%d:" % len(data))
+        digest.update(data)
+    return f"pipeline:probe:v{PROBE_CACHE_VERSION}:{digest.hexdigest()}"
+
+
+def _probe_cache_enabled() -> bool:
+    # Eager (test/inline) runs have no shared Redis to talk to.
+    return settings.probe_cache_ttl_sec > 0 and not pipeline_celery.conf.task_always_eager
+
+
+def _probe_cache_get(key: str) -> Dict[str, Any] | None:
+    if not _probe_cache_enabled():
+        return None
+    try:
+        raw = _probe_cache_client().get(key)
+    except redis.RedisError as exc:
+        logger.debug("probe cache unavailable: %s", exc)
+        return None
+    return json.loads(raw) if raw else None
+
+
+def _probe_cache_set(key: str, value: Dict[str, Any]) -> None:
+    if not _probe_cache_enabled():
+        return
+    try:
+        _probe_cache_client().set(key, json.dumps(value, ensure_ascii=False), ex=settings.probe_cache_ttl_sec)
+    except redis.RedisError as exc:
+        logger.debug("probe cache unavailable: %s", exc)
+
+
 def _first_success(results: List[Dict[str, Any]]) -> Dict[str, Any] | None:
     for item in results:
         if item.get("status") == "success" and (item.get("object_key") or item.get("output_path")):
@@ -207,6 +262,13 @@ def extract_and_probe(conversion_result: Dict[str, Any]) -> Dict[str, Any]:
         async_result = pipeline_celery.send_task(task_name, args=args, queue=settings.probe_queue)
         return async_result.get(timeout=settings.probe_timeout_sec, disable_sync_subtasks=False)
 
+    # Identical samples (retries, re-indexing) reuse the previous probe instead of shipping them to the slicer again.
+    cache_key = _probe_cache_key(samples, source_format)
+    cached = _probe_cache_get(cache_key)
+    if cached is not None:
+        logger.info("probe.cache_hit key=%s strategy=%s", cache_key, cached["recommendation"].get("strategy_id"))
+        return {"conversion": conversion_result, **cached}
+
     profile_result = _probe("probe.extract_signals", ({"samples": samples},))
     profile_result = _round_profile(profile_result, 3)
 
@@ -239,6 +301,9 @@ def extract_and_probe(conversion_result: Dict[str, Any]) -> Dict[str, Any]:
         },
     )
 
+    if isinstance(recommendation, dict):
+        _probe_cache_set(cache_key, {"profile": profile_result, "recommendation": recommendation})
+
     return {
         "conversion": conversion_result,
         "profile": profile_result,
@@ -289,7 +354,11 @@ def run_document_pipeline(payload: Dict[str, Any]) -> Dict[str, Any]:
 
     workflow = chain(
         pipeline_celery.signature(
-            "conversion.handle_batch", args=[conv_payload], immutable=True, queue=settings.conversion_queue
+            "conversion.handle_batch",
+            args=[conv_payload],
+            immutable=True,
+            queue=settings.conversion_queue,
+            priority=conversion_priority(conv_payload.get("priority")),
         ),
         pipeline_celery.signature("pipeline.extract_and_probe", queue=settings.pipeline_queue),
     )
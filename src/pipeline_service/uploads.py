@@ -0,0 +1,294 @@
+"""Resumable chunked uploads backed by MinIO multipart uploads.
+
+A session fixes ``chunk_size`` up front, so the chunk at byte ``offset`` is
+always multipart part ``offset // chunk_size + 1``. Chunks are therefore
+independent: clients may send them in any order and in parallel, and re-send a
+chunk after a network error (the part is simply overwritten). Session metadata
+and the received part ETags live in Redis hashes with a TTL; completing the
+session stitches the parts server-side into the final object.
+
+Sessions that expire in Redis would leave their MinIO multipart upload (and
+its stored parts) behind, so every session is also indexed by its deadline in
+a sorted set that does not expire. Creating a session sweeps a bounded batch
+of expired ones and aborts their multipart uploads.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import time
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+import redis
+from minio import Minio
+from minio.datatypes import Part
+from minio.error import S3Error
+
+from .config import get_settings
+from .minio_client import get_minio_client
+
+logger = logging.getLogger(__name__)
+
+
+class UploadError(Exception):
+    """Invalid chunk/session operation; ``status_code`` maps to the HTTP response."""
+
+    def __init__(self, message: str, status_code: int = 400) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@dataclass
+class UploadSession:
+    upload_id: str
+    multipart_id: str
+    bucket: str
+    object_key: str
+    filename: str
+    size_bytes: int
+    chunk_size: int
+    content_type: str
+
+    @property
+    def total_chunks(self) -> int:
+        return max(1, math.ceil(self.size_bytes / self.chunk_size))
+
+    def expected_length(self, part_number: int) -> int:
+        if part_number < self.total_chunks:
+            return self.chunk_size
+        return self.size_bytes - self.chunk_size * (self.total_chunks - 1)
+
+
+class UploadSessionStore:
+    def __init__(self, client: redis.Redis, ttl_sec: int, key_prefix: str = "pipeline:upload") -> None:
+        self._redis = client
+        self._ttl = ttl_sec
+        self._prefix = key_prefix
+
+    def _session_key(self, upload_id: str) -> str:
+        return f"{self._prefix}:{upload_id}"
+
+    def _parts_key(self, upload_id: str) -> str:
+        return f"{self._prefix}:{upload_id}:parts"
+
+    @property
+    def _deadlines_key(self) -> str:
+        return f"{self._prefix}:deadlines"
+
+    @property
+    def _pending_key(self) -> str:
+        return f"{self._prefix}:pending"
+
+    def _touch(self, upload_id: str) -> None:
+        self._redis.zadd(self._deadlines_key, {upload_id: time.time() + self._ttl})
+
+    def save(self, session: UploadSession) -> None:
+        key = self._session_key(session.upload_id)
+        payload = json.dumps(asdict(session))
+        self._redis.hset(key, mapping={"session": payload})
+        self._redis.expire(key, self._ttl)
+        # Non-expiring copy so the multipart upload can still be aborted after the session expires.
+        self._redis.hset(self._pending_key, session.upload_id, payload)
+        self._touch(session.upload_id)
+
+    def load(self, upload_id: str) -> UploadSession:
+        raw = self._redis.hget(self._session_key(upload_id), "session")
+        if raw is None:
+            raise UploadError(f"upload session {upload_id} not found or expired", status_code=404)
+        return UploadSession(**json.loads(raw))
+
+    def record_part(self, upload_id: str, part_number: int, etag: str, size: int) -> None:
+        key = self._parts_key(upload_id)
+        self._redis.hset(key, str(part_number), json.dumps({"etag": etag, "size": size}))
+        # Every chunk extends the session so slow resumable uploads do not expire midway.
+        self._redis.expire(key, self._ttl)
+        self._redis.expire(self._session_key(upload_id), self._ttl)
+        self._touch(upload_id)
+
+    def parts(self, upload_id: str) -> Dict[int, Dict[str, Any]]:
+        raw = self._redis.hgetall(self._parts_key(upload_id))
+        return {int(k): json.loads(v) for k, v in raw.items()}
+
+    def delete(self, upload_id: str) -> None:
+        self._redis.delete(self._session_key(upload_id), self._parts_key(upload_id))
+        self._redis.zrem(self._deadlines_key, upload_id)
+        self._redis.hdel(self._pending_key, upload_id)
+
+    def expired(self, limit: int = 100) -> List[UploadSession]:
+        """Sessions past their deadline whose Redis state is gone (oldest first, at most ``limit``)."""
+
+        sessions: List[UploadSession] = []
+        for raw_id in self._redis.zrangebyscore(self._deadlines_key, "-inf", time.time(), start=0, num=limit):
+            upload_id = raw_id.decode() if isinstance(raw_id, bytes) else raw_id
+            if self._redis.exists(self._session_key(upload_id)):
+                self._touch(upload_id)  # clock skew: Redis has not expired it yet
+                continue
+            raw = self._redis.hget(self._pending_key, upload_id)
+            if raw is None:
+                self._redis.zrem(self._deadlines_key, upload_id)
+                continue
+            sessions.append(UploadSession(**json.loads(raw)))
+        return sessions
+
+
+class ChunkedUploader:
+    def __init__(
+        self,
+        minio_client: Minio,
+        store: UploadSessionStore,
+        bucket: str,
+        chunk_size: int,
+        max_size_bytes: int,
+    ) -> None:
+        self._minio = minio_client
+        self._store = store
+        self._bucket = bucket
+        self._chunk_size = chunk_size
+        self._max_size = max_size_bytes
+
+    def create(self, filename: str, size_bytes: int, content_type: Optional[str] = None) -> UploadSession:
+        self.sweep_expired()
+        if size_bytes <= 0:
+            raise UploadError("size_bytes must be positive")
+        if size_bytes > self._max_size:
+            raise UploadError(f"file exceeds upload limit of {self._max_size} bytes", status_code=413)
+
+        safe_name = Path(filename).name or "upload.bin"
+        object_key = f"uploads/{uuid4().hex}_{safe_name}"
+        content_type = content_type or "application/octet-stream"
+        multipart_id = self._minio._create_multipart_upload(
+            self._bucket, object_key, {"Content-Type": content_type}
+        )
+        session = UploadSession(
+            upload_id=uuid4().hex,
+            multipart_id=multipart_id,
+            bucket=self._bucket,
+            object_key=object_key,
+            filename=safe_name,
+            size_bytes=size_bytes,
+            chunk_size=self._chunk_size,
+            content_type=content_type,
+        )
+        self._store.save(session)
+        return session
+
+    @staticmethod
+    def _part_number(session: UploadSession, offset: int) -> int:
+        if offset < 0 or offset % session.chunk_size:
+            raise UploadError(f"offset must be a multiple of chunk_size ({session.chunk_size})")
+        part_number = offset // session.chunk_size + 1
+        if part_number > session.total_chunks:
+            raise UploadError("offset is beyond the declared file size")
+        return part_number
+
+    def chunk_length(self, upload_id: str, offset: int) -> int:
+        """Exact byte length the chunk at ``offset`` must have; checked before the body is read."""
+
+        session = self._store.load(upload_id)
+        return session.expected_length(self._part_number(session, offset))
+
+    def put_chunk(self, upload_id: str, offset: int, data: bytes) -> Dict[str, Any]:
+        session = self._store.load(upload_id)
+        part_number = self._part_number(session, offset)
+        expected = session.expected_length(part_number)
+        if len(data) != expected:
+            raise UploadError(f"chunk at offset {offset} must be {expected} bytes, got {len(data)}")
+
+        etag = self._minio._upload_part(
+            session.bucket, session.object_key, data, None, session.multipart_id, part_number
+        )
+        self._store.record_part(upload_id, part_number, etag, len(data))
+        return {"upload_id": upload_id, "part_number": part_number, "offset": offset, "size": len(data)}
+
+    def status(self, upload_id: str) -> Dict[str, Any]:
+        session = self._store.load(upload_id)
+        parts = self._store.parts(upload_id)
+        missing = [
+            (number - 1) * session.chunk_size
+            for number in range(1, session.total_chunks + 1)
+            if number not in parts
+        ]
+        return {
+            "upload_id": upload_id,
+            "object_key": session.object_key,
+            "size_bytes": session.size_bytes,
+            "chunk_size": session.chunk_size,
+            "total_chunks": session.total_chunks,
+            "received_bytes": sum(part["size"] for part in parts.values()),
+            "missing_offsets": missing,
+        }
+
+    def complete(self, upload_id: str) -> Dict[str, Any]:
+        session = self._store.load(upload_id)
+        parts = self._store.parts(upload_id)
+        missing = [n for n in range(1, session.total_chunks + 1) if n not in parts]
+        if missing:
+            raise UploadError(f"{len(missing)} chunks missing, first at part {missing[0]}", status_code=409)
+
+        self._minio._complete_multipart_upload(
+            session.bucket,
+            session.object_key,
+            session.multipart_id,
+            [Part(number, parts[number]["etag"]) for number in sorted(parts)],
+        )
+        self._store.delete(upload_id)
+        return {
+            "bucket": session.bucket,
+            "object_key": session.object_key,
+            "size_bytes": session.size_bytes,
+            "size_mb": round(session.size_bytes / (1024 * 1024), 4),
+            "filename": session.filename,
+        }
+
+    def abort(self, upload_id: str) -> None:
+        session = self._store.load(upload_id)
+        self._minio._abort_multipart_upload(session.bucket, session.object_key, session.multipart_id)
+        self._store.delete(upload_id)
+
+    def sweep_expired(self, limit: int = 100) -> int:
+        """Abort the MinIO multipart uploads of sessions that expired in Redis; returns how many were cleared."""
+
+        try:
+            sessions = self._store.expired(limit)
+        except redis.RedisError as exc:
+            logger.warning("Unable to list expired upload sessions: %s", exc)
+            return 0
+        cleared = 0
+        for session in sessions:
+            try:
+                self._minio._abort_multipart_upload(session.bucket, session.object_key, session.multipart_id)
+            except S3Error as exc:
+                if exc.code != "NoSuchUpload":  # already aborted by a concurrent sweep
+                    logger.warning("Unable to abort expired upload %s: %s", session.upload_id, exc)
+                    continue
+            self._store.delete(session.upload_id)
+            cleared += 1
+        return cleared
+
+
+@lru_cache
+def get_chunked_uploader() -> ChunkedUploader:
+    settings = get_settings()
+    client = redis.Redis.from_url(settings.upload_redis_url or settings.redis_backend)
+    return ChunkedUploader(
+        get_minio_client(),
+        UploadSessionStore(client, settings.upload_session_ttl_sec),
+        settings.minio_bucket,
+        settings.upload_chunk_size_mb * 1024 * 1024,
+        settings.upload_max_size_mb * 1024 * 1024,
+    )
+
+
+__all__ = [
+    "ChunkedUploader",
+    "UploadError",
+    "UploadSession",
+    "UploadSessionStore",
+    "get_chunked_uploader",
+]
@@ -11,8 +11,13 @@ TEXTUAL_FORMATS = {
     "text/markdown",
     "xlsx",
     "xls",
+    "docx",
+    "pptx",
 }
 MARKDOWN_FORMATS = {"md", "markdown", "text/markdown"}
+# Broker priority of conversion.handle_batch per request priority: the medium-length step of
+# each class in rag_converter's scheduling bands (high 0-2, normal 3-5, low 6-8).
+CONVERSION_PRIORITY = {"high": 1, "normal": 4, "low": 7}
 
 
 def normalize_format(fmt: str | None) -> str:
@@ -29,6 +34,8 @@ def normalize_source_format(fmt: str | None) -> str:
         "text/plain": "text/plain",
         "plain": "text/plain",
         "text/markdown": "text/markdown",
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document": "docx",
+        "application/vnd.openxmlformats-officedocument.presentationml.presentation": "pptx",
     }
     return mapping.get(raw, raw)
 
@@ -47,3 +54,9 @@ def prefer_markdown_target(source_format: str | None, target_format: str | None)
 
 def is_markdown_target(fmt: str | None) -> bool:
     return normalize_target_format(fmt) in MARKDOWN_FORMATS
+
+
+def conversion_priority(priority: str | None) -> int:
+    """Broker priority for a conversion task sent on behalf of a pipeline request."""
+
+    return CONVERSION_PRIORITY.get(normalize_format(priority), CONVERSION_PRIORITY["normal"])
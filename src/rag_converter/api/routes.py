@@ -10,6 +10,8 @@ from typing import Any
 
 from fastapi import APIRouter, Depends, status
 from celery.exceptions import CeleryError
+from kombu.exceptions import OperationalError
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 
 from ..config import Settings, settings_dependency
@@ -23,12 +25,16 @@ from ..celery_app import (
     _upload_input_to_sitech,
     _build_download_url,
     celery_app,
+    expand_archive_task,
     handle_conversion_task,
 )
+from ..archive import is_archive_format
 from ..plugins import REGISTRY
 from ..plugins.base import ConversionInput
 from ..monitoring import collect_dependency_status, record_task_accepted
+from ..scheduling import DurationPredictor, scheduling_priority
 from .schemas import (
+    CancelResponse,
     ConversionRequest,
     ConversionResponse,
     ConversionResultPayload,
@@ -39,6 +45,7 @@ from .schemas import (
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
+_PREDICTORS: dict[str, DurationPredictor] = {}
 
 
 def _per_format_limit(settings: Settings, fmt: str) -> int:
@@ -65,7 +72,11 @@ def _apply_default_targets(payload: ConversionRequest, settings: Settings) -> No
     """Populate missing target_format using the first registered/configured mapping."""
 
     for file in payload.files:
-        if file.target_format:
+        if file.target_formats:
+            requested = ([file.target_format] if file.target_format else []) + file.target_formats
+            file.target_formats = list(dict.fromkeys(fmt.strip().lower() for fmt in requested if fmt.strip()))
+            file.target_format = file.target_formats[0] if file.target_formats else None
+        if file.target_format or is_archive_format(file.source_format):
             continue
         inferred = _default_target_for_source(file.source_format, settings)
         if not inferred:
@@ -90,9 +101,23 @@ def _validate_request(payload: ConversionRequest, settings: Settings) -> None:
     if mode == "sync" and len(files) > 1:
         raise_error("ERR_BATCH_LIMIT_EXCEEDED", detail="sync mode only supports a single file")
 
+    if mode == "sync" and any(len(file.target_formats or []) > 1 for file in files):
+        raise_error("ERR_BATCH_LIMIT_EXCEEDED", detail="sync mode only supports a single target format")
+
     if len(files) > limits.max_files_per_task:
         raise_error("ERR_BATCH_LIMIT_EXCEEDED")
 
+    if any(is_archive_format(file.source_format) for file in files):
+        # Members are validated on the worker once the archive has been listed.
+        if mode == "sync" or len(files) > 1:
+            raise_error(
+                "ERR_BATCH_LIMIT_EXCEEDED",
+                detail="archives must be submitted alone and in async mode",
+            )
+        if files[0].size_mb > _per_format_limit(settings, files[0].source_format.lower()):
+            raise_error("ERR_FILE_TOO_LARGE")
+        return
+
     total_size = sum(file.size_mb for file in files)
     if total_size > limits.max_total_upload_size_mb:
         raise_error("ERR_BATCH_LIMIT_EXCEEDED")
@@ -107,7 +132,7 @@ def _validate_request(payload: ConversionRequest, settings: Settings) -> None:
     }
     supported = registry_pairs or configured_pairs
 
-    doc_formats = {"doc", "docx", "ppt", "pptx", "html"}
+    doc_formats = {"doc", "docx", "ppt", "pptx", "html", "pdf"}
     av_formats = {
         "wav",
         "flac",
@@ -129,12 +154,18 @@ def _validate_request(payload: ConversionRequest, settings: Settings) -> None:
         per_limit = _per_format_limit(settings, fmt)
         if file.size_mb > per_limit:
             raise_error("ERR_FILE_TOO_LARGE")
-        if (fmt, file.target_format.lower()) not in supported:
-            locator = _source_locator(file)
-            raise_error(
-                "ERR_FORMAT_UNSUPPORTED",
-                detail=f"Unsupported format {fmt}->{file.target_format.lower()} (source={locator})",
+        targets = file.target_formats or [file.target_format.lower()]
+        for target in targets:
+            # A target may also be reached through another requested target (e.g. doc->docx->md).
+            reachable = (fmt, target) in supported or any(
+                (fmt, mid) in supported and (mid, target) in supported for mid in targets if mid != target
             )
+            if not reachable:
+                locator = _source_locator(file)
+                raise_error(
+                    "ERR_FORMAT_UNSUPPORTED",
+                    detail=f"Unsupported format {fmt}->{target} (source={locator})",
+                )
 
         if file.page_limit is not None and file.duration_seconds is not None:
             raise_error("ERR_FORMAT_UNSUPPORTED")
@@ -156,6 +187,24 @@ def _validate_request(payload: ConversionRequest, settings: Settings) -> None:
                 )
 
 
+def _estimate_duration(payload: ConversionRequest, settings: Settings) -> float | None:
+    """Sum of per-file duration estimates; files of a task run sequentially on one worker."""
+
+    scheduling = settings.celery.scheduling
+    if not scheduling.enabled:
+        return None
+    url = scheduling.redis_url or settings.celery.broker_url
+    predictor = _PREDICTORS.get(url)
+    if predictor is None:
+        predictor = _PREDICTORS[url] = DurationPredictor(settings)
+    total = sum(
+        predictor.estimate(file.source_format, target, file.size_mb, page_limit=file.page_limit)
+        for file in payload.files
+        for target in (file.target_formats or [file.target_format or ""])
+    )
+    return round(total, 1)
+
+
 def _run_sync_conversion(payload: ConversionRequest, settings: Settings) -> ConversionResponse:
     file_meta = payload.files[0].model_dump(mode="json")
     storage_override = payload.storage.model_dump(exclude_none=True) if payload.storage else None
@@ -249,23 +298,63 @@ async def submit_conversion(
 
     task_id = str(uuid4())
     message = "Task accepted and scheduled for conversion"
+    archive = is_archive_format(payload.files[0].source_format)
+    estimate = None if archive else await run_in_threadpool(_estimate_duration, payload, settings)
     task_payload = {
         "task_id": task_id,
         "files": [file.model_dump(mode="json") for file in payload.files],
         "priority": payload.priority,
         "callback_url": str(payload.callback_url) if payload.callback_url else None,
         "storage": payload.storage.model_dump(exclude_none=True) if payload.storage else None,
+        "estimated_duration_sec": estimate,
     }
 
+    options: dict[str, Any] = {}
+    if settings.celery.scheduling.enabled:
+        options["priority"] = scheduling_priority(payload.priority, estimate, settings.celery.scheduling)
     try:
-        handle_conversion_task.delay(task_payload)
+        if archive:
+            expand_archive_task.apply_async(args=(task_payload,), task_id=task_id, **options)
+        else:
+            handle_conversion_task.apply_async(args=(task_payload,), task_id=task_id, **options)
     except CeleryError:
         logger.exception("Failed to enqueue task %s", task_id)
         raise_error("ERR_TASK_FAILED")
 
     record_task_accepted(payload.priority)
 
-    return ConversionResponse(status="accepted", task_id=task_id, message=message)
+    return ConversionResponse(
+        status="accepted", task_id=task_id, message=message, estimated_duration_sec=estimate
+    )
+
+
+def _cancel_task(task_id: str) -> int:
+    # Drop the message if it is still queued, then ask every worker to kill its running tools.
+    celery_app.control.revoke(task_id)
+    replies = celery_app.control.broadcast(
+        "cancel_conversion", arguments={"task_id": task_id}, reply=True, timeout=1.0
+    )
+    return sum(
+        (answer.get("ok") or {}).get("terminated", 0)
+        for reply in replies or []
+        for answer in reply.values()
+        if isinstance(answer, dict)
+    )
+
+
+@router.post(
+    "/tasks/{task_id}/cancel",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=CancelResponse,
+    dependencies=[Depends(authenticate_request)],
+)
+async def cancel_conversion(task_id: str) -> CancelResponse:
+    try:
+        terminated = await run_in_threadpool(_cancel_task, task_id)
+    except (CeleryError, OperationalError):
+        logger.exception("Failed to cancel task %s", task_id)
+        raise_error("ERR_TASK_FAILED")
+    return CancelResponse(task_id=task_id, terminated_processes=terminated)
 
 
 @router.get("/formats", response_model=FormatsResponse)
@@ -14,6 +14,10 @@ class ConversionFile(BaseModel):
         None,
         description="Desired output format, e.g., docx; if omitted, server picks the default for this source format",
     )
+    target_formats: List[str] | None = Field(
+        None,
+        description="Optional: several output formats for one input; it is downloaded once and intermediates (e.g. pdf) are reused",
+    )
     input_url: HttpUrl | None = Field(None, description="Optional URL to fetch input")
     object_key: str | None = Field(None, description="Storage object key reference")
     base64_data: str | None = Field(
@@ -83,6 +87,17 @@ class ConversionResponse(BaseModel):
     error_code: str | None = None
     error_status: int | None = None
     results: List[ConversionResultPayload] | None = None
+    estimated_duration_sec: float | None = Field(
+        None, description="Predicted processing time of the task in seconds (async mode)"
+    )
+
+
+class CancelResponse(BaseModel):
+    task_id: str
+    status: Literal["cancelling"] = "cancelling"
+    terminated_processes: int = Field(
+        0, description="External tool process groups killed by workers that answered in time"
+    )
 
 
 class HealthResponse(BaseModel):
@@ -0,0 +1,142 @@
+"""Archive (zip) inputs: member enumeration, format sniffing and streaming upload.
+
+An archive submitted to ``/convert`` is expanded on a worker: members are read
+one at a time from the zip (never extracted as a whole), uploaded to object
+storage straight from the decompressing stream and converted as independent
+sub-tasks whose results are aggregated under the parent task id.
+"""
+
+from __future__ import annotations
+
+import posixpath
+import re
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Iterator, Optional
+
+ARCHIVE_FORMATS = {"zip", "application/zip", "application/x-zip-compressed"}
+
+_EXTENSION_ALIASES = {"htm": "html", "jpeg": "jpg", "markdown": "md", "text": "txt"}
+_SAFE_NAME = re.compile(r"[^\w.\-]+", re.UNICODE)
+_UTF8_FLAG = 0x800
+SNIFF_BYTES = 512
+_MAX_NESTED_SNIFF_BYTES = 64 * 1024 * 1024
+
+
+@dataclass
+class ArchiveMember:
+    index: int
+    name: str
+    info: zipfile.ZipInfo
+    source_format: Optional[str]
+
+    @property
+    def size_mb(self) -> float:
+        return round(self.info.file_size / (1024 * 1024), 4)
+
+    @property
+    def filename(self) -> str:
+        return posixpath.basename(self.name)
+
+
+def is_archive_format(fmt: str | None) -> bool:
+    return (fmt or "").strip().lower() in ARCHIVE_FORMATS
+
+
+def member_name(info: zipfile.ZipInfo) -> str:
+    """Decode legacy (non-UTF-8) names; zips made on Chinese Windows store GBK bytes."""
+
+    if info.flag_bits & _UTF8_FLAG:
+        return info.filename
+    try:
+        return info.filename.encode("cp437").decode("gbk")
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        return info.filename
+
+
+def _ooxml_kind(handle: IO[bytes]) -> Optional[str]:
+    try:
+        with zipfile.ZipFile(handle) as inner:
+            names = inner.namelist()
+    except zipfile.BadZipFile:
+        return None
+    for prefix, fmt in (("word/", "docx"), ("ppt/", "pptx"), ("xl/", "xlsx")):
+        if any(name.startswith(prefix) for name in names):
+            return fmt
+    return "zip"
+
+
+def sniff_format(head: bytes) -> Optional[str]:
+    """Best-effort format from leading magic bytes (``None`` when unknown/ambiguous)."""
+
+    if head.startswith(b"%PDF"):
+        return "pdf"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return "gif"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return "wav"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    if head[:4] == b"RIFF" and head[8:12] == b"AVI ":
+        return "avi"
+    if head.startswith(b"fLaC"):
+        return "flac"
+    if head.startswith(b"OggS"):
+        return "ogg"
+    if head.startswith(b"\x1aE\xdf\xa3"):
+        return "webm" if b"webm" in head[:64] else "mkv"
+    text = head.lstrip(b"\xef\xbb\xbf \t\r\n").lower()
+    if text.startswith(b"<svg") or (text.startswith(b"<?xml") and b"<svg" in text):
+        return "svg"
+    if text.startswith((b"<!doctype html", b"<html")):
+        return "html"
+    return None
+
+
+def infer_member_format(archive: zipfile.ZipFile, member: zipfile.ZipInfo, name: str) -> Optional[str]:
+    suffix = Path(name).suffix.lower().lstrip(".")
+    if suffix:
+        return _EXTENSION_ALIASES.get(suffix, suffix)
+    with archive.open(member) as handle:
+        head = handle.read(SNIFF_BYTES)
+    if head.startswith(b"PK\x03\x04"):
+        if member.file_size > _MAX_NESTED_SNIFF_BYTES:
+            return None
+        # OOXML packages are zips themselves; peek at their part names.
+        with archive.open(member) as handle:
+            return _ooxml_kind(handle)
+    return sniff_format(head)
+
+
+def iter_archive_members(archive: zipfile.ZipFile) -> Iterator[ArchiveMember]:
+    """Yield regular file members in archive order, skipping directories and OS metadata."""
+
+    index = 0
+    for info in archive.infolist():
+        if info.is_dir():
+            continue
+        name = member_name(info)
+        base = posixpath.basename(name)
+        if name.startswith("__MACOSX/") or base.startswith(".") or base in {"Thumbs.db", "desktop.ini"}:
+            continue
+        yield ArchiveMember(index=index, name=name, info=info, source_format=infer_member_format(archive, info, name))
+        index += 1
+
+
+def member_object_key(task_id: str, member: ArchiveMember) -> str:
+    safe = _SAFE_NAME.sub("_", member.filename).strip("._") or "member"
+    return f"archives/{task_id}/{member.index:05d}-{safe}"
+
+
+__all__ = [
+    "ARCHIVE_FORMATS",
+    "ArchiveMember",
+    "infer_member_format",
+    "is_archive_format",
+    "iter_archive_members",
+    "member_object_key",
+    "sniff_format",
+]
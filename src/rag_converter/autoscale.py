@@ -0,0 +1,249 @@
+"""Resource-aware Celery autoscaler for conversion workers.
+
+Celery's stock autoscaler only looks at the number of reserved tasks. Conversion
+workers spawn heavy external tools (soffice/ffmpeg/inkscape), so this module adds
+a controller that also watches CPU load, available memory, pool RSS and per-tool
+latency, and lowers the prefetch multiplier while the worker is under pressure so
+a busy node does not hoard tasks other workers could run.
+
+Enable with ``celery.autoscale.enabled: true`` and start the worker with
+``--autoscale=<max>,<min>``; the CLI bounds are the hard limits of the pool.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from celery.worker.autoscale import Autoscaler
+
+from .config import WorkerAutoscaleSettings, get_settings
+from .plugins.registry import read_plugin_dependency_file
+
+logger = logging.getLogger(__name__)
+
+TOOLS: Tuple[str, ...] = ("libreoffice", "inkscape", "ffmpeg", "python")
+_EWMA_ALPHA = 0.3
+
+
+class ToolLatencyBoard:
+    """Per-tool latency EWMA shared between prefork children and the parent.
+
+    Backed by a ``multiprocessing.Array`` allocated at import time, i.e. before
+    the worker forks its pool, so children write and the autoscaler thread in the
+    parent reads the same memory.
+    """
+
+    def __init__(self, tools: Iterable[str] = TOOLS) -> None:
+        self.tools = tuple(tools)
+        self._index = {tool: idx for idx, tool in enumerate(self.tools)}
+        # Layout: [ewma_0, count_0, ewma_1, count_1, ...]
+        self._values = multiprocessing.Array("d", len(self.tools) * 2)
+
+    def record(self, tool: str, seconds: float) -> None:
+        idx = self._index.get(tool, self._index.get("python"))
+        if idx is None:
+            return
+        with self._values.get_lock():
+            ewma = self._values[idx * 2]
+            count = self._values[idx * 2 + 1]
+            self._values[idx * 2] = seconds if count == 0 else (1 - _EWMA_ALPHA) * ewma + _EWMA_ALPHA * seconds
+            self._values[idx * 2 + 1] = count + 1
+
+    def snapshot(self) -> Dict[str, Tuple[float, int]]:
+        with self._values.get_lock():
+            return {
+                tool: (self._values[idx * 2], int(self._values[idx * 2 + 1]))
+                for tool, idx in self._index.items()
+                if self._values[idx * 2 + 1]
+            }
+
+
+TOOL_LATENCY = ToolLatencyBoard()
+_PLUGIN_TOOLS: Optional[Dict[str, str]] = None
+
+
+def plugin_tool(plugin) -> str:
+    """Map a plugin instance to the external tool it drives (via ``plugin_deps_file``)."""
+
+    global _PLUGIN_TOOLS
+    if _PLUGIN_TOOLS is None:
+        deps_file = get_settings().plugin_deps_file
+        deps = read_plugin_dependency_file(deps_file) if deps_file else {}
+        _PLUGIN_TOOLS = {module: tools[0] for module, tools in deps.items() if tools}
+    return _PLUGIN_TOOLS.get(type(plugin).__module__, "python")
+
+
+def record_tool_latency(plugin, seconds: float) -> None:
+    TOOL_LATENCY.record(plugin_tool(plugin), seconds)
+
+
+@dataclass
+class ResourceSample:
+    cpu_load: float | None = None
+    mem_available_ratio: float | None = None
+    pool_rss_mb: float | None = None
+    tool_latency: Dict[str, Tuple[float, int]] = field(default_factory=dict)
+
+
+@dataclass
+class ScaleDecision:
+    processes: int
+    prefetch_multiplier: int
+    reason: str
+
+
+class ConcurrencyController:
+    """Pure decision logic: given the pool state and a resource sample, pick a target."""
+
+    def __init__(self, settings: WorkerAutoscaleSettings, base_prefetch_multiplier: int) -> None:
+        self.settings = settings
+        self.base_prefetch_multiplier = max(1, base_prefetch_multiplier)
+        self._latency_baseline: Dict[str, float] = {}
+
+    def _pressure(self, sample: ResourceSample) -> str | None:
+        cfg = self.settings
+        if sample.mem_available_ratio is not None and sample.mem_available_ratio < cfg.min_mem_available_ratio:
+            return "memory"
+        if cfg.max_pool_rss_mb and sample.pool_rss_mb is not None and sample.pool_rss_mb > cfg.max_pool_rss_mb:
+            return "rss"
+        if sample.cpu_load is not None and sample.cpu_load > cfg.max_cpu_load:
+            return "cpu"
+        for tool, (ewma, count) in sample.tool_latency.items():
+            if count < cfg.min_latency_samples:
+                continue
+            baseline = self._latency_baseline.get(tool)
+            if baseline is None or ewma < baseline:
+                self._latency_baseline[tool] = ewma
+                continue
+            if ewma > baseline * cfg.latency_slowdown_factor:
+                return f"latency:{tool}"
+        return None
+
+    def decide(self, *, processes: int, reserved: int, min_procs: int, max_procs: int, sample: ResourceSample) -> ScaleDecision:
+        pressure = self._pressure(sample)
+        if pressure:
+            return ScaleDecision(
+                processes=max(min_procs, processes - self.settings.shrink_step),
+                prefetch_multiplier=self.settings.pressure_prefetch_multiplier,
+                reason=pressure,
+            )
+
+        if reserved > processes:
+            target = min(max_procs, processes + min(self.settings.grow_step, reserved - processes))
+            return ScaleDecision(target, self.base_prefetch_multiplier, "backlog")
+
+        target = max(min_procs, min(reserved, processes))
+        return ScaleDecision(target, self.base_prefetch_multiplier, "idle" if target < processes else "steady")
+
+
+def _read_meminfo(path: Path = Path("/proc/meminfo")) -> float | None:
+    try:
+        values: Dict[str, int] = {}
+        for line in path.read_text(encoding="ascii").splitlines():
+            key, _, rest = line.partition(":")
+            values[key] = int(rest.split()[0])
+        return values["MemAvailable"] / values["MemTotal"]
+    except (OSError, KeyError, ValueError, ZeroDivisionError):
+        return None
+
+
+def _process_rss_mb(pid: int) -> float:
+    try:
+        pages = int(Path(f"/proc/{pid}/statm").read_text(encoding="ascii").split()[1])
+    except (OSError, IndexError, ValueError):
+        return 0.0
+    return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def _cpu_load() -> float | None:
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except OSError:
+        return None
+
+
+class ResourceAwareAutoscaler(Autoscaler):
+    """Celery ``worker_autoscaler`` that consults :class:`ConcurrencyController`."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        settings = get_settings()
+        self.controller = ConcurrencyController(settings.celery.autoscale, settings.celery.prefetch_multiplier)
+        self._prefetch_multiplier = settings.celery.prefetch_multiplier
+        self.last_decision: ScaleDecision | None = None
+
+    def _pool_pids(self) -> list[int]:
+        workers = getattr(getattr(self.pool, "_pool", None), "_pool", None) or []
+        return [proc.pid for proc in workers if getattr(proc, "pid", None)]
+
+    def sample(self) -> ResourceSample:
+        return ResourceSample(
+            cpu_load=_cpu_load(),
+            mem_available_ratio=_read_meminfo(),
+            pool_rss_mb=sum(_process_rss_mb(pid) for pid in self._pool_pids()),
+            tool_latency=TOOL_LATENCY.snapshot(),
+        )
+
+    def _apply_prefetch(self, multiplier: int) -> None:
+        if multiplier == self._prefetch_multiplier or not self.worker:
+            return
+        consumer = self.worker.consumer
+        try:
+            consumer.prefetch_multiplier = multiplier
+            consumer.initial_prefetch_count = max(self.processes, 1) * multiplier
+            consumer.qos.set(consumer.initial_prefetch_count)
+        except Exception as exc:  # pragma: no cover - depends on consumer state
+            logger.debug("Unable to update prefetch count", exc_info=exc)
+            return
+        logger.info("Prefetch multiplier %s -> %s", self._prefetch_multiplier, multiplier)
+        self._prefetch_multiplier = multiplier
+
+    def _maybe_scale(self, req=None):
+        procs = self.processes
+        decision = self.controller.decide(
+            processes=procs,
+            reserved=self.qty,
+            min_procs=self.min_concurrency,
+            max_procs=self.max_concurrency,
+            sample=self.sample(),
+        )
+        self.last_decision = decision
+        self._apply_prefetch(decision.prefetch_multiplier)
+        if decision.processes > procs:
+            self.scale_up(decision.processes - procs)
+            return True
+        if decision.processes < procs:
+            if decision.reason == "idle":
+                # Normal shrink honours the keepalive window like the stock autoscaler.
+                self.scale_down(procs - decision.processes)
+            else:
+                logger.info("Shrinking pool under %s pressure", decision.reason)
+                self._shrink(procs - decision.processes)
+            return True
+        return None
+
+    def info(self):
+        info = super().info()
+        if self.last_decision:
+            info.update(
+                {
+                    "prefetch_multiplier": self._prefetch_multiplier,
+                    "reason": self.last_decision.reason,
+                }
+            )
+        return info
+
+
+__all__ = [
+    "ConcurrencyController",
+    "ResourceAwareAutoscaler",
+    "ResourceSample",
+    "ScaleDecision",
+    "TOOL_LATENCY",
+    "record_tool_latency",
+]
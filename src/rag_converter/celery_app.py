@@ -4,9 +4,13 @@ from __future__ import annotations
 
 import base64
 import errno
+import io
+import json
 import logging
 import os
 import shutil
+import time
+import zipfile
 from binascii import Error as BinasciiError
 from pathlib import Path
 from typing import Any, Dict, List, Optional
@@ -14,14 +18,24 @@ from urllib.parse import urlparse, parse_qs
 from urllib.request import urlopen
 from uuid import uuid4
 
-from celery import Celery, signals
+from celery import Celery, chord, group, signals
+from celery.worker.control import control_command
 from minio import Minio
 from pipeline_service.sitech_fm_client import FileUploadResult, get_sitech_fm_client
 
+from .archive import iter_archive_members, member_object_key
+from .autoscale import record_tool_latency
 from .config import Settings, get_settings
-from .monitoring import ensure_metrics_server, record_task_completed
+from .monitoring import (
+    ensure_metrics_server,
+    record_result_offload,
+    record_result_size,
+    record_task_completed,
+)
 from .plugins import REGISTRY, load_plugins_from_settings
 from .plugins.base import ConversionInput
+from .plugins.process import ProcessCancelled, cancel_task, is_cancelled, task_scope
+from .scheduling import PRIORITY_STEPS, DurationPredictor, scheduling_priority
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +49,16 @@ def _create_celery(settings: Settings) -> Celery:
         task_time_limit=settings.celery.task_time_limit_sec,
         worker_prefetch_multiplier=settings.celery.prefetch_multiplier,
     )
+    if settings.celery.autoscale.enabled:
+        app.conf.worker_autoscaler = "rag_converter.autoscale:ResourceAwareAutoscaler"
+    if settings.celery.scheduling.enabled:
+        app.conf.broker_transport_options = {
+            "priority_steps": PRIORITY_STEPS,
+            "sep": ":",
+            "queue_order_strategy": "priority",
+        }
+        # Unprioritised messages would otherwise land in step 0, ahead of every scheduled job.
+        app.conf.task_default_priority = scheduling_priority("normal", None, settings.celery.scheduling)
     return app
 
 
@@ -48,6 +72,7 @@ _TEST_ARTIFACTS_DIR_ENV = os.getenv("RAG_TEST_ARTIFACTS_DIR")
 TEST_ARTIFACTS_DIR = Path(_TEST_ARTIFACTS_DIR_ENV).expanduser() if _TEST_ARTIFACTS_DIR_ENV else None
 _MINIO_CLIENT: Optional[Minio] = None
 _SITECH_CLIENT = None
+_PREDICTOR: Optional[DurationPredictor] = None
 
 
 def _apply_storage_override(settings: Settings, override: Optional[Dict[str, Any]]) -> Settings:
@@ -321,6 +346,154 @@ def _guess_filename(file_meta: Dict[str, Any], input_path: Path | None = None) -
     return None
 
 
+def _file_reference(file_meta: Dict[str, Any]) -> Dict[str, Any]:
+    """Compact description of an input for results and logs; never carries inline payloads."""
+
+    ref = {
+        "source": _source_locator(file_meta),
+        "filename": file_meta.get("filename"),
+        "source_format": file_meta.get("source_format"),
+        "target_format": file_meta.get("target_format"),
+        "object_key": file_meta.get("object_key"),
+        "input_url": file_meta.get("input_url"),
+        "size_mb": file_meta.get("size_mb"),
+    }
+    inline = file_meta.get("base64_data")
+    if inline:
+        ref["inline_bytes"] = len(inline) * 3 // 4
+    return {key: value for key, value in ref.items() if value is not None}
+
+
+def _payload_summary(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Loggable view of a task payload without base64 data or storage credentials."""
+
+    return {
+        "task_id": payload.get("task_id"),
+        "priority": payload.get("priority"),
+        "storage_override": bool(payload.get("storage")),
+        "files": [_file_reference(file_meta) for file_meta in payload.get("files", [])],
+    }
+
+
+def _encode_json(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, default=str).encode("utf-8")
+
+
+def _offload_diagnostic(
+    data: bytes, settings: Settings, task_id: str | None, name: str, use_cache: bool = True
+) -> str:
+    object_key = f"diagnostics/{task_id or uuid4().hex}/{name}-{uuid4().hex[:8]}.json"
+    client = _get_minio_client(settings, use_cache=use_cache)
+    client.put_object(
+        settings.minio.bucket,
+        object_key,
+        io.BytesIO(data),
+        len(data),
+        content_type="application/json",
+    )
+    return object_key
+
+
+def _enforce_result_budget(
+    response: Dict[str, Any], settings: Settings, task_id: str | None, use_cache: bool = True
+) -> Dict[str, Any]:
+    """Move oversized per-file fields to object storage and record the final result size.
+
+    Fields larger than ``celery.max_inline_field_bytes`` are replaced by an object
+    key under ``diagnostics/`` (and left inline when the upload fails); the serialized
+    size of the whole result is observed on ``conversion_result_bytes`` and flagged
+    when above ``celery.max_result_bytes``.
+    """
+
+    limits = settings.celery
+    for idx, item in enumerate(response.get("results", [])):
+        for field in ("metadata", "reason"):
+            value = item.get(field)
+            if value is None:
+                continue
+            encoded = _encode_json(value)
+            if not limits.max_inline_field_bytes or len(encoded) <= limits.max_inline_field_bytes:
+                continue
+            try:
+                object_key = _offload_diagnostic(encoded, settings, task_id, f"{idx}-{field}", use_cache=use_cache)
+            except Exception as exc:  # pragma: no cover - defensive logging
+                # Keep the value inline rather than lose it; the size check below still flags the result.
+                logger.warning("Unable to offload %s for result %s: %s", field, idx, exc)
+                continue
+            record_result_offload(field)
+            item.setdefault("diagnostics", {})[field] = {"object_key": object_key, "bytes": len(encoded)}
+            if field == "reason":
+                item["reason"] = str(value)[: limits.max_inline_field_bytes // 4]
+            else:
+                item["metadata"] = {"offloaded": True}
+
+    size = len(_encode_json(response))
+    over_budget = bool(limits.max_result_bytes) and size > limits.max_result_bytes
+    record_result_size(size, over_budget=over_budget)
+    if over_budget:
+        logger.warning(
+            "Conversion result for task %s is %d bytes (limit %d)", task_id, size, limits.max_result_bytes
+        )
+    return response
+
+
+def _file_size(path: Path | None) -> Optional[int]:
+    try:
+        return path.stat().st_size if path is not None and path.is_file() else None
+    except OSError:
+        return None
+
+
+def _build_perf(
+    plugin: Any,
+    result: Any,
+    input_path: Path | None,
+    output_path: Path | None,
+    stages: Dict[str, float],
+    input_reused: bool,
+    *,
+    engine: str | None = None,
+) -> Dict[str, Any]:
+    """Merge the plugin's own ``ConversionResult.perf`` with worker-side bytes and stage timings.
+
+    ``result`` is ``None`` for passthrough and failed files, which still report what was measured.
+    """
+
+    perf: Dict[str, Any] = dict(getattr(result, "perf", None) or {})
+    plugin_stages = perf.pop("stages", None) or {}
+    perf.setdefault("engine", engine or getattr(plugin, "slug", None))
+    perf.setdefault("cache_hit", False)
+    perf.update(
+        {
+            "plugin": getattr(plugin, "slug", None),
+            "input_reused": input_reused,
+            "input_bytes": _file_size(input_path),
+            "output_bytes": _file_size(output_path),
+            "stages": {name: round(seconds, 4) for name, seconds in {**stages, **plugin_stages}.items()},
+            "total_sec": round(sum(stages.values()), 4),
+        }
+    )
+    return perf
+
+
+def _record_conversion_success(source: str, target: str, elapsed: float, perf: Dict[str, Any]) -> None:
+    """Count the success and feed the measured input size and page count to the SJF duration predictor."""
+
+    global _PREDICTOR
+    source, target = str(source).lower(), str(target).lower()
+    size_bytes = perf.get("input_bytes")
+    pages = perf.get("pages")
+    record_task_completed(
+        "success", source=source, target=target, duration_sec=elapsed, size_bytes=size_bytes, pages=pages
+    )
+    if not SETTINGS.celery.scheduling.enabled:
+        return
+    if _PREDICTOR is None:
+        _PREDICTOR = DurationPredictor(SETTINGS)
+    size_mb = size_bytes / (1024 * 1024) if size_bytes is not None else None
+    _PREDICTOR.observe(source, target, size_mb, pages, elapsed)
+
+
 def _ensure_worker_metrics_started() -> None:
     """Start worker-side metrics exactly once per process."""
 
@@ -337,27 +510,120 @@ def _ensure_worker_metrics_started() -> None:
     _worker_metrics_started = True
 
 
+def _order_targets(source: str, targets: List[str]) -> List[str]:
+    """Dedupe targets and put those that can feed another requested target first."""
+
+    pairs = {(p.source_format.lower(), p.target_format.lower()) for p in REGISTRY.list()}
+    ordered = list(dict.fromkeys(str(t).strip().lower() for t in targets if t and str(t).strip()))
+
+    def _feeds_other(target: str) -> bool:
+        return any(
+            (target, other) in pairs and (source, other) not in pairs for other in ordered if other != target
+        )
+
+    return sorted(ordered, key=lambda target: 0 if _feeds_other(target) else 1)
+
+
+def _expand_targets(files: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """One entry per (file, target); entries of a multi-target file share a ``_group`` id."""
+
+    expanded: List[Dict[str, Any]] = []
+    for group_id, file_meta in enumerate(files):
+        targets = file_meta.get("target_formats")
+        if not targets:
+            expanded.append(file_meta)
+            continue
+        source = str(file_meta.get("source_format") or "").strip().lower()
+        for target in _order_targets(source, targets):
+            expanded.append({**file_meta, "target_format": target, "target_formats": None, "_group": group_id})
+    return expanded
+
+
 @signals.worker_ready.connect
 def _on_worker_ready(sender=None, **kwargs):  # type: ignore[override]
     _ensure_worker_metrics_started()
 
 
+def _payload_task_id(request: Any) -> Optional[str]:
+    args = getattr(request, "args", None) or ()
+    if args and isinstance(args[0], dict) and args[0].get("task_id"):
+        return args[0]["task_id"]
+    return getattr(request, "id", None)
+
+
+@control_command(args=[("task_id", str)], signature="<task_id>")
+def cancel_conversion(state, task_id: str) -> Dict[str, Any]:  # pragma: no cover - runs in the worker
+    """Remote control: kill the external tools of ``task_id`` running on this worker."""
+
+    return {"ok": {"task_id": task_id, "terminated": cancel_task(task_id)}}
+
+
+@signals.task_revoked.connect
+def _on_task_revoked(request=None, terminated=None, **kwargs):  # type: ignore[override]
+    # Tools run in their own sessions, so terminating the pool child does not stop them.
+    task_id = _payload_task_id(request)
+    if task_id:
+        cancel_task(task_id)
+
+
 @celery_app.task(name="conversion.handle_batch")
 def handle_conversion_task(payload: Dict[str, Any]) -> Dict[str, Any]:
     _ensure_worker_metrics_started()
+    with task_scope(payload.get("task_id")):
+        return _convert_batch(payload)
+
 
+def _convert_batch(payload: Dict[str, Any]) -> Dict[str, Any]:
     storage_override = payload.get("storage")
     task_settings = _apply_storage_override(SETTINGS, storage_override)
     use_cache = not bool(storage_override)
 
     task_id = payload.get("task_id")
-    files: List[Dict[str, Any]] = payload.get("files", [])
+    files: List[Dict[str, Any]] = _expand_targets(payload.get("files", []))
     results: List[Dict[str, Any]] = []
+    # Multi-target files are downloaded once and may reuse an earlier target's output.
+    materialized: Dict[int, Path] = {}
+    intermediates: Dict[tuple[int, str], Path] = {}
+
+    def _prepare_input(file_meta: Dict[str, Any]) -> Path:
+        group_id = file_meta.get("_group")
+        if group_id is None:
+            return _materialize_input(file_meta, task_settings, use_cache=use_cache)
+        if group_id not in materialized:
+            materialized[group_id] = _materialize_input(file_meta, task_settings, use_cache=use_cache)
+        return materialized[group_id]
+
+    def _find_intermediate(group_id: Optional[int], target: str) -> Optional[tuple[str, Path]]:
+        if group_id is None:
+            return None
+        for (owner, fmt), path in intermediates.items():
+            if owner != group_id:
+                continue
+            try:
+                REGISTRY.get(fmt, target)
+            except KeyError:
+                continue
+            return fmt, path
+        return None
 
-    logger.debug("Starting conversion task %s with %d files", task_id, len(files))   
-    logger.debug("Conversion task payload: %s", payload)
+    logger.debug("Starting conversion task %s with %d files", task_id, len(files))
+    logger.debug("Conversion task payload: %s", _payload_summary(payload))
 
     for file_meta in files:
+        if is_cancelled(task_id):
+            record_task_completed("failed")
+            results.append(
+                {
+                    "source": file_meta.get("source_format"),
+                    "target": file_meta.get("target_format"),
+                    "status": "cancelled",
+                    "reason": "task was cancelled",
+                    "filename": _guess_filename(file_meta),
+                    "metadata": {"perf": _build_perf(None, None, None, None, {}, False)},
+                }
+            )
+            continue
+
         # 对于空的转换请求，直接跳过 source，但允许 target 为空透传到下游（将得到不支持格式的失败结果）
         def _is_missing(value: Any) -> bool:
             if value is None:
@@ -395,15 +661,18 @@ def handle_conversion_task(payload: Dict[str, Any]) -> Dict[str, Any]:
                     "status": "ignored",
                     "reason": "no source_format provided",
                     "filename": file_meta.get("filename"),
-                    "file_meta": file_meta,
+                    "file_ref": _file_reference(file_meta),
+                    "metadata": {"perf": _build_perf(None, None, None, None, {}, False)},
                 }
             )
             continue
 
         # Passthrough: same source/target (including empty target treated as source), just upload original as output
         if target_norm and source_norm == target_norm:
+            file_started = time.perf_counter()
+            input_reused = file_meta.get("_group") in materialized
             try:
-                input_path = _materialize_input(file_meta, task_settings, use_cache=use_cache)
+                input_path = _prepare_input(file_meta)
                 result_filename = _guess_filename(file_meta, input_path)
                 if input_path.is_dir():
                     raise ValueError(f"Input path is a directory: {input_path}")
@@ -417,10 +686,23 @@ def handle_conversion_task(payload: Dict[str, Any]) -> Dict[str, Any]:
                         "status": "failed",
                         "reason": f"Input preparation failed (source={_source_locator(file_meta)}): {exc}",
                         "filename": _guess_filename(file_meta),
+                        "metadata": {
+                            "perf": _build_perf(
+                                None,
+                                None,
+                                None,
+                                None,
+                                {"materialize": time.perf_counter() - file_started},
+                                input_reused,
+                                engine="passthrough",
+                            )
+                        },
                     }
                 )
                 continue
 
+            upload_started = time.perf_counter()
+            stages = {"materialize": upload_started - file_started}
             output_path = input_path
             output_object = _upload_output(output_path, task_settings, task_id, use_cache=use_cache)
             sitech_input_fileid = file_meta.get("sitech_attach_id") or file_meta.get("sitech_fm_fileid")
@@ -431,6 +713,8 @@ def handle_conversion_task(payload: Dict[str, Any]) -> Dict[str, Any]:
             download_url = _build_download_url(output_object, task_settings, use_cache=use_cache)
 
             _store_test_artifact(output_path, task_id)
+            stages["upload"] = time.perf_counter() - upload_started
+            perf = _build_perf(None, None, input_path, output_path, stages, input_reused, engine="passthrough")
 
             results.append(
                 {
@@ -442,18 +726,22 @@ def handle_conversion_task(payload: Dict[str, Any]) -> Dict[str, Any]:
                     "download_url": download_url,
                     "sitech_fm_fileid": sitech_input_fileid,
                     "sitech_fm_output_fileid": sitech_output_fileid,
-                    "metadata": {"passthrough": True},
+                    "metadata": {"passthrough": True, "perf": perf},
                     "filename": result_filename,
                 }
             )
             record_task_completed("success")
             continue
 
+        intermediate = None
         try:
             plugin = REGISTRY.get(source, target_for_lookup)
         except KeyError as exc:
+            intermediate = _find_intermediate(file_meta.get("_group"), target_norm)
+            if intermediate is not None:
+                plugin = REGISTRY.get(intermediate[0], target_norm)
             # 只有显式目标且非透传时才报不支持；空目标已被透传处理
-            if not missing_target and target_norm != source_norm:
+            elif not missing_target and target_norm != source_norm:
                 logger.exception("Unsupported format: %s -> %s", source, target)
                 record_task_completed("failed")
                 results.append(
@@ -463,17 +751,22 @@ def handle_conversion_task(payload: Dict[str, Any]) -> Dict[str, Any]:
                         "status": "failed",
                         "reason": f"Unsupported format {source}->{target} (source={_source_locator(file_meta)})",
                         "filename": _guess_filename(file_meta),
+                        "metadata": {"perf": _build_perf(None, None, None, None, {}, False)},
                     }
                 )
                 continue
-            plugin = None
+            else:
+                plugin = None
 
+        file_started = time.perf_counter()
+        input_reused = intermediate is not None or file_meta.get("_group") in materialized
         try:
-            input_path = _materialize_input(file_meta, task_settings, use_cache=use_cache)
+            input_path = intermediate[1] if intermediate else _prepare_input(file_meta)
             result_filename = _guess_filename(file_meta, input_path)
         except Exception as exc:  # pragma: no cover - defensive logging
             logger.exception("Failed to prepare input for %s -> %s", source, target)
             record_task_completed("failed")
+            stages = {"materialize": time.perf_counter() - file_started}
             results.append(
                 {
                     "source": source,
@@ -481,12 +774,13 @@ def handle_conversion_task(payload: Dict[str, Any]) -> Dict[str, Any]:
                     "status": "failed",
                     "reason": f"Input preparation failed (source={_source_locator(file_meta)}): {exc}",
                     "filename": _guess_filename(file_meta),
+                    "metadata": {"perf": _build_perf(plugin, None, None, None, stages, input_reused)},
                 }
             )
             continue
 
         conversion_input = ConversionInput(
-            source_format=source,
+            source_format=intermediate[0] if intermediate else source,
             target_format=target,
             input_path=input_path,
             input_url=file_meta.get("input_url"),
@@ -497,10 +791,22 @@ def handle_conversion_task(payload: Dict[str, Any]) -> Dict[str, Any]:
                 "duration_seconds": file_meta.get("duration_seconds"),
             },
         )
+        result = None
+        stages: Dict[str, float] = {}
         try:
+            started = time.perf_counter()
+            stages["materialize"] = started - file_started
             result = plugin.convert(conversion_input)
+            stages["convert"] = time.perf_counter() - started
+            record_tool_latency(plugin, stages["convert"])
+            upload_started = time.perf_counter()
             output_path = Path(result.output_path) if result.output_path else None
             output_object = result.object_key
+            metadata = result.metadata
+            if intermediate:
+                metadata = {**(metadata or {}), "intermediate": intermediate[0]}
+            if file_meta.get("_group") is not None and output_path is not None:
+                intermediates[(file_meta["_group"], target_norm)] = output_path
             if not output_object:
                 try:
                     output_object = _upload_output(
@@ -517,6 +823,11 @@ def handle_conversion_task(payload: Dict[str, Any]) -> Dict[str, Any]:
             download_url = _build_download_url(output_object, task_settings, use_cache=use_cache)
 
             _store_test_artifact(output_path, task_id)
+            stages["upload"] = time.perf_counter() - upload_started
+            metadata = {
+                **(metadata or {}),
+                "perf": _build_perf(plugin, result, input_path, output_path, stages, input_reused),
+            }
 
             results.append(
                 {
@@ -528,25 +839,192 @@ def handle_conversion_task(payload: Dict[str, Any]) -> Dict[str, Any]:
                     "download_url": download_url,
                     "sitech_fm_fileid": sitech_input_fileid,
                     "sitech_fm_output_fileid": sitech_output_fileid,
-                    "metadata": result.metadata,
+                    "metadata": metadata,
                     "filename": result_filename,
                 }
             )
-            record_task_completed("success")
+            _record_conversion_success(
+                conversion_input.source_format, target, time.perf_counter() - file_started, metadata["perf"]
+            )
         except Exception as exc:  # pragma: no cover - defensive logging
             logger.exception("Conversion failed for %s -> %s", source, target)
             record_task_completed("failed")
+            # Time not yet attributed belongs to the stage that raised.
+            failed_stage = "convert" if result is None else "upload"
+            stages[failed_stage] = stages.get(failed_stage, 0.0) + max(
+                0.0, time.perf_counter() - file_started - sum(stages.values())
+            )
             results.append(
                 {
                     "source": source,
                     "target": target,
-                    "status": "failed",
+                    "status": "cancelled" if isinstance(exc, ProcessCancelled) else "failed",
                     "reason": str(exc),
                     "filename": _guess_filename(file_meta),
+                    "metadata": {"perf": _build_perf(plugin, result, input_path, None, stages, input_reused)},
                 }
             )
 
-    return {
-        "task_id": task_id,
-        "results": results,
-    }
+    return _enforce_result_budget(
+        {
+            "task_id": task_id,
+            "results": results,
+        },
+        task_settings,
+        task_id,
+        use_cache=use_cache,
+    )
+
+
+def _default_member_target(source: str, requested: str | None) -> Optional[str]:
+    """Requested target when the member format supports it, else the first registered one."""
+
+    pairs = [(p.source_format.lower(), p.target_format.lower()) for p in REGISTRY.list()]
+    if requested and (source, requested.lower()) in pairs:
+        return requested.lower()
+    for plugin_source, plugin_target in pairs:
+        if plugin_source == source:
+            return plugin_target
+    return None
+
+
+def _expand_archive(
+    payload: Dict[str, Any], settings: Settings, task_id: str, use_cache: bool = True
+) -> tuple[List[tuple[Dict[str, Any], Dict[str, Any]]], List[tuple[int, str]], List[Dict[str, Any]]]:
+    """Stream archive members to object storage and build one sub-task payload per member.
+
+    Returns ``(subtasks, members, skipped)``: ``subtasks`` pairs each member payload
+    with its ``apply_async`` options, ``members`` is the matching ``(index, name)``
+    list and ``skipped`` holds ready-made results for members that are not converted.
+    """
+
+    archive_meta = payload["files"][0]
+    limits = settings.file_limits
+    archive_path = _materialize_input(archive_meta, settings, use_cache=use_cache)
+    client = _get_minio_client(settings, use_cache=use_cache)
+    scheduling = settings.celery.scheduling
+
+    subtasks: List[tuple[Dict[str, Any], Dict[str, Any]]] = []
+    members: List[tuple[int, str]] = []
+    skipped: List[Dict[str, Any]] = []
+    with zipfile.ZipFile(archive_path) as archive:
+        # Check limits from the central directory before anything is uploaded.
+        entries = list(iter_archive_members(archive))
+        if len(entries) > limits.max_archive_members:
+            raise ValueError(f"Archive has more than {limits.max_archive_members} members")
+        if sum(member.size_mb for member in entries) > limits.max_archive_uncompressed_mb:
+            raise ValueError(f"Archive expands beyond {limits.max_archive_uncompressed_mb} MB")
+
+        for member in entries:
+            source = member.source_format
+            target = _default_member_target(source, archive_meta.get("target_format")) if source else None
+            entry = {
+                "source": source,
+                "target": target,
+                "filename": member.filename,
+                "archive_index": member.index,
+                "archive_member": member.name,
+            }
+            if target is None:
+                skipped.append({**entry, "status": "ignored", "reason": "no conversion available for member"})
+                continue
+            per_limit = limits.per_format_max_size_mb.get(source, limits.default_max_size_mb)
+            if member.size_mb > per_limit:
+                skipped.append({**entry, "status": "failed", "reason": f"member exceeds {per_limit} MB limit"})
+                continue
+
+            object_key = member_object_key(task_id, member)
+            with archive.open(member.info) as stream:
+                client.put_object(settings.minio.bucket, object_key, stream, member.info.file_size)
+
+            member_meta = {
+                "source_format": source,
+                "target_format": target,
+                "object_key": object_key,
+                "filename": member.filename,
+                "size_mb": member.size_mb,
+            }
+            options: Dict[str, Any] = {}
+            if scheduling.enabled:
+                options["priority"] = scheduling_priority(payload.get("priority", "normal"), None, scheduling)
+            subtasks.append(
+                (
+                    {
+                        "task_id": task_id,
+                        "files": [member_meta],
+                        "priority": payload.get("priority"),
+                        "storage": payload.get("storage"),
+                    },
+                    options,
+                )
+            )
+            members.append((member.index, member.name))
+    return subtasks, members, skipped
+
+
+@celery_app.task(name="conversion.aggregate_archive")
+def aggregate_archive_results(
+    results: List[Dict[str, Any]],
+    task_id: str,
+    members: List[List[Any]],
+    skipped: List[Dict[str, Any]],
+    storage: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Chord callback: merge member sub-task results in archive order."""
+
+    merged = list(skipped)
+    for (index, name), sub in zip(members, results or []):
+        for item in (sub or {}).get("results", []):
+            merged.append({**item, "archive_index": index, "archive_member": name})
+    merged.sort(key=lambda item: item.get("archive_index", 0))
+
+    task_settings = _apply_storage_override(SETTINGS, storage)
+    return _enforce_result_budget(
+        {"task_id": task_id, "results": merged, "archive": {"members": len(members) + len(skipped)}},
+        task_settings,
+        task_id,
+        use_cache=not bool(storage),
+    )
+
+
+@celery_app.task(name="conversion.expand_archive", bind=True)
+def expand_archive_task(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Fan an archive out into one conversion sub-task per member.
+
+    The task replaces itself with ``chord(members) -> aggregate_archive``, so the
+    aggregated result is stored under the parent task id.
+    """
+
+    _ensure_worker_metrics_started()
+
+    storage_override = payload.get("storage")
+    task_settings = _apply_storage_override(SETTINGS, storage_override)
+    use_cache = not bool(storage_override)
+    task_id = payload.get("task_id") or self.request.id
+    archive_meta = payload["files"][0]
+
+    try:
+        subtasks, members, skipped = _expand_archive(payload, task_settings, task_id, use_cache=use_cache)
+    except Exception as exc:
+        logger.exception("Failed to expand archive for task %s", task_id)
+        record_task_completed("failed")
+        return {
+            "task_id": task_id,
+            "results": [
+                {
+                    "source": archive_meta.get("source_format"),
+                    "target": archive_meta.get("target_format"),
+                    "status": "failed",
+                    "reason": f"Archive expansion failed (source={_source_locator(archive_meta)}): {exc}",
+                    "filename": _guess_filename(archive_meta),
+                }
+            ],
+        }
+
+    logger.debug("Archive task %s expanded into %d sub-tasks", task_id, len(subtasks))
+    if not subtasks:
+        return aggregate_archive_results([], task_id, members, skipped, storage_override)
+
+    header = group(handle_conversion_task.signature((sub,), **options) for sub, options in subtasks)
+    callback = aggregate_archive_results.s(task_id=task_id, members=members, skipped=skipped, storage=storage_override)
+    return self.replace(chord(header, callback))
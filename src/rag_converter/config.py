@@ -16,6 +16,8 @@ class FileLimitSettings(BaseModel):
     per_format_max_size_mb: Dict[str, int] = Field(default_factory=dict)
     max_total_upload_size_mb: int = Field(500, ge=1)
     max_files_per_task: int = Field(10, ge=1)
+    max_archive_members: int = Field(500, ge=1)
+    max_archive_uncompressed_mb: int = Field(4096, ge=1)
 
 
 class LoggingSettings(BaseModel):
@@ -59,12 +61,70 @@ class APIAuthSettings(BaseModel):
     header_key: str = "X-Key"
 
 
+class WorkerAutoscaleSettings(BaseModel):
+    enabled: bool = False
+    max_cpu_load: float = Field(0.9, gt=0)
+    min_mem_available_ratio: float = Field(0.15, ge=0, le=1)
+    max_pool_rss_mb: int = Field(0, ge=0)
+    latency_slowdown_factor: float = Field(2.0, gt=1)
+    min_latency_samples: int = Field(5, ge=1)
+    grow_step: int = Field(1, ge=1)
+    shrink_step: int = Field(1, ge=1)
+    pressure_prefetch_multiplier: int = Field(1, ge=1)
+
+
+class SchedulingSettings(BaseModel):
+    enabled: bool = True
+    redis_url: str | None = None
+    key_prefix: str = "conversion:duration"
+    min_samples: int = Field(5, ge=1)
+    ridge: float = Field(1e-3, ge=0)
+    prior_base_sec: float = Field(2.0, ge=0)
+    prior_sec_per_mb: float = Field(1.5, ge=0)
+    short_job_sec: float = Field(30, gt=0)
+    long_job_sec: float = Field(300, gt=0)
+
+
 class CeleryQueueSettings(BaseModel):
     broker_url: str = "redis://localhost:6379/0"
     result_backend: str = "redis://localhost:6379/1"
     default_queue: str = "conversion"
     task_time_limit_sec: int = 300
     prefetch_multiplier: int = 4
+    max_result_bytes: int = Field(64 * 1024, ge=0)
+    max_inline_field_bytes: int = Field(4 * 1024, ge=0)
+    autoscale: WorkerAutoscaleSettings = WorkerAutoscaleSettings()
+    scheduling: SchedulingSettings = SchedulingSettings()
+
+
+class VideoEncodeSettings(BaseModel):
+    segment_parallel: bool = True
+    min_duration_sec: float = Field(600, ge=0)
+    min_segment_sec: float = Field(60, gt=0)
+    max_segments: int = Field(0, ge=0)
+    max_parallel: int = Field(0, ge=0)
+
+
+class ProcessSupervisorSettings(BaseModel):
+    """Limits for external tools (soffice, ffmpeg, ...); per-tool maps are keyed by plugin slug or executable."""
+
+    default_timeout_sec: float = Field(270, gt=0)
+    default_memory_mb: int = Field(0, ge=0)
+    timeouts_sec: dict[str, float] = Field(default_factory=dict)
+    memory_mb: dict[str, int] = Field(default_factory=dict)
+    kill_grace_sec: float = Field(3, ge=0)
+
+
+class MinerUSettings(BaseModel):
+    endpoints: list[str] = Field(default_factory=lambda: ["http://127.0.0.1:8100"])
+    backend: str = "pipeline"
+    parse_method: str = "auto"
+    lang: str = "ch"
+    shard_pages: int = Field(16, ge=1)
+    max_inflight_per_endpoint: int = Field(2, ge=1)
+    retry_budget: int = Field(4, ge=0)
+    timeout_sec: float = Field(600, gt=0)
+    cache_dir: str | None = "./.cache/mineru"
 
 
 class RateLimitSettings(BaseModel):
@@ -92,6 +152,9 @@ class Settings(BaseSettings):
     api_auth: APIAuthSettings = APIAuthSettings()
     celery: CeleryQueueSettings = CeleryQueueSettings()
     rate_limit: RateLimitSettings = RateLimitSettings()
+    mineru: MinerUSettings = MinerUSettings()
+    video: VideoEncodeSettings = VideoEncodeSettings()
+    processes: ProcessSupervisorSettings = ProcessSupervisorSettings()
 
     @staticmethod
     def load_yaml_config_file(file_path: str | Path | None) -> Dict[str, Any]:
@@ -8,7 +8,7 @@ from urllib.parse import urlparse
 
 from minio import Minio
 from minio.error import S3Error
-from prometheus_client import Counter, Gauge, start_http_server
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
 import redis
 from redis.exceptions import RedisError
 
@@ -34,6 +34,38 @@ CELERY_WORKERS = Gauge(
     "conversion_active_celery_workers",
     "Number of alive Celery workers responding to ping",
 )
+TASK_DURATION = Histogram(
+    "conversion_file_duration_seconds",
+    "Wall time to convert one file, from input materialization to upload",
+    labelnames=("source", "target"),
+    buckets=(0.5, 1, 2, 5, 10, 30, 60, 120, 300, 600, 1800),
+)
+TASK_INPUT_BYTES = Histogram(
+    "conversion_file_input_bytes",
+    "Measured size of the input file of each successful conversion",
+    labelnames=("source", "target"),
+    buckets=(65536, 262144, 1048576, 4194304, 16777216, 67108864, 268435456, 1073741824),
+)
+TASK_PAGES = Histogram(
+    "conversion_file_pages",
+    "Pages converted per file, for paged sources",
+    labelnames=("source", "target"),
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+RESULT_BYTES = Histogram(
+    "conversion_result_bytes",
+    "Serialized size of conversion task results written to the result backend",
+    buckets=(1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+RESULT_FIELDS_OFFLOADED = Counter(
+    "conversion_result_fields_offloaded_total",
+    "Result fields moved to object storage because they exceeded the inline budget",
+    labelnames=("field",),
+)
+RESULT_OVER_BUDGET = Counter(
+    "conversion_result_over_budget_total",
+    "Conversion results still larger than max_result_bytes after offloading",
+)
 
 _metrics_started = False
 
@@ -51,8 +83,34 @@ def record_task_accepted(priority: str) -> None:
     TASKS_ACCEPTED.labels(priority=priority).inc()
 
 
-def record_task_completed(status: str) -> None:
+def record_task_completed(
+    status: str,
+    *,
+    source: str | None = None,
+    target: str | None = None,
+    duration_sec: float | None = None,
+    size_bytes: int | None = None,
+    pages: int | None = None,
+) -> None:
     TASKS_COMPLETED.labels(status=status).inc()
+    if not (source and target):
+        return
+    if duration_sec is not None:
+        TASK_DURATION.labels(source=source, target=target).observe(duration_sec)
+    if size_bytes is not None:
+        TASK_INPUT_BYTES.labels(source=source, target=target).observe(size_bytes)
+    if pages is not None:
+        TASK_PAGES.labels(source=source, target=target).observe(pages)
+
+
+def record_result_size(size_bytes: int, *, over_budget: bool = False) -> None:
+    RESULT_BYTES.observe(size_bytes)
+    if over_budget:
+        RESULT_OVER_BUDGET.inc()
+
+
+def record_result_offload(field: str) -> None:
+    RESULT_FIELDS_OFFLOADED.labels(field=field).inc()
 
 
 def _check_redis(settings: Settings) -> str:
@@ -63,7 +121,11 @@ def _check_redis(settings: Settings) -> str:
             socket_timeout=2,
         )
         client.ping()
-        queue_depth = client.llen(settings.celery.default_queue)
+        queue = settings.celery.default_queue
+        queue_depth = client.llen(queue)
+        if settings.celery.scheduling.enabled:
+            # The Redis transport keeps one list per non-zero priority step.
+            queue_depth += sum(client.llen(f"{queue}:{step}") for step in range(1, 10))
         QUEUE_DEPTH.set(queue_depth)
         return "ok"
     except RedisError as exc:
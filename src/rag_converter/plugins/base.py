@@ -24,6 +24,9 @@ class ConversionResult:
     output_url: str | None = None
     object_key: str | None = None
     metadata: Dict[str, Any] | None = None
+    # Structured cost facts: ``engine`` plus optional ``pages``, ``duration_sec``,
+    # ``cache_hit`` and ``stages`` ({stage: seconds}); the worker adds bytes and timings.
+    perf: Dict[str, Any] | None = None
 
 
 class ConversionPlugin(ABC):
@@ -2,11 +2,11 @@
 
 from __future__ import annotations
 
-import subprocess
 from pathlib import Path
 from typing import Type
 
 from ..base import ConversionInput, ConversionPlugin, ConversionResult
+from ..process import run_command
 from ..registry import REGISTRY
 
 
@@ -38,10 +38,10 @@ class _BaseAudioToMp3Plugin(ConversionPlugin):
         if duration:
             cmd.insert(6, str(duration))
             cmd.insert(6, "-t")
-        subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        run_command(cmd, plugin=self.slug)
 
         metadata = {"note": f"Converted {self.source_format}->mp3 via FFmpeg"}
-        return ConversionResult(output_path=output_path, metadata=metadata)
+        return ConversionResult(output_path=output_path, metadata=metadata, perf={"engine": "ffmpeg-transcode"})
 
 
 class WavToMp3Plugin(_BaseAudioToMp3Plugin):
@@ -2,11 +2,11 @@
 
 from __future__ import annotations
 
-import subprocess
 from pathlib import Path
 from tempfile import TemporaryDirectory
 
 from ..base import ConversionInput, ConversionPlugin, ConversionResult
+from ..process import run_command
 from ..registry import REGISTRY
 
 
@@ -34,7 +34,7 @@ class DocToDocxPlugin(ConversionPlugin):
                 str(tmpdir_path),
                 str(input_path),
             ]
-            subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            run_command(cmd, plugin=self.slug)
 
             output_candidate = tmpdir_path / (input_path.stem + ".docx")
             if not output_candidate.exists():
@@ -44,7 +44,7 @@ class DocToDocxPlugin(ConversionPlugin):
             output_candidate.replace(final_output)
 
         metadata = {"note": "Converted via LibreOffice soffice"}
-        return ConversionResult(output_path=final_output, metadata=metadata)
+        return ConversionResult(output_path=final_output, metadata=metadata, perf={"engine": "soffice"})
 
 
 REGISTRY.register(DocToDocxPlugin)
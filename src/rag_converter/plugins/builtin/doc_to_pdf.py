@@ -2,11 +2,11 @@
 
 from __future__ import annotations
 
-import subprocess
 from pathlib import Path
 from tempfile import TemporaryDirectory
 
 from ..base import ConversionInput, ConversionPlugin, ConversionResult
+from ..process import run_command
 from ..registry import REGISTRY
 from ..utils import trim_pdf_pages
 
@@ -35,7 +35,7 @@ class DocToPdfPlugin(ConversionPlugin):
                 str(tmpdir_path),
                 str(input_path),
             ]
-            subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            run_command(cmd, plugin=self.slug)
 
             output_candidate = tmpdir_path / (input_path.stem + ".pdf")
             if not output_candidate.exists():
@@ -51,7 +51,7 @@ class DocToPdfPlugin(ConversionPlugin):
             trim_pdf_pages(final_output, int(page_limit))
 
         metadata = {"note": "Converted via LibreOffice soffice"}
-        return ConversionResult(output_path=final_output, metadata=metadata)
+        return ConversionResult(output_path=final_output, metadata=metadata, perf={"engine": "soffice"})
 
 
 REGISTRY.register(DocToPdfPlugin)
@@ -0,0 +1,192 @@
+"""Convert docx straight to Markdown by streaming the OOXML package (no LibreOffice)."""
+
+from __future__ import annotations
+
+import re
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterator, List
+from xml.etree import ElementTree as ET
+
+from ..base import ConversionInput, ConversionPlugin, ConversionResult
+from ..registry import REGISTRY
+from ..utils import markdown_table
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_P, _TBL, _TR, _TC = f"{_W}p", f"{_W}tbl", f"{_W}tr", f"{_W}tc"
+_T, _TAB, _BR = f"{_W}t", f"{_W}tab", f"{_W}br"
+_PAGE_BREAK = f"{_W}lastRenderedPageBreak"
+_VAL, _TYPE = f"{_W}val", f"{_W}type"
+_HEADING_NAME = re.compile(r"^heading\s*(\d)$", re.IGNORECASE)
+
+
+def _style_heading_levels(archive: zipfile.ZipFile) -> Dict[str, int]:
+    """Map paragraph style ids to heading levels using names, outline levels and ``basedOn``."""
+
+    try:
+        root = ET.fromstring(archive.read("word/styles.xml"))
+    except KeyError:
+        return {}
+
+    direct: Dict[str, int] = {}
+    parents: Dict[str, str] = {}
+    for style in root.iter(f"{_W}style"):
+        style_id = style.get(f"{_W}styleId")
+        if not style_id:
+            continue
+        name_el = style.find(f"{_W}name")
+        name = (name_el.get(_VAL) if name_el is not None else "") or ""
+        match = _HEADING_NAME.match(name.strip())
+        outline = style.find(f"{_W}pPr/{_W}outlineLvl")
+        if name.strip().lower() == "title":
+            direct[style_id] = 1
+        elif match:
+            direct[style_id] = int(match.group(1))
+        elif outline is not None and (outline.get(_VAL) or "").isdigit() and int(outline.get(_VAL)) < 9:
+            direct[style_id] = int(outline.get(_VAL)) + 1
+        based_on = style.find(f"{_W}basedOn")
+        if based_on is not None and based_on.get(_VAL):
+            parents[style_id] = based_on.get(_VAL)
+
+    levels = dict(direct)
+    for style_id in parents:
+        seen = set()
+        current = style_id
+        while current not in direct and current in parents and current not in seen:
+            seen.add(current)
+            current = parents[current]
+        if current in direct:
+            levels[style_id] = direct[current]
+    return levels
+
+
+def _heading_level(paragraph: ET.Element, styles: Dict[str, int]) -> int | None:
+    outline = paragraph.find(f"{_W}pPr/{_W}outlineLvl")
+    if outline is not None and (outline.get(_VAL) or "").isdigit() and int(outline.get(_VAL)) < 9:
+        return int(outline.get(_VAL)) + 1
+    style = paragraph.find(f"{_W}pPr/{_W}pStyle")
+    if style is None:
+        return None
+    style_id = style.get(_VAL) or ""
+    if style_id in styles:
+        return styles[style_id]
+    # Packages without styles.xml still use the built-in ids ("Heading1", "Title").
+    match = _HEADING_NAME.match(style_id)
+    if match:
+        return int(match.group(1))
+    return 1 if style_id.lower() == "title" else None
+
+
+def _paragraph_text(paragraph: ET.Element) -> str:
+    parts: List[str] = []
+    for node in paragraph.iter():
+        if node.tag == _T and node.text:
+            parts.append(node.text)
+        elif node.tag == _TAB:
+            parts.append("\t")
+        elif node.tag == _BR and node.get(_TYPE) not in {"page", "column"}:
+            parts.append("\n")
+    return "".join(parts).strip()
+
+
+def _starts_new_page(paragraph: ET.Element) -> bool:
+    if paragraph.find(f".//{_PAGE_BREAK}") is not None:
+        return True
+    return any(br.get(_TYPE) == "page" for br in paragraph.iter(_BR))
+
+
+def _paragraph_markdown(paragraph: ET.Element, styles: Dict[str, int]) -> str:
+    text = _paragraph_text(paragraph)
+    if not text:
+        return ""
+    level = _heading_level(paragraph, styles)
+    if level:
+        return f"{'#' * min(level, 6)} {' '.join(text.split())}"
+    num_pr = paragraph.find(f"{_W}pPr/{_W}numPr")
+    if num_pr is not None:
+        ilvl = num_pr.find(f"{_W}ilvl")
+        depth = int(ilvl.get(_VAL) or 0) if ilvl is not None else 0
+        return f"{'  ' * depth}- {' '.join(text.split())}"
+    return text
+
+
+def iter_docx_blocks(path: Path, page_limit: int | None = None) -> Iterator[str]:
+    """Yield Markdown blocks in document order while streaming ``word/document.xml``.
+
+    Pages are approximated from rendered/explicit page breaks, so ``page_limit``
+    stops early on documents Word has saved with layout information.
+    """
+
+    with zipfile.ZipFile(path) as archive:
+        styles = _style_heading_levels(archive)
+        table_depth = 0
+        rows: List[List[str]] = []
+        row: List[str] = []
+        cell: List[str] = []
+        page = 1
+        with archive.open("word/document.xml") as handle:
+            for event, elem in ET.iterparse(handle, events=("start", "end")):
+                tag = elem.tag
+                if event == "start":
+                    if tag == _TBL:
+                        table_depth += 1
+                    continue
+
+                if tag == _P:
+                    if table_depth:
+                        text = _paragraph_text(elem)
+                        if text:
+                            cell.append(text)
+                    else:
+                        if _starts_new_page(elem):
+                            page += 1
+                            if page_limit and page > page_limit:
+                                return
+                        block = _paragraph_markdown(elem, styles)
+                        if block:
+                            yield block
+                    elem.clear()
+                elif tag == _TC and table_depth == 1:
+                    row.append(" ".join(cell))
+                    cell = []
+                elif tag == _TR and table_depth == 1:
+                    rows.append(row)
+                    row = []
+                elif tag == _TBL:
+                    table_depth -= 1
+                    if not table_depth:
+                        table = markdown_table(rows)
+                        rows = []
+                        elem.clear()
+                        if table:
+                            yield table
+
+
+class DocxToMarkdownPlugin(ConversionPlugin):
+    slug = "docx-to-md"
+    source_format = "docx"
+    target_format = "md"
+
+    def convert(self, payload: ConversionInput) -> ConversionResult:
+        if not payload.input_path:
+            raise ValueError("Conversion requires local input_path for docx files")
+
+        input_path = Path(payload.input_path)
+        if not input_path.exists():
+            raise FileNotFoundError(f"Input file not found: {input_path}")
+
+        page_limit = None
+        if payload.metadata:
+            page_limit = payload.metadata.get("page_limit")
+
+        blocks = list(iter_docx_blocks(input_path, int(page_limit) if page_limit else None))
+        md = "\n\n".join(blocks) if blocks else "(空文档)"
+
+        output_path = input_path.with_suffix(".md")
+        output_path.write_text(md, encoding="utf-8")
+
+        metadata = {"note": "Converted docx to Markdown from OOXML"}
+        return ConversionResult(output_path=output_path, metadata=metadata, perf={"engine": "ooxml-stream"})
+
+
+REGISTRY.register(DocxToMarkdownPlugin)
@@ -30,7 +30,7 @@ class HtmlToMarkdownPlugin(ConversionPlugin):
         output_path.write_text(markdown, encoding="utf-8")
 
         metadata = {"note": "Converted HTML to Markdown"}
-        return ConversionResult(output_path=output_path, metadata=metadata)
+        return ConversionResult(output_path=output_path, metadata=metadata, perf={"engine": "markdownify"})
 
 
 REGISTRY.register(HtmlToMarkdownPlugin)
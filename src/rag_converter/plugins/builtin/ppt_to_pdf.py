@@ -2,16 +2,16 @@
 
 from __future__ import annotations
 
-import subprocess
 from pathlib import Path
 from tempfile import TemporaryDirectory
 
 from ..base import ConversionInput, ConversionPlugin, ConversionResult
+from ..process import run_command
 from ..registry import REGISTRY
 from ..utils import trim_pdf_pages
 
 
-def _convert_presentation_to_pdf(input_path: Path) -> Path:
+def _convert_presentation_to_pdf(input_path: Path, plugin: str) -> Path:
     if not input_path.exists():
         raise FileNotFoundError(f"Input file not found: {input_path}")
 
@@ -26,7 +26,7 @@ def _convert_presentation_to_pdf(input_path: Path) -> Path:
             str(tmpdir_path),
             str(input_path),
         ]
-        subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        run_command(cmd, plugin=plugin)
 
         output_candidate = tmpdir_path / (input_path.stem + ".pdf")
         if not output_candidate.exists():
@@ -47,14 +47,14 @@ class PptToPdfPlugin(ConversionPlugin):
             raise ValueError("Conversion requires local input_path for ppt files")
 
         input_path = Path(payload.input_path)
-        output_path = _convert_presentation_to_pdf(input_path)
+        output_path = _convert_presentation_to_pdf(input_path, self.slug)
         page_limit = None
         if payload.metadata:
             page_limit = payload.metadata.get("page_limit")
         if page_limit:
             trim_pdf_pages(output_path, int(page_limit))
         metadata = {"note": "Converted via LibreOffice soffice"}
-        return ConversionResult(output_path=output_path, metadata=metadata)
+        return ConversionResult(output_path=output_path, metadata=metadata, perf={"engine": "soffice"})
 
 
 class PptxToPdfPlugin(ConversionPlugin):
@@ -67,14 +67,14 @@ class PptxToPdfPlugin(ConversionPlugin):
             raise ValueError("Conversion requires local input_path for pptx files")
 
         input_path = Path(payload.input_path)
-        output_path = _convert_presentation_to_pdf(input_path)
+        output_path = _convert_presentation_to_pdf(input_path, self.slug)
         page_limit = None
         if payload.metadata:
             page_limit = payload.metadata.get("page_limit")
         if page_limit:
             trim_pdf_pages(output_path, int(page_limit))
         metadata = {"note": "Converted via LibreOffice soffice"}
-        return ConversionResult(output_path=output_path, metadata=metadata)
+        return ConversionResult(output_path=output_path, metadata=metadata, perf={"engine": "soffice"})
 
 
 REGISTRY.register(PptToPdfPlugin)
@@ -0,0 +1,164 @@
+"""Convert pptx straight to Markdown, one block per slide (no LibreOffice)."""
+
+from __future__ import annotations
+
+import posixpath
+import re
+import zipfile
+from pathlib import Path
+from typing import Iterator, List
+from xml.etree import ElementTree as ET
+
+from ..base import ConversionInput, ConversionPlugin, ConversionResult
+from ..registry import REGISTRY
+from ..utils import markdown_table
+
+_A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+_P = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+_R = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_TITLE_TYPES = {"title", "ctrTitle"}
+# Placeholders whose paragraphs are rendered as bullets; free text boxes stay prose.
+_LIST_TYPES = {"body", "obj", None}
+_SLIDE_NAME = re.compile(r"^ppt/slides/slide(\d+)\.xml$")
+
+
+def _slide_parts(archive: zipfile.ZipFile) -> List[str]:
+    """Slide part names in presentation order (falls back to numeric file order)."""
+
+    try:
+        presentation = ET.fromstring(archive.read("ppt/presentation.xml"))
+        rels = ET.fromstring(archive.read("ppt/_rels/presentation.xml.rels"))
+    except KeyError:
+        presentation = rels = None
+
+    if presentation is not None:
+        targets = {rel.get("Id"): rel.get("Target") for rel in rels.iter(f"{_REL}Relationship")}
+        ordered = []
+        for slide_id in presentation.iter(f"{_P}sldId"):
+            target = targets.get(slide_id.get(f"{_R}id"))
+            if not target:
+                continue
+            if target.startswith("/"):
+                ordered.append(target.lstrip("/"))
+            else:
+                ordered.append(posixpath.normpath(posixpath.join("ppt", target)))
+        ordered = [name for name in ordered if name in archive.NameToInfo]
+        if ordered:
+            return ordered
+
+    numbered = [(int(m.group(1)), name) for name in archive.namelist() if (m := _SLIDE_NAME.match(name))]
+    return [name for _, name in sorted(numbered)]
+
+
+def _paragraph_text(paragraph: ET.Element) -> str:
+    parts: List[str] = []
+    for node in paragraph.iter():
+        if node.tag == f"{_A}t" and node.text:
+            parts.append(node.text)
+        elif node.tag == f"{_A}br":
+            parts.append(" ")
+    return " ".join("".join(parts).split())
+
+
+def _placeholder_type(shape: ET.Element) -> str | None:
+    ph = shape.find(f"{_P}nvSpPr/{_P}nvPr/{_P}ph")
+    if ph is None:
+        return "textbox"
+    return ph.get("type")
+
+
+def _shape_blocks(shape: ET.Element) -> tuple[str | None, List[str]]:
+    ph_type = _placeholder_type(shape)
+    tx_body = shape.find(f"{_P}txBody")
+    if tx_body is None:
+        return None, []
+    paragraphs = [(p, _paragraph_text(p)) for p in tx_body.iter(f"{_A}p")]
+    paragraphs = [(p, text) for p, text in paragraphs if text]
+    if ph_type in _TITLE_TYPES:
+        return " ".join(text for _, text in paragraphs) or None, []
+
+    lines: List[str] = []
+    for paragraph, text in paragraphs:
+        if ph_type in _LIST_TYPES:
+            ppr = paragraph.find(f"{_A}pPr")
+            depth = int(ppr.get("lvl") or 0) if ppr is not None else 0
+            lines.append(f"{'  ' * depth}- {text}")
+        else:
+            lines.append(text)
+    joiner = "\n" if ph_type in _LIST_TYPES else "\n\n"
+    return None, [joiner.join(lines)] if lines else []
+
+
+def _table_block(frame: ET.Element) -> str:
+    rows = [
+        [" ".join(_paragraph_text(p) for p in cell.iter(f"{_A}p")).strip() for cell in row.iter(f"{_A}tc")]
+        for row in frame.iter(f"{_A}tr")
+    ]
+    return markdown_table(rows)
+
+
+def _slide_markdown(root: ET.Element, number: int) -> str:
+    title: str | None = None
+    blocks: List[str] = []
+    tree = root.find(f"{_P}cSld/{_P}spTree")
+    if tree is None:
+        return f"## Slide {number}"
+    # Group shapes nest sp/graphicFrame; iter() walks them in document (z-) order.
+    for node in tree.iter():
+        if node.tag == f"{_P}sp":
+            shape_title, shape_blocks = _shape_blocks(node)
+            if shape_title and title is None:
+                title = shape_title
+            elif shape_title:
+                blocks.append(shape_title)
+            blocks.extend(shape_blocks)
+        elif node.tag == f"{_P}graphicFrame" and node.find(f".//{_A}tbl") is not None:
+            table = _table_block(node)
+            if table:
+                blocks.append(table)
+    heading = f"## Slide {number}: {title}" if title else f"## Slide {number}"
+    return "\n\n".join([heading, *blocks])
+
+
+def iter_pptx_blocks(path: Path, slide_limit: int | None = None) -> Iterator[str]:
+    """Yield one Markdown block per slide, reading slide parts one at a time."""
+
+    with zipfile.ZipFile(path) as archive:
+        for number, part in enumerate(_slide_parts(archive), start=1):
+            if slide_limit and number > slide_limit:
+                return
+            with archive.open(part) as handle:
+                yield _slide_markdown(ET.parse(handle).getroot(), number)
+
+
+class PptxToMarkdownPlugin(ConversionPlugin):
+    slug = "pptx-to-md"
+    source_format = "pptx"
+    target_format = "md"
+
+    def convert(self, payload: ConversionInput) -> ConversionResult:
+        if not payload.input_path:
+            raise ValueError("Conversion requires local input_path for pptx files")
+
+        input_path = Path(payload.input_path)
+        if not input_path.exists():
+            raise FileNotFoundError(f"Input file not found: {input_path}")
+
+        page_limit = None
+        if payload.metadata:
+            page_limit = payload.metadata.get("page_limit")
+
+        blocks = list(iter_pptx_blocks(input_path, int(page_limit) if page_limit else None))
+        md = "\n\n".join(blocks) if blocks else "(空演示文稿)"
+
+        output_path = input_path.with_suffix(".md")
+        output_path.write_text(md, encoding="utf-8")
+
+        metadata = {"note": f"Converted {len(blocks)} slides to Markdown from OOXML"}
+        return ConversionResult(
+            output_path=output_path, metadata=metadata, perf={"engine": "ooxml-stream", "pages": len(blocks)}
+        )
+
+
+REGISTRY.register(PptxToMarkdownPlugin)
@@ -2,10 +2,10 @@
 
 from __future__ import annotations
 
-import subprocess
 from pathlib import Path
 
 from ..base import ConversionInput, ConversionPlugin, ConversionResult
+from ..process import run_command
 from ..registry import REGISTRY
 
 
@@ -29,10 +29,10 @@ class SvgToPngPlugin(ConversionPlugin):
             "--export-type=png",
             f"--export-filename={output_path}",
         ]
-        subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        run_command(cmd, plugin=self.slug)
 
         metadata = {"note": "Converted via Inkscape CLI"}
-        return ConversionResult(output_path=output_path, metadata=metadata)
+        return ConversionResult(output_path=output_path, metadata=metadata, perf={"engine": "inkscape"})
 
 
 REGISTRY.register(SvgToPngPlugin)
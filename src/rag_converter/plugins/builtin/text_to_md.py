@@ -32,7 +32,7 @@ class _BaseToMarkdown(ConversionPlugin):
     def convert(self, payload: ConversionInput) -> ConversionResult:
         src = _ensure_input(payload)
         dest = _materialize_markdown(src)
-        return ConversionResult(output_path=dest, metadata={"note": self.note})
+        return ConversionResult(output_path=dest, metadata={"note": self.note}, perf={"engine": "text-copy"})
 
 
 class PlainTextToMarkdownPlugin(_BaseToMarkdown):
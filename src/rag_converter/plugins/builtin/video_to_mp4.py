@@ -1,44 +1,77 @@
-"""Plugins converting common video formats to mp4 via FFmpeg."""
+"""Plugins converting common video formats to mp4 via FFmpeg.
+
+Long inputs are split at keyframes (stream copy), the video segments are encoded
+by parallel ffmpeg processes while the audio track is encoded once in full, and
+the result is joined with the concat demuxer without re-encoding.
+"""
 
 from __future__ import annotations
 
+import contextvars
+import json
+import math
+import os
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import List, Tuple
 
+from ...config import VideoEncodeSettings, get_settings
 from ..base import ConversionInput, ConversionPlugin, ConversionResult
+from ..process import run_command
 from ..registry import REGISTRY
 
+_VIDEO_ARGS = ["-c:v", "libx264", "-preset", "fast", "-crf", "23"]
+_AUDIO_ARGS = ["-c:a", "aac", "-b:a", "192k"]
 
-class _BaseVideoToMp4Plugin(ConversionPlugin):
-    target_format = "mp4"
 
-    def convert(self, payload: ConversionInput) -> ConversionResult:
-        if not payload.input_path:
-            raise ValueError("Conversion requires local input_path for video files")
+def _run(cmd: List[str], plugin: str | None = None) -> subprocess.CompletedProcess:
+    return run_command(cmd, plugin=plugin)
 
-        input_path = Path(payload.input_path)
-        if not input_path.exists():
-            raise FileNotFoundError(f"Input file not found: {input_path}")
 
-        output_path = input_path.with_suffix(".mp4")
+def probe_media(input_path: Path) -> Tuple[float | None, bool]:
+    """Return ``(duration_seconds, has_audio)`` using ffprobe."""
+
+    cmd = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-show_entries",
+        "format=duration:stream=codec_type",
+        "-of",
+        "json",
+        str(input_path),
+    ]
+    info = json.loads(_run(cmd).stdout or b"{}")
+    try:
+        duration = float(info.get("format", {}).get("duration"))
+    except (TypeError, ValueError):
         duration = None
-        if payload.metadata:
-            duration = payload.metadata.get("duration_seconds")
+    has_audio = any(stream.get("codec_type") == "audio" for stream in info.get("streams", []))
+    return duration, has_audio
+
+
+def plan_segments(duration: float | None, settings: VideoEncodeSettings, cpus: int) -> int:
+    """Number of segments to encode in parallel; 1 means a single ffmpeg pass."""
+
+    if not settings.segment_parallel or not duration or duration < settings.min_duration_sec:
+        return 1
+    limit = settings.max_segments or cpus
+    return max(1, min(limit, int(duration // settings.min_segment_sec)))
+
+
+class _BaseVideoToMp4Plugin(ConversionPlugin):
+    target_format = "mp4"
+
+    def _single_pass(self, input_path: Path, output_path: Path, duration) -> None:
         cmd = [
             "ffmpeg",
             "-y",
             "-i",
             str(input_path),
-            "-c:v",
-            "libx264",
-            "-preset",
-            "fast",
-            "-crf",
-            "23",
-            "-c:a",
-            "aac",
-            "-b:a",
-            "192k",
+            *_VIDEO_ARGS,
+            *_AUDIO_ARGS,
             "-movflags",
             "faststart",
             str(output_path),
@@ -46,10 +79,120 @@ class _BaseVideoToMp4Plugin(ConversionPlugin):
         if duration:
             cmd.insert(6, str(duration))
             cmd.insert(6, "-t")
-        subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        _run(cmd, self.slug)
+
+    def _segmented(
+        self,
+        input_path: Path,
+        output_path: Path,
+        length: float,
+        limit,
+        segments: int,
+        has_audio: bool,
+        settings: VideoEncodeSettings,
+    ) -> int:
+        cpus = os.cpu_count() or 1
+        parallel = max(1, min(settings.max_parallel or cpus, segments))
+        threads = max(1, cpus // parallel)
+        trim = ["-t", str(limit)] if limit else []
+
+        with TemporaryDirectory(dir=output_path.parent) as tmpdir:
+            workdir = Path(tmpdir)
+            # Stream-copy split: the segment muxer only cuts on keyframes.
+            _run(
+                [
+                    "ffmpeg",
+                    "-y",
+                    "-i",
+                    str(input_path),
+                    *trim,
+                    "-map",
+                    "0:v:0",
+                    "-c",
+                    "copy",
+                    "-f",
+                    "segment",
+                    "-segment_time",
+                    f"{math.ceil(length / segments)}",
+                    "-reset_timestamps",
+                    "1",
+                    str(workdir / "src_%04d.mkv"),
+                ],
+                self.slug,
+            )
+            sources = sorted(workdir.glob("src_*.mkv"))
+            if not sources:
+                raise RuntimeError("FFmpeg segmenting did not produce output")
+
+            jobs = [
+                [
+                    "ffmpeg",
+                    "-y",
+                    "-i",
+                    str(src),
+                    *_VIDEO_ARGS,
+                    "-threads",
+                    str(threads),
+                    "-an",
+                    str(src.with_suffix(".mp4")),
+                ]
+                for src in sources
+            ]
+            audio_path = workdir / "audio.m4a"
+            if has_audio:
+                jobs.append(["ffmpeg", "-y", "-i", str(input_path), *trim, "-vn", *_AUDIO_ARGS, str(audio_path)])
+            with ThreadPoolExecutor(max_workers=parallel) as pool:
+                # Copy the context so the encodes stay attributed to the task (see plugins.process).
+                futures = [pool.submit(contextvars.copy_context().run, _run, job, self.slug) for job in jobs]
+                for future in futures:
+                    future.result()
+
+            concat_list = workdir / "segments.txt"
+            concat_list.write_text(
+                "".join(f"file '{src.with_suffix('.mp4').name}'\n" for src in sources), encoding="utf-8"
+            )
+            cmd = ["ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", str(concat_list)]
+            if has_audio:
+                cmd += ["-i", str(audio_path), "-map", "0:v:0", "-map", "1:a:0"]
+            cmd += ["-c", "copy", "-movflags", "faststart", str(output_path)]
+            _run(cmd, self.slug)
+        return len(sources)
+
+    def convert(self, payload: ConversionInput) -> ConversionResult:
+        if not payload.input_path:
+            raise ValueError("Conversion requires local input_path for video files")
+
+        input_path = Path(payload.input_path)
+        if not input_path.exists():
+            raise FileNotFoundError(f"Input file not found: {input_path}")
+
+        output_path = input_path.with_suffix(".mp4")
+        duration = None
+        if payload.metadata:
+            duration = payload.metadata.get("duration_seconds")
 
-        metadata = {"note": f"Converted {self.source_format}->mp4 via FFmpeg"}
-        return ConversionResult(output_path=output_path, metadata=metadata)
+        settings = get_settings().video
+        segments, length, has_audio = 1, None, False
+        if settings.segment_parallel:
+            try:
+                total, has_audio = probe_media(input_path)
+            except (OSError, subprocess.SubprocessError, ValueError):
+                total = None  # no usable ffprobe: fall back to a single pass
+            length = min(total, float(duration)) if total and duration else total
+            segments = plan_segments(length, settings, os.cpu_count() or 1)
+
+        if segments > 1:
+            segments = self._segmented(input_path, output_path, length, duration, segments, has_audio, settings)
+            note = f"Converted {self.source_format}->mp4 via FFmpeg ({segments} parallel segments)"
+            perf = {"engine": "ffmpeg-segmented", "segments": segments}
+        else:
+            self._single_pass(input_path, output_path, duration)
+            note = f"Converted {self.source_format}->mp4 via FFmpeg"
+            perf = {"engine": "ffmpeg-transcode"}
+        if length or duration:
+            perf["duration_sec"] = float(length or duration)
+
+        return ConversionResult(output_path=output_path, metadata={"note": note}, perf=perf)
 
 
 class AviToMp4Plugin(_BaseVideoToMp4Plugin):
@@ -2,10 +2,10 @@
 
 from __future__ import annotations
 
-import subprocess
 from pathlib import Path
 
 from ..base import ConversionInput, ConversionPlugin, ConversionResult
+from ..process import run_command
 from ..registry import REGISTRY
 
 
@@ -30,10 +30,10 @@ class WebpToPngPlugin(ConversionPlugin):
             str(input_path),
             str(output_path),
         ]
-        subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        run_command(cmd, plugin=self.slug)
 
         metadata = {"note": "Converted via FFmpeg webp->png"}
-        return ConversionResult(output_path=output_path, metadata=metadata)
+        return ConversionResult(output_path=output_path, metadata=metadata, perf={"engine": "ffmpeg"})
 
 
 REGISTRY.register(WebpToPngPlugin)
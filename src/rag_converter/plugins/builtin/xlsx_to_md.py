@@ -51,7 +51,7 @@ class ExcelToMarkdownPlugin(ConversionPlugin):
         output_path.write_text(md, encoding="utf-8")
 
         metadata = {"note": "Converted Excel to Markdown"}
-        return ConversionResult(output_path=output_path, metadata=metadata)
+        return ConversionResult(output_path=output_path, metadata=metadata, perf={"engine": "openpyxl"})
 
 
 class ExcelLegacyToMarkdownPlugin(ExcelToMarkdownPlugin):
@@ -0,0 +1,198 @@
+"""Client for a pool of MinerU ``/file_parse`` endpoints with page sharding and a disk cache."""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import itertools
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import requests
+from pypdf import PdfReader, PdfWriter
+from requests.adapters import HTTPAdapter
+
+from ..config import MinerUSettings
+
+logger = logging.getLogger(__name__)
+
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class MinerUError(RuntimeError):
+    """Raised when a shard cannot be parsed within the retry budget."""
+
+
+class _RetryBudget:
+    """Retries shared by every shard of one document, so a sick cluster fails fast."""
+
+    def __init__(self, retries: int) -> None:
+        self._remaining = retries
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self._lock:
+            if self._remaining <= 0:
+                return False
+            self._remaining -= 1
+            return True
+
+
+class MinerUClient:
+    def __init__(self, settings: MinerUSettings, session: Optional[requests.Session] = None) -> None:
+        if not settings.endpoints:
+            raise ValueError("MinerU requires at least one endpoint")
+        self.settings = settings
+        self.endpoints = [endpoint.rstrip("/") for endpoint in settings.endpoints]
+        self.max_workers = len(self.endpoints) * settings.max_inflight_per_endpoint
+        self.session = session or self._build_session()
+
+    def _build_session(self) -> requests.Session:
+        session = requests.Session()
+        # Keep-alive connections sized for the fan-out; retries are handled by the budget.
+        adapter = HTTPAdapter(
+            pool_connections=len(self.endpoints),
+            pool_maxsize=self.settings.max_inflight_per_endpoint,
+            max_retries=0,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def cache_key(self, pdf_path: Path, page_limit: int | None) -> str:
+        digest = hashlib.sha256()
+        with pdf_path.open("rb") as handle:
+            for block in iter(lambda: handle.read(1024 * 1024), b""):
+                digest.update(block)
+        cfg = self.settings
+        digest.update(f"|{cfg.backend}|{cfg.parse_method}|{cfg.lang}|{page_limit or 0}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _cache_path(self, key: str) -> Path | None:
+        if not self.settings.cache_dir:
+            return None
+        return Path(self.settings.cache_dir) / key[:2] / f"{key}.md"
+
+    @staticmethod
+    def _cached_pages(cache_path: Path) -> int | None:
+        """Page count stored next to a cached result; ``None`` for entries written before it was kept."""
+
+        try:
+            return int(json.loads(cache_path.with_suffix(".json").read_text(encoding="utf-8"))["pages"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _post_shard(self, endpoint: str, name: str, data: bytes) -> str:
+        cfg = self.settings
+        response = self.session.post(
+            f"{endpoint}/file_parse",
+            files={"files": (name, data, "application/pdf")},
+            data={
+                "backend": cfg.backend,
+                "parse_method": cfg.parse_method,
+                "lang_list": cfg.lang,
+                "return_md": "true",
+            },
+            timeout=cfg.timeout_sec,
+        )
+        response.raise_for_status()
+        body = response.json()
+        results = body.get("results")
+        if isinstance(results, dict) and results:
+            return next(iter(results.values())).get("md_content") or ""
+        return body.get("md_content") or ""
+
+    def _parse_shard(self, index: int, name: str, data: bytes, budget: _RetryBudget) -> str:
+        # Start on a different endpoint per shard and rotate on failure.
+        offsets = itertools.count(index)
+        while True:
+            endpoint = self.endpoints[next(offsets) % len(self.endpoints)]
+            try:
+                return self._post_shard(endpoint, name, data)
+            except requests.HTTPError as exc:
+                status = exc.response.status_code if exc.response is not None else None
+                if status not in _RETRYABLE_STATUS:
+                    raise MinerUError(f"MinerU rejected shard {name} ({status})") from exc
+                error: Exception = exc
+            except (requests.ConnectionError, requests.Timeout, json.JSONDecodeError) as exc:
+                error = exc
+            if not budget.take():
+                raise MinerUError(f"MinerU retry budget exhausted on shard {name}") from error
+            logger.warning("Retrying MinerU shard %s after %s on %s", name, error, endpoint)
+
+    def _shards(self, total: int, whole: bool) -> List[Tuple[int, int]]:
+        if whole:
+            return [(0, total)]
+        step = self.settings.shard_pages
+        return [(start, min(start + step, total)) for start in range(0, total, step)]
+
+    def parse(self, pdf_path: Path, page_limit: int | None = None) -> Tuple[str, dict]:
+        """Return ``(markdown, info)`` for the first ``page_limit`` pages of ``pdf_path``."""
+
+        key = self.cache_key(pdf_path, page_limit)
+        cache_path = self._cache_path(key)
+        if cache_path and cache_path.exists():
+            return cache_path.read_text(encoding="utf-8"), {
+                "cache_hit": True,
+                "shards": 0,
+                "pages": self._cached_pages(cache_path),
+            }
+
+        reader = PdfReader(str(pdf_path))
+        page_count = len(reader.pages)
+        total = min(page_count, page_limit) if page_limit else page_count
+        whole = total == page_count and total <= self.settings.shard_pages
+        shards = self._shards(total, whole)
+        budget = _RetryBudget(self.settings.retry_budget)
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(shards)) or 1) as pool:
+            futures = []
+            for index, (start, end) in enumerate(shards):
+                if whole:
+                    data = pdf_path.read_bytes()
+                else:
+                    # Shards are cut on this thread (PdfReader is not thread-safe) while
+                    # earlier shards are already in flight.
+                    writer = PdfWriter()
+                    for page_index in range(start, end):
+                        writer.add_page(reader.pages[page_index])
+                    buffer = io.BytesIO()
+                    writer.write(buffer)
+                    data = buffer.getvalue()
+                name = f"{pdf_path.stem}-p{start + 1:05d}-{end:05d}.pdf"
+                futures.append(pool.submit(self._parse_shard, index, name, data, budget))
+            parts = [future.result() for future in futures]
+
+        markdown = "\n\n".join(part.strip() for part in parts if part and part.strip())
+        if cache_path:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            # The sidecar lands first: the Markdown file is what marks the entry as complete.
+            meta_tmp = cache_path.with_suffix(f".json.{os.getpid()}.tmp")
+            meta_tmp.write_text(json.dumps({"pages": total}), encoding="utf-8")
+            meta_tmp.replace(cache_path.with_suffix(".json"))
+            tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(markdown, encoding="utf-8")
+            tmp_path.replace(cache_path)
+        return markdown, {"cache_hit": False, "shards": len(shards), "pages": total}
+
+
+_CLIENT: MinerUClient | None = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_mineru_client(settings: MinerUSettings) -> MinerUClient:
+    """Process-wide client so the HTTP connection pool survives across tasks."""
+
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None or _CLIENT.settings != settings:
+            _CLIENT = MinerUClient(settings)
+        return _CLIENT
+
+
+__all__ = ["MinerUClient", "MinerUError", "get_mineru_client"]
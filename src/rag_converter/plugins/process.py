@@ -0,0 +1,232 @@
+"""Supervised execution of external conversion tools.
+
+Every tool runs in its own session (process group) with a wall-clock timeout
+and an optional address-space limit. On timeout or cancellation the whole group
+is terminated (SIGTERM, then SIGKILL after a grace period), so helpers spawned
+by the tool — e.g. ``soffice.bin`` behind ``soffice`` — never outlive it.
+
+While a conversion task runs inside :func:`task_scope`, the scope is recorded
+as ``WORK_DIR/procs/{task_id}/scope-{pid}-{n}`` and each live process group as
+``WORK_DIR/procs/{task_id}/{pgid}``. :func:`cancel_task` — called from the
+worker's remote-control command or ``task_revoked`` handler — kills the
+recorded groups and, if the task runs on this worker, leaves a ``cancelled``
+marker so it stops starting new tools. The last scope to exit removes the
+marker and the directory, so cancellations leave nothing behind.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import itertools
+import logging
+import os
+import resource
+import signal
+import subprocess
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional, Sequence, Tuple
+
+from ..config import ProcessSupervisorSettings, get_settings
+
+logger = logging.getLogger(__name__)
+
+PROCS_DIR = Path(os.getenv("RAG_WORK_DIR", "/tmp/rag_converter")) / "procs"
+_CANCEL_MARKER = "cancelled"
+_SCOPE_PREFIX = "scope-"
+_SCOPE_SEQ = itertools.count()
+_CURRENT_TASK: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("conversion_task_id", default=None)
+
+
+class ProcessCancelled(RuntimeError):
+    """The task owning the process was cancelled."""
+
+
+def _task_dir(task_id: str) -> Path:
+    return PROCS_DIR / task_id.replace("/", "_")
+
+
+def current_task_id() -> Optional[str]:
+    return _CURRENT_TASK.get()
+
+
+def is_cancelled(task_id: Optional[str]) -> bool:
+    return bool(task_id) and (_task_dir(task_id) / _CANCEL_MARKER).exists()
+
+
+def resolve_limits(
+    settings: ProcessSupervisorSettings, plugin: Optional[str], executable: str
+) -> Tuple[float, int]:
+    """``(timeout_sec, memory_mb)`` for a plugin slug, falling back to the executable name."""
+
+    name = Path(executable).name
+    timeout = settings.timeouts_sec.get(plugin or "", settings.timeouts_sec.get(name, settings.default_timeout_sec))
+    memory = settings.memory_mb.get(plugin or "", settings.memory_mb.get(name, settings.default_memory_mb))
+    return timeout, memory
+
+
+def _limit_address_space(pid: int, memory_mb: int) -> None:
+    # Set from the parent: ``preexec_fn`` is unsafe once threads exist (plugins run tools from thread pools).
+    limit = memory_mb * 1024 * 1024
+    try:
+        resource.prlimit(pid, resource.RLIMIT_AS, (limit, limit))
+    except ProcessLookupError:
+        pass  # already exited
+
+
+def _group_alive(pgid: int) -> bool:
+    try:
+        os.killpg(pgid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def terminate_group(pgid: int, grace_sec: float) -> None:
+    """SIGTERM the process group, then SIGKILL whatever is left after ``grace_sec``."""
+
+    try:
+        os.killpg(pgid, signal.SIGTERM)
+    except ProcessLookupError:
+        return
+    deadline = time.monotonic() + grace_sec
+    while time.monotonic() < deadline:
+        if not _group_alive(pgid):
+            return
+        time.sleep(0.05)
+    try:
+        os.killpg(pgid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def run_command(
+    cmd: Sequence[str],
+    *,
+    plugin: Optional[str] = None,
+    timeout: Optional[float] = None,
+    text: bool = False,
+) -> subprocess.CompletedProcess:
+    """Drop-in for ``subprocess.run(cmd, check=True, stdout=PIPE, stderr=PIPE)`` with supervision.
+
+    Raises ``subprocess.TimeoutExpired`` on timeout, :class:`ProcessCancelled` when the
+    owning task is cancelled and ``subprocess.CalledProcessError`` on a non-zero exit.
+    """
+
+    settings = get_settings().processes
+    limit_sec, memory_mb = resolve_limits(settings, plugin, cmd[0])
+    if timeout is not None:
+        limit_sec = timeout
+    task_id = current_task_id()
+    if is_cancelled(task_id):
+        raise ProcessCancelled(f"task {task_id} was cancelled")
+
+    proc = subprocess.Popen(
+        list(cmd),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=text,
+        start_new_session=True,
+    )
+    if memory_mb:
+        _limit_address_space(proc.pid, memory_mb)
+    marker = None
+    if task_id:
+        marker = _task_dir(task_id) / str(proc.pid)
+        marker.parent.mkdir(parents=True, exist_ok=True)
+        marker.write_text(" ".join(cmd), encoding="utf-8")
+    try:
+        try:
+            stdout, stderr = proc.communicate(timeout=limit_sec)
+        except subprocess.TimeoutExpired:
+            logger.warning("Killing %s after %.0fs (plugin=%s)", cmd[0], limit_sec, plugin)
+            terminate_group(proc.pid, settings.kill_grace_sec)
+            proc.communicate()
+            raise subprocess.TimeoutExpired(list(cmd), limit_sec) from None
+        except BaseException:
+            # Worker shutdown/soft time limit: never leave the tool running behind us.
+            terminate_group(proc.pid, 0)
+            proc.communicate()
+            raise
+        # The leader exited; sweep any helpers it left in its group.
+        if _group_alive(proc.pid):
+            terminate_group(proc.pid, settings.kill_grace_sec)
+    finally:
+        if marker is not None:
+            marker.unlink(missing_ok=True)
+
+    if is_cancelled(task_id):
+        raise ProcessCancelled(f"task {task_id} was cancelled")
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, list(cmd), stdout, stderr)
+    return subprocess.CompletedProcess(list(cmd), proc.returncode, stdout, stderr)
+
+
+def cancel_task(task_id: str, grace_sec: Optional[float] = None) -> int:
+    """Kill ``task_id``'s live process groups on this worker and mark it cancelled; returns how many were signalled.
+
+    Workers where the task is not running (no task directory) are left untouched, so a broadcast cancel
+    does not leave markers on every worker.
+    """
+
+    task_dir = _task_dir(task_id)
+    try:
+        (task_dir / _CANCEL_MARKER).touch()
+    except FileNotFoundError:
+        return 0
+    if grace_sec is None:
+        grace_sec = get_settings().processes.kill_grace_sec
+    killed = 0
+    for entry in task_dir.iterdir():
+        if not entry.name.isdigit():
+            continue
+        pgid = int(entry.name)
+        if _group_alive(pgid):
+            terminate_group(pgid, grace_sec)
+            killed += 1
+        entry.unlink(missing_ok=True)
+    if killed:
+        logger.info("Cancelled task %s: terminated %d process groups", task_id, killed)
+    return killed
+
+
+@contextmanager
+def task_scope(task_id: Optional[str]) -> Iterator[None]:
+    """Attribute tools started in this context to ``task_id``."""
+
+    scope = None
+    if task_id:
+        task_dir = _task_dir(task_id)
+        task_dir.mkdir(parents=True, exist_ok=True)
+        scope = task_dir / f"{_SCOPE_PREFIX}{os.getpid()}-{next(_SCOPE_SEQ)}"
+        scope.touch()
+    token = _CURRENT_TASK.set(task_id)
+    try:
+        yield
+    finally:
+        _CURRENT_TASK.reset(token)
+        if scope is not None:
+            scope.unlink(missing_ok=True)
+            # Archive sub-tasks share the parent id: the last scope on this worker clears the marker.
+            if not any(entry.name.startswith(_SCOPE_PREFIX) for entry in scope.parent.iterdir()):
+                (scope.parent / _CANCEL_MARKER).unlink(missing_ok=True)
+                try:
+                    scope.parent.rmdir()
+                except OSError:
+                    pass
+
+
+__all__ = [
+    "PROCS_DIR",
+    "ProcessCancelled",
+    "cancel_task",
+    "current_task_id",
+    "is_cancelled",
+    "resolve_limits",
+    "run_command",
+    "task_scope",
+    "terminate_group",
+]
@@ -25,6 +25,9 @@ DEFAULT_PLUGIN_MODULES: Sequence[str] = (
     "rag_converter.plugins.builtin.text_to_md",
     "rag_converter.plugins.builtin.xlsx_to_pdf",
     "rag_converter.plugins.builtin.xlsx_to_md",
+    "rag_converter.plugins.builtin.pdf_to_md",
+    "rag_converter.plugins.builtin.docx_to_md",
+    "rag_converter.plugins.builtin.pptx_to_md",
 )
 
 
@@ -72,6 +75,20 @@ def read_plugin_module_file(path: str | Path) -> List[str]:
     return [str(module) for module in modules]
 
 
+def read_plugin_dependency_file(path: str | Path) -> Dict[str, List[str]]:
+    file_path = Path(path)
+    if not file_path.exists():
+        return {}
+
+    with file_path.open("r", encoding="utf-8") as handle:
+        data = yaml.safe_load(handle) or {}
+
+    deps = data.get("dependencies", {}) if isinstance(data, dict) else {}
+    if not isinstance(deps, dict):
+        return {}
+    return {str(module): [str(pkg) for pkg in (pkgs or [])] for module, pkgs in deps.items()}
+
+
 def write_plugin_module_file(path: str | Path, modules: Iterable[str]) -> None:
     file_path = Path(path)
     file_path.parent.mkdir(parents=True, exist_ok=True)
@@ -87,6 +104,7 @@ __all__ = [
     "REGISTRY",
     "DEFAULT_PLUGIN_MODULES",
     "load_plugins",
+    "read_plugin_dependency_file",
     "read_plugin_module_file",
     "write_plugin_module_file",
 ]
@@ -3,8 +3,10 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import List, Sequence
 
 from pypdf import PdfReader, PdfWriter
+from tabulate import tabulate
 
 
 def trim_pdf_pages(pdf_path: Path, max_pages: int) -> None:
@@ -22,3 +24,14 @@ def trim_pdf_pages(pdf_path: Path, max_pages: int) -> None:
     with pdf_path.open("wb") as handle:
         writer.write(handle)
 
+
+def markdown_table(rows: Sequence[Sequence[str]]) -> str:
+    """Render rows as a GitHub Markdown table, treating the first row as the header."""
+    width = max((len(row) for row in rows), default=0)
+    if not width:
+        return ""
+    cells: List[List[str]] = [
+        [" ".join(str(cell).split()).replace("|", "\\|") for cell in row] + [""] * (width - len(row))
+        for row in rows
+    ]
+    return tabulate(cells, headers="firstrow", tablefmt="github", disable_numparse=True)
@@ -0,0 +1,189 @@
+"""Conversion duration estimates and shortest-job-first broker priorities.
+
+Workers feed every successful conversion into a per format-pair least-squares
+model ``seconds ~ b0 + b1 * size_mb + b2 * pages`` over the measured input size
+and the number of pages actually converted. The sufficient statistics
+(X^T X, X^T y) live in a Redis hash and are updated with ``HINCRBYFLOAT``, so any
+number of workers can contribute without coordination and the API only needs
+one ``HMGET`` per file to produce an estimate. The page count is unknown at
+submission, so the API imputes it from the declared size with the same
+statistics (``pages ~ a + b * size_mb``), capped by the request's ``page_limit``.
+
+The estimate is mapped to a Celery/Redis priority: each request priority class
+owns three consecutive levels (short/medium/long job), so shorter jobs are
+served first *within* a class while ``high`` always precedes ``normal`` and
+``low``. The Redis transport consumes lower numbers first.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+import redis
+from redis.exceptions import RedisError
+
+from .config import SchedulingSettings, Settings
+
+logger = logging.getLogger(__name__)
+
+# Features are (1, size_mb, pages). Upper triangle of X^T X followed by X^T y.
+_XTX_FIELDS = ("s00", "s01", "s02", "s11", "s12", "s22")
+_XTY_FIELDS = ("t0", "t1", "t2")
+_FIELDS = _XTX_FIELDS + _XTY_FIELDS
+
+PRIORITY_CLASS_BASE = {"high": 0, "normal": 3, "low": 6}
+PRIORITY_STEPS: List[int] = list(range(9))
+
+
+def _features(size_mb: float | None, pages: int | None) -> tuple[float, float, float]:
+    return 1.0, float(size_mb or 0.0), float(pages or 0)
+
+
+def _solve(matrix: List[List[float]], vector: List[float]) -> Optional[List[float]]:
+    """Gaussian elimination with partial pivoting; ``None`` when singular."""
+
+    size = len(vector)
+    rows = [list(matrix[i]) + [vector[i]] for i in range(size)]
+    for col in range(size):
+        pivot = max(range(col, size), key=lambda r: abs(rows[r][col]))
+        if abs(rows[pivot][col]) < 1e-12:
+            return None
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        for r in range(col + 1, size):
+            factor = rows[r][col] / rows[col][col]
+            for c in range(col, size + 1):
+                rows[r][c] -= factor * rows[col][c]
+    solution = [0.0] * size
+    for r in range(size - 1, -1, -1):
+        acc = rows[r][size] - sum(rows[r][c] * solution[c] for c in range(r + 1, size))
+        solution[r] = acc / rows[r][r]
+    return solution
+
+
+@dataclass
+class DurationModel:
+    """Sufficient statistics of the least-squares fit for one format pair."""
+
+    stats: List[float] = field(default_factory=lambda: [0.0] * len(_FIELDS))
+
+    @property
+    def samples(self) -> int:
+        return int(self.stats[0])
+
+    @staticmethod
+    def increments(x: Sequence[float], seconds: float) -> List[float]:
+        xtx = [x[0] * x[0], x[0] * x[1], x[0] * x[2], x[1] * x[1], x[1] * x[2], x[2] * x[2]]
+        return xtx + [value * seconds for value in x]
+
+    def update(self, x: Sequence[float], seconds: float) -> None:
+        self.stats = [a + b for a, b in zip(self.stats, self.increments(x, seconds))]
+
+    def predict(self, x: Sequence[float], ridge: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        s00, s01, s02, s11, s12, s22, t0, t1, t2 = self.stats
+        # Ridge on the slopes only, scaled by n so it stays negligible as data grows.
+        penalty = ridge * s00
+        coeffs = _solve(
+            [[s00, s01, s02], [s01, s11 + penalty, s12], [s02, s12, s22 + penalty]],
+            [t0, t1, t2],
+        )
+        if coeffs is None:
+            return t0 / s00
+        return max(0.0, sum(c * v for c, v in zip(coeffs, x)))
+
+    def impute_pages(self, size_mb: float | None) -> Optional[float]:
+        """Expected page count for ``size_mb`` from the observed (size, pages) pairs."""
+
+        if not self.samples:
+            return None
+        s00, s01, s02, s11, s12 = self.stats[:5]
+        coeffs = _solve([[s00, s01], [s01, s11]], [s02, s12])
+        if coeffs is None:
+            return s02 / s00
+        return max(0.0, coeffs[0] + coeffs[1] * float(size_mb or 0.0))
+
+
+class DurationPredictor:
+    def __init__(self, settings: Settings, client: Optional[redis.Redis] = None) -> None:
+        self.settings: SchedulingSettings = settings.celery.scheduling
+        self._url = self.settings.redis_url or settings.celery.broker_url
+        self._redis = client
+
+    def _client(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = redis.Redis.from_url(self._url, socket_connect_timeout=1, socket_timeout=1)
+        return self._redis
+
+    def _key(self, source: str, target: str) -> str:
+        return f"{self.settings.key_prefix}:{source.lower()}:{target.lower()}"
+
+    def prior(self, size_mb: float | None) -> float:
+        return self.settings.prior_base_sec + self.settings.prior_sec_per_mb * float(size_mb or 0.0)
+
+    def observe(self, source: str, target: str, size_mb: float | None, pages: int | None, seconds: float) -> None:
+        increments = DurationModel.increments(_features(size_mb, pages), seconds)
+        key = self._key(source, target)
+        try:
+            pipe = self._client().pipeline(transaction=False)
+            for name, value in zip(_FIELDS, increments):
+                pipe.hincrbyfloat(key, name, value)
+            pipe.execute()
+        except RedisError as exc:
+            logger.debug("Unable to record conversion duration", exc_info=exc)
+
+    def load(self, source: str, target: str) -> DurationModel:
+        try:
+            values = self._client().hmget(self._key(source, target), _FIELDS)
+        except RedisError as exc:
+            logger.debug("Unable to load duration model", exc_info=exc)
+            return DurationModel()
+        return DurationModel([float(value) if value is not None else 0.0 for value in values])
+
+    def estimate(
+        self,
+        source: str,
+        target: str,
+        size_mb: float | None,
+        pages: float | None = None,
+        *,
+        page_limit: int | None = None,
+    ) -> float:
+        """Seconds expected for one file; the prior is used until ``min_samples`` are seen.
+
+        Without ``pages`` the page count is imputed from ``size_mb`` and capped by ``page_limit``.
+        """
+
+        model = self.load(source, target)
+        if model.samples >= self.settings.min_samples:
+            if pages is None:
+                pages = model.impute_pages(size_mb)
+                if pages is not None and page_limit:
+                    pages = min(pages, float(page_limit))
+            predicted = model.predict(_features(size_mb, pages), self.settings.ridge)
+            if predicted is not None:
+                return predicted
+        return self.prior(size_mb)
+
+
+def scheduling_priority(priority: str, estimate_sec: float | None, settings: SchedulingSettings) -> int:
+    """Broker priority for a request class and its estimated duration (0 is served first)."""
+
+    base = PRIORITY_CLASS_BASE.get(priority, PRIORITY_CLASS_BASE["normal"])
+    if estimate_sec is None:
+        return base + 1
+    if estimate_sec < settings.short_job_sec:
+        return base
+    if estimate_sec < settings.long_job_sec:
+        return base + 1
+    return base + 2
+
+
+__all__ = [
+    "DurationModel",
+    "DurationPredictor",
+    "PRIORITY_STEPS",
+    "scheduling_priority",
+]
@@ -2,18 +2,36 @@
 
 from __future__ import annotations
 
+import codecs
+import json
 import logging
+import tempfile
+from typing import Any, Callable, Iterator, List, Sequence
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 
+from ..cache import compute_recommendation, get_cache, profile_key, recommendation_key
+from ..chunker import slice_text as slice_text_payload
 from ..config import Settings, settings_dependency
-from ..recommendation import _round_profile, extract_signals_from_samples, recommend_strategy
+from ..dedup import dedup_slice_result
+from ..executor import ExecutorBusy, run_batch, run_cpu
+from ..incremental import reslice
+from ..recommendation import ProfileAccumulator, _public_profile, _round_profile, extract_signals_from_samples
 from ..security import authenticate_request
+from ..tables import TableBatch, slice_table
 from ..errors import raise_error
 from .schemas import (
     CustomDelimiterConfig,
     ProbeRequest,
     ProfileResponse,
+    RecommendBatchRequest,
+    RecommendBatchResponse,
+    SliceDiffRequest,
+    SliceDiffResponse,
+    SliceRequest,
+    SliceResponse,
     StrategyRecommendRequest,
     StrategyRecommendResponse,
 )
@@ -22,6 +40,37 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+def _check_samples(samples: Sequence[str], settings: Settings) -> int:
+    limits = settings.limits
+    total_chars = sum(len(text) for text in samples)
+    if len(samples) > limits.max_samples:
+        raise_error("ERR_PAYLOAD_TOO_LARGE", detail=f"at most {limits.max_samples} samples per request")
+    if total_chars > limits.max_sample_chars:
+        raise_error("ERR_PAYLOAD_TOO_LARGE", detail=f"samples exceed {limits.max_sample_chars} characters")
+    return total_chars
+
+
+async def _cpu(key: str | None, fn: Callable[..., Any], *args: Any, size: int, settings: Settings) -> Any:
+    """Serve from the cache, else run ``fn`` via the executor (off the loop when large) and cache it.
+
+    Cache lookups may block on Redis, so they run in the threadpool rather than on the event loop.
+    """
+
+    cache = get_cache()
+    value = await run_in_threadpool(cache.get, key) if key else None
+    if value is not None:
+        return value
+    try:
+        value = await run_cpu(fn, *args, size=size, settings=settings)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    except ExecutorBusy as exc:
+        raise_error("ERR_BUSY", detail=str(exc))
+    if key:
+        await run_in_threadpool(cache.set, key, value)
+    return value
+
+
 @router.post(
     "/probe/profile",
     status_code=status.HTTP_200_OK,
@@ -29,15 +78,55 @@ router = APIRouter()
     dependencies=[Depends(authenticate_request)],
 )
 async def probe_profile(payload: ProbeRequest, settings: Settings = Depends(settings_dependency)) -> ProfileResponse:
-    try:
-        profile = extract_signals_from_samples(payload.samples)
-    except ValueError as exc:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
-    clean_profile = _round_profile({k: v for k, v in profile.items() if k != "para_lengths"}, 3)
+    size = _check_samples(payload.samples, settings)
+    profile = await _cpu(
+        profile_key(payload.samples), extract_signals_from_samples, payload.samples, size=size, settings=settings
+    )
+    clean_profile = _round_profile(_public_profile(profile), 3)
     logger.info("probe_profile: profile=%s", clean_profile)
     return ProfileResponse(profile=clean_profile)
 
 
+# Body bytes gathered before one threadpool scan; amortises the hop over Starlette's small chunks.
+_SCAN_BATCH_BYTES = 1 << 20
+
+
+@router.post(
+    "/probe/profile_stream",
+    status_code=status.HTTP_200_OK,
+    response_model=ProfileResponse,
+    dependencies=[Depends(authenticate_request)],
+)
+async def probe_profile_stream(
+    request: Request, settings: Settings = Depends(settings_dependency)
+) -> ProfileResponse:
+    """Profile a whole document sent as a raw UTF-8 body, in constant memory (samples are not echoed).
+
+    Body chunks are batched and scanned in the threadpool so the event loop only moves bytes.
+    """
+
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    accumulator = ProfileAccumulator()
+    received = 0
+    pending: List[bytes] = []
+    pending_bytes = 0
+    async for data in request.stream():
+        received += len(data)
+        if received > settings.limits.max_stream_bytes:
+            raise_error("ERR_PAYLOAD_TOO_LARGE", detail=f"body exceeds {settings.limits.max_stream_bytes} bytes")
+        pending.append(data)
+        pending_bytes += len(data)
+        if pending_bytes >= _SCAN_BATCH_BYTES:
+            await run_in_threadpool(accumulator.feed, decoder.decode(b"".join(pending)))
+            pending, pending_bytes = [], 0
+    await run_in_threadpool(accumulator.feed, decoder.decode(b"".join(pending), final=True))
+    if not received:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="request body is empty")
+    profile = _round_profile(accumulator.signals(), 3)
+    logger.info("probe_profile_stream: bytes=%d profile=%s", received, profile)
+    return ProfileResponse(profile=profile)
+
+
 @router.post(
     "/probe/recommend_strategy",
     status_code=status.HTTP_200_OK,
@@ -48,20 +137,171 @@ async def recommend_slice_strategy(
     payload: StrategyRecommendRequest, settings: Settings = Depends(settings_dependency)
 ) -> StrategyRecommendResponse:
     custom_cfg = payload.custom.model_dump() if payload.custom else {}
-    try:
-        profile = extract_signals_from_samples(payload.samples)
-        
-    except ValueError as exc:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
-
-    clean_profile = _round_profile({k: v for k, v in profile.items() if k != "para_lengths"}, 3)
-    logger.info("recommend_slice_strategy: profile=%s", clean_profile)
-
-    recommendation = recommend_strategy(
-        profile,
-        samples=payload.samples,
+    size = _check_samples(payload.samples, settings)
+    key = recommendation_key(
+        payload.samples,
+        source_format=payload.source_format,
         custom_cfg=custom_cfg,
         emit_candidates=payload.emit_candidates,
-        source_format=payload.source_format,
     )
+    recommendation = await _cpu(
+        key,
+        compute_recommendation,
+        payload.samples,
+        None,
+        payload.source_format,
+        custom_cfg,
+        payload.emit_candidates,
+        size=size,
+        settings=settings,
+    )
+
+    logger.info("recommend_slice_strategy: profile=%s", recommendation["profile"])
     return StrategyRecommendResponse(recommendation=recommendation)
+
+
+@router.post(
+    "/probe/recommend_batch",
+    status_code=status.HTTP_200_OK,
+    response_model=RecommendBatchResponse,
+    dependencies=[Depends(authenticate_request)],
+)
+async def recommend_slice_strategy_batch(
+    payload: RecommendBatchRequest, settings: Settings = Depends(settings_dependency)
+) -> RecommendBatchResponse:
+    limits = settings.limits
+    if len(payload.documents) > limits.max_batch_documents:
+        raise_error("ERR_PAYLOAD_TOO_LARGE", detail=f"at most {limits.max_batch_documents} documents per batch")
+    size = sum(_check_samples(doc.samples, settings) for doc in payload.documents)
+    if size > limits.max_batch_chars:
+        raise_error("ERR_PAYLOAD_TOO_LARGE", detail=f"batch samples exceed {limits.max_batch_chars} characters")
+    custom_cfg = payload.custom.model_dump() if payload.custom else {}
+    try:
+        results = await run_batch(
+            [doc.model_dump() for doc in payload.documents],
+            custom_cfg=custom_cfg,
+            emit_candidates=payload.emit_candidates,
+            size=size,
+            settings=settings,
+        )
+    except ExecutorBusy as exc:
+        raise_error("ERR_BUSY", detail=str(exc))
+    logger.info("recommend_slice_strategy_batch: documents=%d", len(results))
+    return RecommendBatchResponse(results=results)
+
+
+@router.post(
+    "/slice",
+    status_code=status.HTTP_200_OK,
+    response_model=SliceResponse,
+    dependencies=[Depends(authenticate_request)],
+)
+async def slice_text(payload: SliceRequest, settings: Settings = Depends(settings_dependency)) -> SliceResponse:
+    if len(payload.text) > settings.limits.max_slice_chars:
+        raise_error("ERR_PAYLOAD_TOO_LARGE", detail=f"text exceeds {settings.limits.max_slice_chars} characters")
+    custom_cfg = payload.custom.model_dump() if payload.custom else {}
+    result = await _cpu(
+        None,
+        slice_text_payload,
+        payload.text,
+        payload.mode,
+        payload.params,
+        payload.source_format,
+        custom_cfg,
+        payload.include_text,
+        size=len(payload.text),
+        settings=settings,
+    )
+    if payload.dedup is not None:
+        result = await run_in_threadpool(dedup_slice_result, payload.text, result, payload.dedup.model_dump(), settings)
+    logger.info("slice_text: mode=%s strategy=%s chunks=%d", result["mode"], result["strategy_id"], result["total"])
+    return SliceResponse(**result)
+
+
+@router.post(
+    "/slice/diff",
+    status_code=status.HTTP_200_OK,
+    response_model=SliceDiffResponse,
+    dependencies=[Depends(authenticate_request)],
+)
+async def slice_text_diff(payload: SliceDiffRequest, settings: Settings = Depends(settings_dependency)) -> SliceDiffResponse:
+    size = len(payload.text) + len(payload.previous_text or "")
+    if size > settings.limits.max_slice_chars:
+        raise_error("ERR_PAYLOAD_TOO_LARGE", detail=f"text exceeds {settings.limits.max_slice_chars} characters")
+    result = await _cpu(
+        None,
+        reslice,
+        payload.text,
+        payload.previous_hashes,
+        payload.previous_text,
+        payload.mode,
+        payload.params,
+        payload.source_format,
+        payload.custom.model_dump() if payload.custom else {},
+        payload.include_text,
+        size=size,
+        settings=settings,
+    )
+    if payload.dedup is not None:
+        added = await run_in_threadpool(
+            dedup_slice_result, payload.text, {"chunks": result["added"]}, payload.dedup.model_dump(), settings
+        )
+        result.update(added=added["chunks"], dedup=added["dedup"])
+    logger.info(
+        "slice_text_diff: mode=%s chunks=%d added=%d removed=%d",
+        result["mode"],
+        result["total"],
+        len(result["added"]),
+        len(result["removed"]),
+    )
+    return SliceDiffResponse(**result)
+
+
+_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+
+def _ndjson(batches: Iterator[TableBatch], spool: Any) -> Iterator[bytes]:
+    total = 0
+    try:
+        for batch in batches:
+            total += 1
+            yield (json.dumps(batch.to_dict(), ensure_ascii=False) + "\n").encode("utf-8")
+    finally:
+        spool.close()
+        logger.info("slice_table: batches=%d", total)
+
+
+@router.post(
+    "/slice/table",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(authenticate_request)],
+    response_class=StreamingResponse,
+)
+async def slice_table_stream(
+    request: Request,
+    source_format: str = Query(..., description="csv / tsv / xlsx / xls"),
+    target_length: int | None = Query(default=None, ge=1, description="Max characters per batch, header included"),
+    target_tokens: int | None = Query(default=None, ge=1, description="Max tokens per batch; overrides target_length"),
+    max_rows: int | None = Query(default=None, ge=1, description="Max data rows per batch"),
+    sheet: List[str] | None = Query(default=None, description="Only these sheets (xlsx/xls)"),
+    settings: Settings = Depends(settings_dependency),
+) -> StreamingResponse:
+    """Stream ``table_batch`` chunks of a raw spreadsheet/CSV body as NDJSON, one batch per line."""
+
+    # The body is spooled (to disk beyond a few MB) because openpyxl needs a seekable file.
+    spool = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_BYTES)
+    received = 0
+    async for data in request.stream():
+        received += len(data)
+        if received > settings.limits.max_table_bytes:
+            spool.close()
+            raise_error("ERR_PAYLOAD_TOO_LARGE", detail=f"table exceeds {settings.limits.max_table_bytes} bytes")
+        spool.write(data)
+    spool.seek(0)
+    params = {"target_length": target_length, "target_tokens": target_tokens, "max_rows": max_rows}
+    try:
+        batches = await run_in_threadpool(slice_table, spool, source_format, params, sheets=sheet)
+    except ValueError as exc:
+        spool.close()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    return StreamingResponse(_ndjson(batches, spool), media_type="application/x-ndjson")
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Literal
 
 from pydantic import BaseModel, Field
 
@@ -18,6 +18,7 @@ class CustomDelimiterConfig(BaseModel):
     min_segment_len: int = 30
     max_segment_len: int = 800
     overlap_ratio: float | None = None
+    target_tokens: int | None = Field(default=None, description="Embedding model token budget per chunk")
 
 
 class ProfileFeatures(BaseModel):
@@ -28,7 +29,7 @@ class ProfileFeatures(BaseModel):
     p90_para_len: int = 0
     p50_para_len: int = 0
     digit_symbol_ratio: float | None = None
-    samples: List[str] = Field(default_factory=list)
+    samples: List[str] = Field(default_factory=list, description="Deprecated: always empty, samples are not echoed")
 
 
 class ProfileResponse(BaseModel):
@@ -57,3 +58,86 @@ class StrategyRecommendRequest(BaseModel):
 
 class StrategyRecommendResponse(BaseModel):
     recommendation: StrategyRecommendation
+
+
+class BatchDocument(BaseModel):
+    samples: List[str] = Field(..., description="Text probe samples of one document")
+    source_format: str | None = None
+
+
+class RecommendBatchRequest(BaseModel):
+    documents: List[BatchDocument] = Field(..., min_length=1)
+    custom: CustomDelimiterConfig | None = Field(default=None, description="Shared by every document in the batch")
+    emit_candidates: bool = False
+
+
+class RecommendBatchItem(BaseModel):
+    index: int
+    recommendation: StrategyRecommendation | None = None
+    error: str | None = None
+
+
+class RecommendBatchResponse(BaseModel):
+    results: List[RecommendBatchItem]
+
+
+class DedupOptions(BaseModel):
+    action: Literal["link", "drop"] = Field(default="link", description="link: annotate duplicate_of; drop: remove")
+    threshold: float | None = Field(default=None, ge=0.0, le=1.0, description="Estimated Jaccard; default dedup.threshold")
+    knowledge_base: str | None = Field(default=None, description="Also dedup against this knowledge base (Redis)")
+    doc_id: str | None = Field(default=None, description="Chunk id prefix; defaults to a hash of the text")
+
+
+class SliceRequest(BaseModel):
+    text: str = Field(..., description="Full text to slice")
+    mode: str | None = Field(
+        default=None, description="direct_delimiter / semantic_sentence / hierarchical_heading; omitted -> recommended"
+    )
+    params: Dict[str, Any] | None = Field(default=None, description="Slicing params, e.g. target_length/overlap_ratio")
+    custom: CustomDelimiterConfig | None = None
+    source_format: str | None = None
+    include_text: bool = Field(default=True, description="False -> offsets only; the caller already holds the text")
+    dedup: DedupOptions | None = Field(default=None, description="Near-duplicate chunk elimination before embedding")
+
+
+class SliceChunk(BaseModel):
+    index: int
+    text: str | None = None
+    start: int
+    end: int
+    section_path: List[str] = Field(default_factory=list)
+    id: str | None = None
+    duplicate_of: str | None = None
+    hash: str | None = Field(default=None, description="Content hash (text + section path) of content-defined chunks")
+
+
+class SliceResponse(BaseModel):
+    strategy_id: str | None = None
+    mode: str
+    params: Dict[str, Any]
+    total: int
+    chunks: List[SliceChunk]
+    dedup: Dict[str, Any] | None = None
+
+
+class SliceDiffRequest(SliceRequest):
+    previous_hashes: List[str] | None = Field(
+        default=None,
+        description="Chunk hashes returned for the previous version (response field `hashes`); "
+        "requires the `mode`/`params` returned with them",
+    )
+    previous_text: str | None = Field(
+        default=None, description="Previous version's text, re-sliced with the same plan (instead of previous_hashes)"
+    )
+
+
+class SliceDiffResponse(BaseModel):
+    strategy_id: str | None = None
+    mode: str
+    params: Dict[str, Any]
+    total: int
+    hashes: List[str]
+    added: List[SliceChunk]
+    unchanged: List[str]
+    removed: List[str]
+    dedup: Dict[str, Any] | None = None
@@ -2,15 +2,25 @@
 
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI, Response
 
 from prometheus_client import CONTENT_TYPE_LATEST
 
 from .config import get_settings
 from .api.routes import router as api_router
+from .executor import shutdown_pool
 from .monitoring import render_metrics
 
 
+@asynccontextmanager
+async def _lifespan(app: FastAPI) -> AsyncIterator[None]:
+    yield
+    shutdown_pool()
+
+
 def create_app() -> FastAPI:
     settings = get_settings()
 
@@ -20,6 +30,7 @@ def create_app() -> FastAPI:
         docs_url=f"{settings.base_url}/docs",
         redoc_url=f"{settings.base_url}/redoc",
         openapi_url=f"{settings.base_url}/openapi.json",
+        lifespan=_lifespan,
     )
 
     app.include_router(api_router, prefix=settings.base_url)
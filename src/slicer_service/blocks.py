@@ -0,0 +1,152 @@
+"""mmap-backed ``code_log_block`` chunker for large code and log files.
+
+The file is memory-mapped read-only and scanned by one compiled bytes regex
+for lines that can open a block: blank lines, timestamp prefixes, stack-trace
+headers, code fences and top-level definitions. Adjacent blocks are packed up
+to ``target_length`` bytes without overlap (the recommender sets
+``no_overlap``); a single block larger than that is split at line breaks, and
+a single over-long line at a UTF-8 character boundary.
+
+Only ``(start, end)`` byte offsets are produced — nothing is decoded or copied,
+so multi-GB logs are chunked with the page cache doing the I/O. Callers slice
+the map (``memoryview(mapped)[start:end]``) when they need the bytes.
+"""
+
+from __future__ import annotations
+
+import mmap
+import re
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+
+from .recommendation import DEFAULT_TEXT_PARAMS
+
+Span = Tuple[int, int]
+Buffer = Union[bytes, bytearray, mmap.mmap]
+
+# What may open a block, matched right after a newline.
+_BLOCK_START = (
+    rb"[ \t\r\f\v]*\n"  # blank line
+    rb"|\[?\d{4}[-/]\d{2}[-/]\d{2}[T ]\d{2}:\d{2}:\d{2}"  # 2024-05-01 12:00:00 / [2024-05-01T12:00:00
+    rb"|\[?\d{2}:\d{2}:\d{2}[.,]\d+"  # 12:00:00.123
+    rb"|(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec) [ \d]\d \d{2}:\d{2}:\d{2}"  # syslog
+    rb"|Traceback \(most recent call last\):"
+    rb"|Exception in thread "
+    rb"|(?:panic|goroutine \d+)\b"
+    rb"|```|~~~"
+    rb"|(?:async def|def|class|function|func|fn|pub fn|impl|public|private|protected|interface|struct)\b"
+)
+# Longest prefix the lookahead needs past the cut point.
+_LOOKAHEAD = 64
+_WHITESPACE = frozenset(b" \t\r\n\f\v")
+
+
+@dataclass(frozen=True)
+class Block:
+    index: int
+    start: int
+    end: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"index": self.index, "start": self.start, "end": self.end}
+
+
+def _trim(buf: Buffer, start: int, end: int) -> Optional[Span]:
+    """Drop leading blank lines (keeping the first line's indentation) and trailing whitespace."""
+    line_start = start
+    while start < end and buf[start] in _WHITESPACE:
+        start += 1
+        if buf[start - 1] == 0x0A:
+            line_start = start
+    while end > start and buf[end - 1] in _WHITESPACE:
+        end -= 1
+    return (line_start, end) if start < end else None
+
+
+def _char_boundary(buf: Buffer, pos: int, floor: int) -> int:
+    # Step back over UTF-8 continuation bytes so a hard cut never splits a character.
+    while pos > floor + 1 and buf[pos] & 0xC0 == 0x80:
+        pos -= 1
+    return pos
+
+
+@lru_cache(maxsize=32)
+def _last_boundary(limit: int) -> re.Pattern[bytes]:
+    # Greedy prefix + backtracking: the regex engine walks back from ``limit`` bytes ahead to the
+    # *last* line that opens a block, so each chunk costs O(limit) in C rather than a Python step per line.
+    return re.compile(rb"(?s).{0,%d}\n(?=%s)" % (limit - 1, _BLOCK_START))
+
+
+def iter_block_cuts(
+    buf: Buffer, params: Dict[str, Any] | None = None, start: int = 0
+) -> Iterator[Tuple[Optional[Span], int]]:
+    """Yield ``(trimmed span or None, cut)`` per chunk from byte ``start``; ``cut`` is where the next chunk begins.
+
+    Resuming from a yielded ``cut`` reproduces the rest of the sequence exactly, which is how callers page
+    through huge files.
+    """
+
+    params = params or {}
+    limit = max(int(params.get("target_length") or DEFAULT_TEXT_PARAMS["target_length"]), 2)
+    pattern = _last_boundary(limit)
+    size = len(buf)
+    pos = start
+    while pos < size:
+        if size - pos <= limit:
+            cut = size
+        else:
+            match = pattern.match(buf, pos, pos + limit + _LOOKAHEAD)
+            if match:
+                cut = match.end()
+            else:
+                newline = buf.rfind(b"\n", pos, pos + limit)
+                cut = newline + 1 if newline >= pos else _char_boundary(buf, pos + limit, pos)
+        yield _trim(buf, pos, cut), cut
+        pos = cut
+
+
+def iter_block_spans(buf: Buffer, params: Dict[str, Any] | None = None) -> Iterator[Span]:
+    """Yield trimmed ``(start, end)`` byte offsets of packed blocks, in order, without copying ``buf``.
+
+    Each chunk ends at the last block start within ``target_length`` bytes; without one it ends at the
+    last line break, and failing that at a character boundary.
+    """
+
+    for span, _ in iter_block_cuts(buf, params):
+        if span:
+            yield span
+
+
+def iter_blocks(buf: Buffer, params: Dict[str, Any] | None = None) -> Iterator[Block]:
+    for index, (start, end) in enumerate(iter_block_spans(buf, params)):
+        yield Block(index, start, end)
+
+
+@contextmanager
+def map_file(path: Union[str, Path]) -> Iterator[Buffer]:
+    """Read-only map of ``path`` (an empty ``bytes`` for empty files, which cannot be mapped)."""
+
+    with open(path, "rb") as handle:
+        if not Path(path).stat().st_size:
+            yield b""
+            return
+        mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if hasattr(mapped, "madvise"):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            yield mapped
+        finally:
+            mapped.close()
+
+
+def slice_file(path: Union[str, Path], params: Dict[str, Any] | None = None) -> Iterator[Block]:
+    """Lazily chunk a code/log file by byte offsets; the file stays mapped until the iterator is exhausted."""
+
+    with map_file(path) as mapped:
+        yield from iter_blocks(mapped, params)
+
+
+__all__ = ["Block", "iter_block_cuts", "iter_block_spans", "iter_blocks", "map_file", "slice_file"]
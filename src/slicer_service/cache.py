@@ -0,0 +1,225 @@
+"""Two-tier cache for probe profiles and strategy recommendations.
+
+Results are keyed by a fingerprint of everything that determines them: the
+samples (hashed exactly and length-framed, since delimiter hits, paragraph
+lengths and every other signal depend on the full text), the
+normalised ``source_format``, the custom config merged over its defaults and
+``emit_candidates``. An in-process LRU answers repeated probes without any I/O;
+behind it a Redis tier with TTL shares results across API/worker processes.
+Redis is best-effort: on connection errors the tier is skipped for a short
+back-off and the cache degrades to LRU only.
+
+Cached values are shared objects — callers must treat them as read-only.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Sequence
+
+import redis
+
+from .config import Settings, get_settings
+from .recommendation import DEFAULT_CUSTOM_CFG, _normalize_fmt, extract_signals_from_samples, recommend_strategy
+
+logger = logging.getLogger(__name__)
+
+# Bump when profile/scoring logic changes so stale Redis entries are ignored.
+CACHE_VERSION = "2"
+_REDIS_RETRY_SEC = 30.0
+
+
+def fingerprint(
+    kind: str,
+    samples: Sequence[str],
+    *,
+    source_format: str | None = None,
+    custom_cfg: Dict[str, Any] | None = None,
+    emit_candidates: bool = False,
+    profile: Dict[str, Any] | None = None,
+) -> str:
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{CACHE_VERSION}|{kind}|{len(samples)}|".encode())
+    for text in samples:
+        data = (text or "").encode("utf-8", "surrogatepass")
+        digest.update(b"%d:" % len(data))
+        digest.update(data)
+    options = {
+        "source_format": _normalize_fmt(source_format),
+        "custom": {**DEFAULT_CUSTOM_CFG, **(custom_cfg or {})},
+        "emit_candidates": bool(emit_candidates),
+        "profile": profile,
+    }
+    digest.update(json.dumps(options, sort_keys=True, ensure_ascii=False, default=str).encode())
+    return digest.hexdigest()
+
+
+class RecommendationCache:
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_sec: int,
+        redis_client: Optional[redis.Redis] = None,
+        key_prefix: str = "slicer:probe",
+    ) -> None:
+        self._max_entries = max_entries
+        self._ttl = ttl_sec
+        self._redis = redis_client
+        self._prefix = key_prefix
+        self._local: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis_down_until = 0.0
+
+    def _remote(self) -> Optional[redis.Redis]:
+        if self._redis is None or time.monotonic() < self._redis_down_until:
+            return None
+        return self._redis
+
+    def _remote_failed(self, exc: Exception) -> None:
+        logger.warning("Recommendation cache Redis unavailable, using LRU only for %.0fs: %s", _REDIS_RETRY_SEC, exc)
+        self._redis_down_until = time.monotonic() + _REDIS_RETRY_SEC
+
+    def _remember(self, key: str, value: Any) -> None:
+        if self._max_entries <= 0:
+            return
+        with self._lock:
+            self._local[key] = value
+            self._local.move_to_end(key)
+            while len(self._local) > self._max_entries:
+                self._local.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key in self._local:
+                self._local.move_to_end(key)
+                return self._local[key]
+        client = self._remote()
+        if client is None:
+            return None
+        try:
+            raw = client.get(f"{self._prefix}:{key}")
+        except redis.RedisError as exc:
+            self._remote_failed(exc)
+            return None
+        if raw is None:
+            return None
+        value = json.loads(raw)
+        self._remember(key, value)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self._remember(key, value)
+        client = self._remote()
+        if client is None:
+            return
+        try:
+            client.set(f"{self._prefix}:{key}", json.dumps(value, ensure_ascii=False), ex=self._ttl)
+        except redis.RedisError as exc:
+            self._remote_failed(exc)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def clear_local(self) -> None:
+        with self._lock:
+            self._local.clear()
+
+
+@lru_cache
+def get_cache() -> RecommendationCache:
+    settings: Settings = get_settings()
+    cfg = settings.cache
+    client = None
+    if cfg.enabled and cfg.redis_ttl_sec > 0:
+        client = redis.Redis.from_url(
+            cfg.redis_url or settings.celery.result_backend,
+            socket_connect_timeout=cfg.redis_timeout_sec,
+            socket_timeout=cfg.redis_timeout_sec,
+        )
+    return RecommendationCache(cfg.max_entries if cfg.enabled else 0, cfg.redis_ttl_sec, client)
+
+
+def profile_key(samples: Sequence[str]) -> str:
+    return fingerprint("profile", samples)
+
+
+def cached_profile(samples: Sequence[str]) -> Dict[str, Any]:
+    key = profile_key(samples)
+    return get_cache().get_or_compute(key, lambda: extract_signals_from_samples(samples))
+
+
+def recommendation_key(
+    samples: Sequence[str],
+    *,
+    profile: Dict[str, Any] | None = None,
+    source_format: str | None = None,
+    custom_cfg: Dict[str, Any] | None = None,
+    emit_candidates: bool = False,
+) -> str:
+    return fingerprint(
+        "recommend",
+        samples,
+        source_format=source_format,
+        custom_cfg=custom_cfg,
+        emit_candidates=emit_candidates,
+        profile=profile,
+    )
+
+
+def compute_recommendation(
+    samples: Sequence[str],
+    profile: Dict[str, Any] | None = None,
+    source_format: str | None = None,
+    custom_cfg: Dict[str, Any] | None = None,
+    emit_candidates: bool = False,
+) -> Dict[str, Any]:
+    """Uncached ``recommend_strategy`` (module-level and cache-free so it can run in the process pool)."""
+
+    return recommend_strategy(
+        profile or extract_signals_from_samples(samples),
+        samples=samples,
+        custom_cfg=custom_cfg,
+        emit_candidates=emit_candidates,
+        source_format=source_format,
+    )
+
+
+def cached_recommendation(
+    samples: Sequence[str],
+    *,
+    profile: Dict[str, Any] | None = None,
+    source_format: str | None = None,
+    custom_cfg: Dict[str, Any] | None = None,
+    emit_candidates: bool = False,
+) -> Dict[str, Any]:
+    """``recommend_strategy`` for ``samples``; an explicit ``profile`` becomes part of the key."""
+
+    key = recommendation_key(
+        samples, profile=profile, source_format=source_format, custom_cfg=custom_cfg, emit_candidates=emit_candidates
+    )
+    return get_cache().get_or_compute(
+        key, lambda: compute_recommendation(samples, profile, source_format, custom_cfg, emit_candidates)
+    )
+
+
+__all__ = [
+    "CACHE_VERSION",
+    "RecommendationCache",
+    "cached_profile",
+    "cached_recommendation",
+    "compute_recommendation",
+    "fingerprint",
+    "get_cache",
+    "profile_key",
+    "recommendation_key",
+]
@@ -6,8 +6,14 @@ import logging
 
 from celery import Celery, signals
 
+from .blocks import iter_block_cuts, map_file
+from .cache import cached_profile, cached_recommendation
+from .chunker import slice_text
 from .config import Settings, get_settings
-from .recommendation import _round_profile, extract_signals_from_samples, recommend_strategy
+from .dedup import dedup_slice_result
+from .executor import recommend_batch
+from .incremental import reslice
+from .recommendation import _round_profile
 from .monitoring import ensure_metrics_server
 
 logger = logging.getLogger(__name__)
@@ -39,21 +45,93 @@ def _on_worker_ready(sender=None, **kwargs):  # type: ignore[override]
 @celery_app.task(name="probe.extract_signals")
 def probe_extract_signals(payload):
     samples = payload.get("samples") or []
-    profile = extract_signals_from_samples(samples)
+    profile = cached_profile(samples)
     return _round_profile(profile, 3)
 
 
 @celery_app.task(name="probe.recommend_strategy")
 def probe_recommend_strategy(payload):
-    samples = payload.get("samples") or []
-    profile = payload.get("profile") or extract_signals_from_samples(samples)
-    custom_cfg = payload.get("custom") or {}
-    emit_candidates = bool(payload.get("emit_candidates", False))
-    source_format = payload.get("source_format")
-    return recommend_strategy(
-        profile,
-        samples=samples,
-        custom_cfg=custom_cfg,
-        emit_candidates=emit_candidates,
-        source_format=source_format,
+    return cached_recommendation(
+        payload.get("samples") or [],
+        profile=payload.get("profile") or None,
+        custom_cfg=payload.get("custom") or {},
+        emit_candidates=bool(payload.get("emit_candidates", False)),
+        source_format=payload.get("source_format"),
+    )
+
+
+@celery_app.task(name="probe.recommend_batch")
+def probe_recommend_batch(payload):
+    return recommend_batch(
+        payload.get("documents") or [],
+        custom_cfg=payload.get("custom") or {},
+        emit_candidates=bool(payload.get("emit_candidates", False)),
+        settings=SETTINGS,
+    )
+
+
+@celery_app.task(name="slice.chunk_text")
+def slice_chunk_text(payload):
+    text = payload.get("text") or ""
+    result = slice_text(
+        text,
+        payload.get("mode"),
+        payload.get("params"),
+        payload.get("source_format"),
+        payload.get("custom") or {},
+        payload.get("include_text", True),
+    )
+    if payload.get("dedup") is not None:
+        result = dedup_slice_result(text, result, payload["dedup"])
+    return result
+
+
+@celery_app.task(name="slice.diff")
+def slice_diff(payload):
+    """Content-defined re-slice of a new document version, diffed against the previous one."""
+    text = payload.get("text") or ""
+    result = reslice(
+        text,
+        payload.get("previous_hashes"),
+        payload.get("previous_text"),
+        payload.get("mode"),
+        payload.get("params"),
+        payload.get("source_format"),
+        payload.get("custom") or {},
+        payload.get("include_text", True),
     )
+    if payload.get("dedup") is not None:
+        added = dedup_slice_result(text, {"chunks": result["added"]}, payload["dedup"])
+        result.update(added=added["chunks"], dedup=added["dedup"])
+    return result
+
+
+@celery_app.task(name="slice.code_log_blocks")
+def slice_code_log_blocks(payload):
+    """Chunk a worker-local code/log file by byte offsets (mmap, no text in the result), one page per call.
+
+    A page holds at most ``max_spans`` spans (capped by ``limits.max_block_spans``) starting at byte ``offset``;
+    ``next_offset`` is passed back as ``offset`` for the next page and is ``None`` once the file is done.
+    """
+    path = payload["path"]
+    offset = int(payload.get("offset") or 0)
+    cap = SETTINGS.limits.max_block_spans
+    max_spans = min(int(payload.get("max_spans") or cap), cap)
+    spans = []
+    next_offset = None
+    with map_file(path) as mapped:
+        for span, cut in iter_block_cuts(mapped, payload.get("params"), offset):
+            if span:
+                spans.append(list(span))
+            if len(spans) >= max_spans and cut < len(mapped):
+                next_offset = cut
+                break
+    logger.info("slice.code_log_blocks: path=%s offset=%d blocks=%d", path, offset, len(spans))
+    return {
+        "strategy_id": "code_log_block",
+        "path": path,
+        "offset": offset,
+        "next_offset": next_offset,
+        "total": len(spans),
+        "spans": spans,
+    }
@@ -0,0 +1,438 @@
+"""Chunk execution engine for the three recommended slicing modes.
+
+``iter_chunks`` turns a text into chunks lazily, following the ``mode`` and
+``params`` returned by :func:`recommend_strategy`:
+
+- ``direct_delimiter``：按自定义分隔符（正则）直切，过短片段并入后一段，超长片段按
+  ``max_segment_len`` 滑窗拆分；
+- ``semantic_sentence``：按句末标点/换行切句，贪心合并到 ``target_length``，相邻块保留
+  ``overlap_ratio`` 比例的尾句作为重叠；
+- ``hierarchical_heading``：按标题行划分章节（维护标题路径），章节内再按句级合并。
+
+Every chunk carries ``[start, end)`` character offsets into the source, with
+``text == source[start:end]`` (leading/trailing whitespace trimmed). Each pass
+walks the text once with ``finditer``; apart from the configured overlap no
+character is visited twice, so slicing is O(n).
+
+With ``params["target_tokens"]`` the sentence/heading modes pack to a token
+budget instead of ``target_length`` characters, counting each sentence with
+the configured :mod:`slicer_service.tokens` counter.
+
+With ``params["content_defined"]`` the sentence/heading modes place chunk
+boundaries by content instead of by position: a boundary is taken at a
+sentence break when a hash of the text just before it falls under a
+threshold, so an edit only moves the boundaries next to it and the chunks of
+unchanged regions come out identical (see :mod:`slicer_service.incremental`).
+
+``build_span_table`` records the same chunks (and, for headings, the section
+tree they belong to) as offsets in a :class:`~slicer_service.spans.SpanTable`;
+``slice_text`` builds its payload from it, copying chunk text only when the
+caller asks for it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .recommendation import (
+    DEFAULT_TEXT_PARAMS,
+    MODE_DIRECT,
+    MODE_HIERARCHICAL,
+    MODE_ID_MAP,
+    MODE_SEMANTIC,
+    extract_signals_from_samples,
+    recommend_strategy,
+)
+from .spans import NO_PARENT, SpanTable, TextBuffer
+from .tokens import get_token_counter
+
+Span = Tuple[int, int]
+Measure = Callable[[int, int], int]  # size of text[start:end] in budget units
+
+_SENTENCE_END = re.compile(r"[。！？!?；;…]+[”’\"'」』）)]*|\.(?=\s)|\n")
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_HEADING_LINE = re.compile(
+    r"^[ \t]*(?:"
+    r"(?P<hashes>#{1,6})[ \t]+"
+    r"|(?P<num>\d+(?:\.\d+)*)(?:[.、)]|(?=[ \t]))[ \t]*(?=\S)"
+    r"|(?P<cn>[一二三四五六七八九十]+)、"
+    r"|第[一二三四五六七八九十百零\d]+(?P<unit>[章篇节条]|部分)"
+    r")[^\n]*$",
+    re.M,
+)
+_MAX_HEADING_LEN = 80
+_SENTENCE_TAIL = tuple("。！？!?；;，,：:")
+_UNIT_LEVEL = {"章": 1, "篇": 1, "部分": 1, "节": 2, "条": 3}
+# Content-defined boundaries: hash window before a break, minimum chunk share of target, mean extra length.
+_CDC_WINDOW = 32
+_CDC_MIN_RATIO = 0.25
+_CDC_SPREAD_RATIO = 0.5
+
+
+@dataclass(frozen=True)
+class Chunk:
+    index: int
+    text: str
+    start: int
+    end: int
+    section_path: Tuple[str, ...] = ()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "text": self.text,
+            "start": self.start,
+            "end": self.end,
+            "section_path": list(self.section_path),
+        }
+
+
+def _trim(text: str, start: int, end: int) -> Optional[Span]:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return (start, end) if start < end else None
+
+
+def _split_on(pattern: re.Pattern[str], text: str, start: int, end: int, keep: bool) -> Iterator[Span]:
+    """Contiguous pieces of ``text[start:end]`` cut at ``pattern``; ``keep`` leaves the match on the left piece."""
+
+    pos = start
+    for match in pattern.finditer(text, start, end):
+        yield (pos, match.end() if keep else match.start())
+        pos = match.end()
+    if pos < end:
+        yield (pos, end)
+
+
+def _windows(start: int, end: int, size: int, overlap: int) -> Iterator[Span]:
+    stride = max(size - overlap, 1)
+    pos = start
+    while True:
+        yield (pos, min(pos + size, end))
+        if pos + size >= end:
+            return
+        pos += stride
+
+
+def _chars(start: int, end: int) -> int:
+    return end - start
+
+
+def _oversized(start: int, end: int, cost: int, target: int, overlap: int) -> Iterator[Span]:
+    # Window a span that alone exceeds the budget; budgets in tokens are converted at the span's own density.
+    scale = (end - start) / cost
+    return _windows(start, end, max(int(target * scale), 1), int(overlap * scale))
+
+
+def _pack(spans: Iterable[Span], target: int, overlap: int, measure: Measure = _chars) -> Iterator[Span]:
+    """Greedily merge contiguous spans up to ``target`` units, carrying ≤ ``overlap`` units of tail spans.
+
+    Units are characters, or whatever ``measure(start, end)`` counts (tokens for a token budget).
+    """
+
+    window: Deque[Tuple[int, int, int]] = deque()  # (start, end, cost)
+    size = 0
+    for start, end in spans:
+        cost = measure(start, end)
+        if cost > target:
+            if window:
+                yield (window[0][0], window[-1][1])
+                window.clear()
+                size = 0
+            yield from _oversized(start, end, cost, target, overlap)
+            continue
+        if window and size + cost > target:
+            yield (window[0][0], window[-1][1])
+            # Drop at least one span so every chunk advances; keep a tail within the overlap budget.
+            size -= window.popleft()[2]
+            while window and size > overlap:
+                size -= window.popleft()[2]
+            if window and size + cost > target:
+                window.clear()
+                size = 0
+        window.append((start, end, cost))
+        size += cost
+    if window:
+        yield (window[0][0], window[-1][1])
+
+
+def _sentence_spans(
+    text: str, start: int, end: int, target: int, overlap: int, measure: Measure = _chars
+) -> Iterator[Span]:
+    return _pack(_split_on(_SENTENCE_END, text, start, end, keep=True), target, overlap, measure)
+
+
+def _breakpoint_hash(text: str, floor: int, end: int) -> float:
+    window = text[max(end - _CDC_WINDOW, floor) : end].strip()
+    return zlib.crc32(window.encode("utf-8", "surrogatepass")) / 0x1_0000_0000
+
+
+def _content_defined_spans(
+    text: str, start: int, end: int, target: int, measure: Measure = _chars
+) -> Iterator[Span]:
+    """Merge sentences into chunks of ≤ ``target`` units, cutting where the content says so.
+
+    After ``target * _CDC_MIN_RATIO`` units, each sentence break is a boundary with probability proportional
+    to the sentence's size (decided by a hash of the ``_CDC_WINDOW`` chars before it), i.e. about one cut
+    per ``target * _CDC_SPREAD_RATIO`` units. The decision depends only on nearby text, so boundaries
+    re-synchronise right after an edit. No overlap is carried: it would tie each chunk to its neighbour.
+    """
+
+    min_size = int(target * _CDC_MIN_RATIO)
+    spread = max(target * _CDC_SPREAD_RATIO, 1.0)
+    chunk_start: Optional[int] = None
+    last_end = start
+    size = 0
+    for span in _split_on(_SENTENCE_END, text, start, end, keep=True):
+        cost = measure(*span)
+        if cost > target:
+            if chunk_start is not None:
+                yield (chunk_start, last_end)
+                chunk_start = None
+            # Anchored at the sentence start, so an oversized sentence still splits the same way wherever it moves.
+            yield from _oversized(span[0], span[1], cost, target, 0)
+            last_end = span[1]
+            continue
+        if chunk_start is not None and size + cost > target:
+            yield (chunk_start, last_end)
+            chunk_start = None
+        if chunk_start is None:
+            chunk_start, size = span[0], 0
+        last_end = span[1]
+        size += cost
+        if size >= min_size and _breakpoint_hash(text, start, span[1]) < cost / spread:
+            yield (chunk_start, span[1])
+            chunk_start = None
+    if chunk_start is not None:
+        yield (chunk_start, last_end)
+
+
+def _delimiter_spans(text: str, params: Dict[str, Any]) -> Iterator[Span]:
+    delimiters = [d for d in params.get("delimiters") or [] if d]
+    try:
+        pattern = re.compile("|".join(f"(?:{d})" for d in delimiters)) if delimiters else _PARAGRAPH_BREAK
+    except re.error as exc:
+        raise ValueError(f"Invalid delimiter pattern: {exc}") from exc
+    min_len = int(params.get("min_segment_len") or 0)
+    max_len = max(int(params.get("max_segment_len") or 800), 1)
+    overlap = int(max_len * float(params.get("overlap_ratio") or 0.0))
+
+    pending: Optional[int] = None  # start of short segments waiting to be merged forward
+    for seg_start, seg_end in _split_on(pattern, text, 0, len(text), keep=False):
+        start = seg_start if pending is None else pending
+        trimmed = _trim(text, start, seg_end)
+        if trimmed is None:
+            continue
+        if trimmed[1] - trimmed[0] < min_len:
+            pending = start
+            continue
+        pending = None
+        yield from _windows(trimmed[0], trimmed[1], max_len, overlap)
+    if pending is not None:
+        yield (pending, len(text))
+
+
+def _heading_level(match: re.Match[str]) -> int:
+    if match.group("hashes"):
+        return len(match.group("hashes"))
+    if match.group("num"):
+        return match.group("num").count(".") + 1
+    if match.group("unit"):
+        return _UNIT_LEVEL[match.group("unit")]
+    return 1
+
+
+def _is_heading(match: re.Match[str]) -> bool:
+    line = match.group(0).strip()
+    if len(line) > _MAX_HEADING_LEN:
+        return False
+    # Numbered lines ending like a sentence are list items / prose, not section titles.
+    return not (match.group("num") and line.endswith(_SENTENCE_TAIL))
+
+
+def iter_sections(text: str) -> Iterator[Tuple[Tuple[str, ...], int, int]]:
+    """Yield ``(section_path, start, end)`` for each heading-delimited section, in order."""
+
+    stack: List[Tuple[int, str]] = []
+    path: Tuple[str, ...] = ()
+    pos = 0
+    for match in _HEADING_LINE.finditer(text):
+        if not _is_heading(match):
+            continue
+        if match.start() > pos:
+            yield path, pos, match.start()
+        level = _heading_level(match)
+        while stack and stack[-1][0] >= level:
+            stack.pop()
+        stack.append((level, match.group(0).strip().lstrip("#").strip()))
+        path = tuple(title for _, title in stack)
+        pos = match.start()
+    if pos < len(text):
+        yield path, pos, len(text)
+
+
+def _text_params(text: str, params: Dict[str, Any]) -> Tuple[int, int, Measure]:
+    """``(target, overlap, measure)``: a ``target_tokens`` budget, else ``target_length`` characters."""
+
+    ratio = 0.0 if params.get("no_overlap") else float(params.get("overlap_ratio") or 0.0)
+    measure: Measure = _chars
+    if params.get("target_tokens"):
+        target = max(int(params["target_tokens"]), 1)
+        count = get_token_counter().count
+
+        def measure(start: int, end: int) -> int:
+            return count(text[start:end])
+
+    else:
+        target = max(int(params.get("target_length") or DEFAULT_TEXT_PARAMS["target_length"]), 1)
+    return target, int(target * min(max(ratio, 0.0), 0.9)), measure
+
+
+def _sections(
+    text: str, mode: str, params: Dict[str, Any]
+) -> Iterator[Tuple[Tuple[str, ...], Optional[Span], Iterable[Span]]]:
+    """``(section_path, section_span or None, chunk spans)`` per section, in document order."""
+
+    if mode == MODE_DIRECT:
+        yield (), None, _delimiter_spans(text, params)
+    elif mode in {MODE_SEMANTIC, MODE_HIERARCHICAL}:
+        target, overlap, measure = _text_params(text, params)
+
+        def _spans(start: int, end: int) -> Iterator[Span]:
+            if params.get("content_defined"):
+                return _content_defined_spans(text, start, end, target, measure)
+            return _sentence_spans(text, start, end, target, overlap, measure)
+
+        if mode == MODE_SEMANTIC:
+            yield (), None, _spans(0, len(text))
+        else:
+            for path, start, end in iter_sections(text):
+                yield path, (start, end), _spans(start, end)
+    else:
+        raise ValueError(f"Unsupported slicing mode: {mode}")
+
+
+def iter_chunks(text: str, mode: str, params: Dict[str, Any] | None = None) -> Iterator[Chunk]:
+    """Lazily slice ``text`` according to ``mode``/``params``; raises ``ValueError`` for unknown modes."""
+
+    index = 0
+    for path, _, spans in _sections(text, mode, params or {}):
+        for span in spans:
+            trimmed = _trim(text, *span)
+            if trimmed is None:
+                continue
+            yield Chunk(index=index, text=text[trimmed[0] : trimmed[1]], start=trimmed[0], end=trimmed[1], section_path=path)
+            index += 1
+
+
+def build_span_table(text: str, mode: str, params: Dict[str, Any] | None = None) -> SpanTable:
+    """Slice ``text`` into a :class:`SpanTable` without copying it.
+
+    In ``hierarchical_heading`` mode every heading becomes a section row (``level`` = depth - 1, ``parent`` =
+    enclosing section, covering its subsections) and chunks are its children at ``level`` = depth; other modes
+    produce only top-level chunk rows. Chunks are the table's leaves.
+    """
+
+    table = SpanTable(TextBuffer(text))
+    open_sections: List[Tuple[int, int]] = []  # (depth, row)
+    for path, region, spans in _sections(text, mode, params or {}):
+        parent = NO_PARENT
+        if region is not None and path:
+            depth = len(path)
+            while open_sections and open_sections[-1][0] >= depth:
+                open_sections.pop()
+            enclosing = open_sections[-1][1] if open_sections else NO_PARENT
+            parent = table.append(region[0], region[1], depth - 1, enclosing)
+            open_sections.append((depth, parent))
+            for _, row in open_sections:
+                table.ends[row] = region[1]
+        for span in spans:
+            trimmed = _trim(text, *span)
+            if trimmed is not None:
+                table.append(trimmed[0], trimmed[1], len(path), parent)
+    return table
+
+
+def chunk_hash(text: str, section_path: Sequence[str] = ()) -> str:
+    """Stable content hash of a chunk: its text and section path, not its position."""
+
+    key = "\x1f".join(section_path) + "\x1e" + text
+    return hashlib.blake2b(key.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+
+
+def _section_title(text: str, start: int) -> str:
+    end = text.find("\n", start)
+    return text[start : end if end >= 0 else len(text)].strip().lstrip("#").strip()
+
+
+def resolve_plan(
+    text: str,
+    *,
+    mode: str | None = None,
+    params: Dict[str, Any] | None = None,
+    source_format: str | None = None,
+    custom_cfg: Dict[str, Any] | None = None,
+) -> Dict[str, Any]:
+    """Explicit ``mode``/``params`` win; otherwise probe ``text`` and use the recommended strategy."""
+
+    if mode:
+        if mode not in MODE_ID_MAP:
+            raise ValueError(f"Unsupported slicing mode: {mode}")
+        return {"strategy_id": None, "mode": mode, "params": dict(params or {})}
+    if not text.strip():
+        raise ValueError("text is empty")
+    samples: Sequence[str] = [text]
+    recommendation = recommend_strategy(
+        extract_signals_from_samples(samples),
+        samples=samples,
+        custom_cfg=custom_cfg,
+        source_format=source_format,
+    )
+    return {
+        "strategy_id": recommendation["strategy_id"],
+        "mode": recommendation["mode"],
+        "params": {**recommendation["params"], **(params or {})},
+    }
+
+
+def slice_text(
+    text: str,
+    mode: str | None = None,
+    params: Dict[str, Any] | None = None,
+    source_format: str | None = None,
+    custom_cfg: Dict[str, Any] | None = None,
+    include_text: bool = True,
+) -> Dict[str, Any]:
+    """Resolve the plan and build the API/Celery payload; ``include_text=False`` returns offsets only.
+
+    With ``params["content_defined"]`` every chunk also carries its :func:`chunk_hash`.
+    """
+
+    plan = resolve_plan(text, mode=mode, params=params, source_format=source_format, custom_cfg=custom_cfg)
+    table = build_span_table(text, plan["mode"], plan["params"])
+    titles: Dict[int, str] = {}
+    chunks: List[Dict[str, Any]] = []
+    hashed = bool(plan["params"].get("content_defined"))
+    for index, leaf in enumerate(table.leaves()):
+        path = []
+        for row in table.ancestors(leaf.index):
+            if row not in titles:
+                titles[row] = _section_title(text, table.starts[row])
+            path.append(titles[row])
+        chunk: Dict[str, Any] = {"index": index, "start": leaf.start, "end": leaf.end, "section_path": path}
+        if hashed:
+            chunk["hash"] = chunk_hash(leaf.text, path)
+        if include_text:
+            chunk["text"] = leaf.text
+        chunks.append(chunk)
+    return {**plan, "total": len(chunks), "chunks": chunks}
+
+
+__all__ = ["Chunk", "build_span_table", "chunk_hash", "iter_chunks", "iter_sections", "resolve_plan", "slice_text"]
@@ -31,6 +31,53 @@ class MonitoringSettings(BaseModel):
     enable_metrics: bool = True
 
 
+class ExecutorSettings(BaseModel):
+    max_workers: int = 0  # 0 -> os.cpu_count()
+    inline_threshold: int = 8  # 文档数低于该值时在当前进程内计算，省去进程池调度开销
+    max_chunk_size: int = 64
+    offload_min_chars: int = 20000  # 单请求文本不少于该字符数时移出事件循环，交给进程池
+    max_concurrency: int = 0  # 同时占用进程池的请求数，0 -> max_workers
+    max_queued: int = 32  # 超出并发上限后允许排队的请求数，再多直接返回 503
+
+
+class RequestLimitSettings(BaseModel):
+    max_samples: int = 200
+    max_sample_chars: int = 2_000_000  # 单请求全部样本的总字符数
+    max_slice_chars: int = 20_000_000
+    max_batch_documents: int = 10_000
+    max_batch_chars: int = 50_000_000  # 批量推荐全部文档样本的总字符数；单文档另受 max_samples/max_sample_chars 限制
+    max_table_bytes: int = 1 << 30  # /slice/table 上传体积；请求体落盘暂存，不占内存
+    max_stream_bytes: int = 1 << 30  # /probe/profile_stream 请求体上限；流式扫描，不占内存
+    max_block_spans: int = 100_000  # slice.code_log_blocks 单次返回的块数，超出部分按 next_offset 分页
+
+
+class CacheSettings(BaseModel):
+    enabled: bool = True
+    max_entries: int = 1024  # 进程内 LRU 容量
+    redis_url: Optional[str] = None  # 默认复用 celery.result_backend
+    redis_ttl_sec: int = 3600  # 0 关闭 Redis 层
+    redis_timeout_sec: float = 0.2
+
+
+class DedupSettings(BaseModel):
+    num_perm: int = 64  # MinHash 签名长度，需为 bands 的整数倍
+    bands: int = 16  # LSH 分带数；rows = num_perm / bands
+    threshold: float = 0.8  # 估计 Jaccard 相似度不低于该值视为近重复
+    shingle_size: int = 5  # 字符 n-gram 长度（对中文友好）
+    redis_url: Optional[str] = None  # 知识库级索引；默认复用 celery.result_backend
+    key_prefix: str = "slicer:dedup"
+    ttl_sec: int = 0  # 知识库索引过期时间，0 不过期
+    redis_timeout_sec: float = 0.5
+
+
+class TokenSettings(BaseModel):
+    vocab_path: Optional[str] = None  # 本地 BPE 词表（tiktoken 格式：每行 "<base64 token> <rank>"），未设置时用启发式估算
+    cache_size: int = 65536  # BPE 合并结果按预切分片段缓存的条目数
+    cjk_tokens_per_char: float = 1.0  # 启发式：每个 3 字节字符（中日韩文字与全角标点）计的 token 数
+    other_tokens_per_char: float = 0.5  # 启发式：每个 2 字节字符（拉丁扩展、西里尔等）计的 token 数
+    ascii_chars_per_token: float = 4.0  # 启发式：每个 token 对应的 ASCII 字符数
+
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_prefix="SLICE_", env_nested_delimiter="__", extra="allow")
 
@@ -40,6 +87,11 @@ class Settings(BaseSettings):
     api_auth: APIAuthSettings = APIAuthSettings()
     celery: CeleryQueueSettings = CeleryQueueSettings()
     monitoring: MonitoringSettings = MonitoringSettings()
+    executor: ExecutorSettings = ExecutorSettings()
+    cache: CacheSettings = CacheSettings()
+    limits: RequestLimitSettings = RequestLimitSettings()
+    dedup: DedupSettings = DedupSettings()
+    tokens: TokenSettings = TokenSettings()
 
 
 @lru_cache
@@ -0,0 +1,260 @@
+"""Near-duplicate chunk detection with MinHash signatures and an LSH index.
+
+Boilerplate (headers, footers, disclaimers) repeats across chunks of one
+document and across documents of a knowledge base; every copy would otherwise
+be embedded and indexed. Each chunk is normalised (case, whitespace, digit
+runs — so page numbers do not hide a repeat), cut into character shingles and
+summarised by a ``num_perm``-value MinHash signature. Signatures are banded
+into an LSH index so only chunks sharing a band are compared; a candidate
+whose estimated Jaccard similarity reaches ``threshold`` makes the chunk a
+duplicate of it.
+
+Two indexes are consulted in order: an in-memory one for the current document
+and, when a knowledge base is named, a Redis one shared by every slicer
+process. Redis is best-effort — if it is unavailable, only in-document
+duplicates are detected.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import time
+from array import array
+from functools import lru_cache
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import redis
+
+from .config import DedupSettings, Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+_NORMALIZE_SPACE = re.compile(r"\s+")
+_NORMALIZE_DIGITS = re.compile(r"\d+")
+
+Signature = array  # array("I") of num_perm 32-bit minima
+
+_REDIS_RETRY_SEC = 30.0
+_redis_down_until = 0.0
+
+
+def _normalize(text: str) -> str:
+    return _NORMALIZE_DIGITS.sub("0", _NORMALIZE_SPACE.sub(" ", text.lower())).strip()
+
+
+class MinHasher:
+    """Signatures from ``num_perm`` independent 32-bit hashes per shingle (one SHAKE-128 digest each)."""
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 5) -> None:
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self._digest_size = num_perm * 4
+
+    def shingles(self, text: str) -> set[bytes]:
+        norm = _normalize(text)
+        size = self.shingle_size
+        if len(norm) <= size:
+            return {norm.encode("utf-8")} if norm else set()
+        return {norm[i : i + size].encode("utf-8") for i in range(len(norm) - size + 1)}
+
+    def signature(self, text: str) -> Optional[Signature]:
+        """MinHash signature, or ``None`` for whitespace-only text."""
+
+        shingles = self.shingles(text)
+        if not shingles:
+            return None
+        digest_size = self._digest_size
+        columns = zip(*(array("I", hashlib.shake_128(shingle).digest(digest_size)) for shingle in shingles))
+        return array("I", map(min, columns))
+
+
+def similarity(left: Signature, right: Signature) -> float:
+    """Estimated Jaccard similarity: the fraction of signature positions that agree."""
+
+    return sum(a == b for a, b in zip(left, right)) / len(left)
+
+
+def _band_keys(signature: Signature, bands: int) -> List[str]:
+    rows = len(signature) // bands
+    raw = signature.tobytes()
+    width = rows * signature.itemsize
+    return [
+        f"{band}:{hashlib.blake2b(raw[band * width : (band + 1) * width], digest_size=8).hexdigest()}"
+        for band in range(bands)
+    ]
+
+
+class LSHIndex:
+    """In-memory banded index: ``band key -> first chunk id``, ``chunk id -> signature``."""
+
+    def __init__(self, bands: int) -> None:
+        self.bands = bands
+        self._buckets: Dict[str, str] = {}
+        self._signatures: Dict[str, Signature] = {}
+
+    def candidates(self, keys: Sequence[str]) -> Dict[str, Signature]:
+        found: Dict[str, Signature] = {}
+        for key in keys:
+            chunk_id = self._buckets.get(key)
+            if chunk_id is not None and chunk_id not in found:
+                found[chunk_id] = self._signatures[chunk_id]
+        return found
+
+    def add(self, chunk_id: str, signature: Signature, keys: Sequence[str]) -> None:
+        self._signatures[chunk_id] = signature
+        for key in keys:
+            self._buckets.setdefault(key, chunk_id)
+
+
+class RedisLSHIndex:
+    """Knowledge-base-wide index in Redis, same interface as :class:`LSHIndex`."""
+
+    def __init__(self, client: redis.Redis, prefix: str, ttl_sec: int = 0) -> None:
+        self._client = client
+        self._prefix = prefix
+        self._ttl = ttl_sec or None
+
+    def candidates(self, keys: Sequence[str]) -> Dict[str, Signature]:
+        ids = [raw.decode() for raw in self._client.mget([f"{self._prefix}:band:{key}" for key in keys]) if raw]
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return {}
+        found: Dict[str, Signature] = {}
+        for chunk_id, raw in zip(ids, self._client.mget([f"{self._prefix}:sig:{chunk_id}" for chunk_id in ids])):
+            if raw:
+                signature = array("I")
+                signature.frombytes(raw)
+                found[chunk_id] = signature
+        return found
+
+    def add(self, chunk_id: str, signature: Signature, keys: Sequence[str]) -> None:
+        pipe = self._client.pipeline(transaction=False)
+        pipe.set(f"{self._prefix}:sig:{chunk_id}", signature.tobytes(), ex=self._ttl)
+        for key in keys:
+            pipe.set(f"{self._prefix}:band:{key}", chunk_id, nx=True, ex=self._ttl)
+        pipe.execute()
+
+
+@lru_cache(maxsize=8)
+def _redis_client(url: str, timeout_sec: float) -> redis.Redis:
+    return redis.Redis.from_url(url, socket_connect_timeout=timeout_sec, socket_timeout=timeout_sec)
+
+
+def _redis_index(knowledge_base: str, settings: Settings) -> RedisLSHIndex:
+    cfg = settings.dedup
+    client = _redis_client(cfg.redis_url or settings.celery.result_backend, cfg.redis_timeout_sec)
+    return RedisLSHIndex(client, f"{cfg.key_prefix}:{knowledge_base}", cfg.ttl_sec)
+
+
+def _best_match(
+    signature: Signature, chunk_id: str, keys: Sequence[str], index: Any, threshold: float
+) -> Optional[str]:
+    best_id, best = None, threshold
+    for other_id, other in index.candidates(keys).items():
+        # Re-slicing a document must not turn its chunks into duplicates of their previous selves.
+        if other_id == chunk_id:
+            continue
+        score = similarity(signature, other)
+        if score >= best:
+            best_id, best = other_id, score
+    return best_id
+
+
+def deduplicate(
+    text: str,
+    chunks: List[Dict[str, Any]],
+    *,
+    doc_id: str,
+    action: str = "link",
+    threshold: float | None = None,
+    knowledge_base: str | None = None,
+    settings: Settings | None = None,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Mark near-duplicate chunks (``{"start", "end", "index"}`` dicts over ``text``).
+
+    Every chunk gets ``id`` (``"<doc_id>#<hash>"`` for content-defined chunks, stable across versions, else
+    ``"<doc_id>#<index>"``) and ``duplicate_of`` (the id of the earlier similar chunk, or
+    ``None``). ``action="drop"`` removes duplicates from the returned list; ``"link"`` keeps them annotated.
+    """
+
+    settings = settings or get_settings()
+    cfg: DedupSettings = settings.dedup
+    if action not in {"link", "drop"}:
+        raise ValueError(f"Unsupported dedup action: {action}")
+    if cfg.num_perm % cfg.bands:
+        raise ValueError("dedup.num_perm must be a multiple of dedup.bands")
+    threshold = cfg.threshold if threshold is None else threshold
+    hasher = MinHasher(cfg.num_perm, cfg.shingle_size)
+    local = LSHIndex(cfg.bands)
+    global _redis_down_until
+    remote = None
+    if knowledge_base and time.monotonic() >= _redis_down_until:
+        remote = _redis_index(knowledge_base, settings)
+
+    kept: List[Dict[str, Any]] = []
+    duplicates = 0
+    occurrences: Counter[str] = Counter()
+    for chunk in chunks:
+        digest = chunk.get("hash")
+        if digest:
+            # Repeats of one chunk need distinct ids, or a copy would be skipped as the chunk itself.
+            chunk_id = f"{doc_id}#{digest}" + (f"~{occurrences[digest]}" if occurrences[digest] else "")
+            occurrences[digest] += 1
+        else:
+            chunk_id = f"{doc_id}#{chunk['index']}"
+        chunk = {**chunk, "id": chunk_id, "duplicate_of": None}
+        signature = hasher.signature(text[chunk["start"] : chunk["end"]])
+        if signature is not None:
+            keys = _band_keys(signature, cfg.bands)
+            match = _best_match(signature, chunk_id, keys, local, threshold)
+            if match is None and remote is not None:
+                try:
+                    match = _best_match(signature, chunk_id, keys, remote, threshold)
+                    if match is None:
+                        remote.add(chunk_id, signature, keys)
+                except redis.RedisError as exc:
+                    logger.warning(
+                        "Dedup Redis index unavailable, in-document dedup only for %.0fs: %s", _REDIS_RETRY_SEC, exc
+                    )
+                    _redis_down_until = time.monotonic() + _REDIS_RETRY_SEC
+                    remote = None
+            if match is None:
+                local.add(chunk_id, signature, keys)
+            else:
+                chunk["duplicate_of"] = match
+                duplicates += 1
+                if action == "drop":
+                    continue
+        kept.append(chunk)
+    stats = {
+        "checked": len(chunks),
+        "duplicates": duplicates,
+        "dropped": duplicates if action == "drop" else 0,
+        "knowledge_base": knowledge_base if remote is not None else None,
+    }
+    return kept, stats
+
+
+def dedup_slice_result(
+    text: str, result: Dict[str, Any], options: Dict[str, Any], settings: Settings | None = None
+) -> Dict[str, Any]:
+    """Apply :func:`deduplicate` to a ``slice_text`` payload in place; ``doc_id`` defaults to a hash of ``text``."""
+
+    doc_id = options.get("doc_id") or hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=8).hexdigest()
+    chunks, stats = deduplicate(
+        text,
+        result["chunks"],
+        doc_id=doc_id,
+        action=options.get("action") or "link",
+        threshold=options.get("threshold"),
+        knowledge_base=options.get("knowledge_base"),
+        settings=settings,
+    )
+    result.update(chunks=chunks, total=len(chunks), dedup=stats)
+    return result
+
+
+__all__ = ["LSHIndex", "MinHasher", "RedisLSHIndex", "dedup_slice_result", "deduplicate", "similarity"]
@@ -60,6 +60,24 @@ def register_default_errors() -> None:
         )
     )
 
+    ERRORS.register(
+        ErrorCodeSpec(
+            code="ERR_PAYLOAD_TOO_LARGE",
+            zh="请求样本数量或长度超出限制",
+            en="Request samples exceed the allowed count or size",
+            # Literal: HTTP_413_CONTENT_TOO_LARGE is missing from older Starlette and the old name warns.
+            http_status=413,
+        )
+    )
+    ERRORS.register(
+        ErrorCodeSpec(
+            code="ERR_BUSY",
+            zh="服务繁忙，请稍后重试",
+            en="Too many large requests in progress, retry later",
+            http_status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+    )
+
 
 register_default_errors()
 
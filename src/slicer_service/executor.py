@@ -0,0 +1,222 @@
+"""Process pool for CPU-bound probe/recommend/slice work.
+
+Recommending a strategy is pure-Python regex and arithmetic, so a batch only
+scales across cores in separate processes. The pool is created lazily, shared
+by the API process for its lifetime and sized by ``executor.max_workers``.
+Small batches and daemonic Celery prefork children (which may not spawn
+processes) run inline instead.
+
+:func:`run_cpu` is the API routes' entry point: small inputs run inline (cheaper
+than a round-trip to the pool), large ones are awaited on the pool so the event
+loop keeps serving other requests. At most ``executor.max_concurrency`` large
+requests occupy the pool and ``executor.max_queued`` may wait; beyond that
+:class:`ExecutorBusy` is raised instead of queueing without bound.
+:func:`run_batch` puts batch recommendations behind the same gate.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import math
+import multiprocessing
+import os
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from .cache import get_cache, recommendation_key
+from .config import Settings, get_settings
+from .recommendation import extract_signals_from_samples, recommend_strategy
+
+logger = logging.getLogger(__name__)
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+_GATES: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _Gate]" = weakref.WeakKeyDictionary()
+
+# (samples, source_format, custom_cfg, emit_candidates)
+_Job = Tuple[Sequence[str], Optional[str], Dict[str, Any], bool]
+
+
+def worker_count(settings: Settings) -> int:
+    return max(1, settings.executor.max_workers or os.cpu_count() or 1)
+
+
+def get_pool(settings: Settings | None = None) -> Optional[ProcessPoolExecutor]:
+    """The shared pool, or ``None`` when work must stay in this process."""
+
+    settings = settings or get_settings()
+    workers = worker_count(settings)
+    if workers == 1 or multiprocessing.current_process().daemon:
+        return None
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ProcessPoolExecutor(max_workers=workers)
+        return _POOL
+
+
+def shutdown_pool() -> None:
+    global _POOL
+    with _POOL_LOCK:
+        pool, _POOL = _POOL, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+class ExecutorBusy(RuntimeError):
+    """The pool is saturated and the wait queue is full."""
+
+
+class _Gate:
+    def __init__(self, limit: int, max_queued: int) -> None:
+        self._semaphore = asyncio.Semaphore(limit)
+        self._max_queued = max_queued
+        self._waiting = 0
+
+    async def __aenter__(self) -> None:
+        if self._semaphore.locked() and self._waiting >= self._max_queued:
+            raise ExecutorBusy("too many large requests in progress")
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self._semaphore.release()
+
+
+def _gate(settings: Settings) -> _Gate:
+    loop = asyncio.get_running_loop()
+    gate = _GATES.get(loop)
+    if gate is None:
+        limit = settings.executor.max_concurrency or worker_count(settings)
+        gate = _GATES[loop] = _Gate(limit, settings.executor.max_queued)
+    return gate
+
+
+async def run_cpu(fn: Callable[..., Any], *args: Any, size: int, settings: Settings | None = None) -> Any:
+    """Run ``fn(*args)`` (picklable, module-level) off the event loop when ``size`` chars is large."""
+
+    settings = settings or get_settings()
+    if size < settings.executor.offload_min_chars:
+        return fn(*args)
+    async with _gate(settings):
+        pool = get_pool(settings)
+        if pool is None:
+            return await run_in_threadpool(fn, *args)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, functools.partial(fn, *args))
+        except BrokenProcessPool:
+            logger.warning("Slicer pool broke (worker died); running %s in a thread", getattr(fn, "__name__", fn))
+            shutdown_pool()
+            return await run_in_threadpool(fn, *args)
+
+
+async def run_batch(
+    documents: Sequence[Dict[str, Any]],
+    *,
+    custom_cfg: Dict[str, Any] | None = None,
+    emit_candidates: bool = False,
+    size: int,
+    settings: Settings | None = None,
+) -> List[Dict[str, Any]]:
+    """:func:`recommend_batch` from the event loop, holding a :func:`run_cpu` slot when ``size`` chars is large.
+
+    The batch fans out to the pool itself, so it runs on a thread rather than inside a pool worker; its
+    cache lookups may block on Redis, so even small batches leave the loop.
+    """
+
+    settings = settings or get_settings()
+    call = functools.partial(
+        recommend_batch, documents, custom_cfg=custom_cfg, emit_candidates=emit_candidates, settings=settings
+    )
+    if size < settings.executor.offload_min_chars:
+        return await run_in_threadpool(call)
+    async with _gate(settings):
+        return await run_in_threadpool(call)
+
+
+def _recommend_document(job: _Job) -> Dict[str, Any]:
+    samples, source_format, custom_cfg, emit_candidates = job
+    try:
+        profile = extract_signals_from_samples(samples)
+        recommendation = recommend_strategy(
+            profile,
+            samples=samples,
+            custom_cfg=custom_cfg,
+            emit_candidates=emit_candidates,
+            source_format=source_format,
+        )
+    except ValueError as exc:
+        return {"recommendation": None, "error": str(exc)}
+    return {"recommendation": recommendation, "error": None}
+
+
+def _map(jobs: List[_Job], settings: Settings) -> Iterable[Dict[str, Any]]:
+    pool = get_pool(settings) if len(jobs) >= settings.executor.inline_threshold else None
+    if pool is None:
+        return [_recommend_document(job) for job in jobs]
+    # A few chunks per worker balances uneven documents without per-item IPC overhead.
+    chunksize = max(1, min(settings.executor.max_chunk_size, math.ceil(len(jobs) / (worker_count(settings) * 4))))
+    try:
+        return list(pool.map(_recommend_document, jobs, chunksize=chunksize))
+    except BrokenProcessPool:
+        logger.warning("Recommendation pool broke (worker died); recomputing %d documents inline", len(jobs))
+        shutdown_pool()
+        return [_recommend_document(job) for job in jobs]
+
+
+def recommend_batch(
+    documents: Sequence[Dict[str, Any]],
+    *,
+    custom_cfg: Dict[str, Any] | None = None,
+    emit_candidates: bool = False,
+    settings: Settings | None = None,
+) -> List[Dict[str, Any]]:
+    """Recommend a strategy per document (``{"samples", "source_format"}``); results keep input order.
+
+    ``custom_cfg`` is shared by the whole batch, so its delimiters are compiled once per process
+    (see ``recommendation.compile_delimiters``). A document that cannot be probed yields ``{"error": ...}``
+    instead of failing the batch.
+    """
+
+    settings = settings or get_settings()
+    custom_cfg = dict(custom_cfg or {})
+    cache = get_cache()
+    results: List[Optional[Dict[str, Any]]] = [None] * len(documents)
+    pending: Dict[str, List[int]] = {}
+    jobs: List[_Job] = []
+    for index, doc in enumerate(documents):
+        samples = list(doc.get("samples") or [])
+        key = recommendation_key(
+            samples, source_format=doc.get("source_format"), custom_cfg=custom_cfg, emit_candidates=emit_candidates
+        )
+        if key in pending:
+            pending[key].append(index)
+            continue
+        cached = cache.get(key)
+        if cached is not None:
+            results[index] = {"recommendation": cached, "error": None}
+            continue
+        pending[key] = [index]
+        jobs.append((samples, doc.get("source_format"), custom_cfg, emit_candidates))
+
+    # Only cache misses go to the pool, and documents repeated within the batch are scored once.
+    for (key, indexes), result in zip(pending.items(), _map(jobs, settings) if jobs else []):
+        if result["recommendation"] is not None:
+            cache.set(key, result["recommendation"])
+        for index in indexes:
+            results[index] = result
+    return [{"index": index, **result} for index, result in enumerate(results) if result is not None]
+
+
+__all__ = ["ExecutorBusy", "get_pool", "recommend_batch", "run_batch", "run_cpu", "shutdown_pool", "worker_count"]
@@ -0,0 +1,95 @@
+"""Incremental re-slicing: diff a new document version against the previous one.
+
+Re-slicing an edited document with positional packing shifts every boundary
+after the first edit, so every later chunk looks new and would be embedded
+and indexed again. Slicing with ``content_defined`` boundaries (see
+:mod:`slicer_service.chunker`) keeps the chunks of unchanged regions
+byte-identical, and :func:`~slicer_service.chunker.chunk_hash` gives them the
+same hash in both versions. :func:`diff_chunks` then splits the new chunks
+into ``added`` (to embed) and ``unchanged`` ones, and lists the previous
+hashes that are ``removed`` (to delete downstream).
+
+The previous version is given either as the hash list returned last time
+(the usual case — the caller stores it next to the index) or as its text,
+which is re-sliced with exactly the plan resolved for the new version.
+Stored hashes are only comparable under the plan that produced them, so
+``previous_hashes`` requires an explicit ``mode`` (and the same ``params``):
+a plan re-recommended from the edited text would drift ``target_length`` and
+shift every boundary.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence
+
+from .chunker import resolve_plan, slice_text
+
+
+def diff_chunks(chunks: Sequence[Dict[str, Any]], previous_hashes: Sequence[str]) -> Dict[str, Any]:
+    """Split ``chunks`` (carrying ``hash``) into added/unchanged against ``previous_hashes``.
+
+    Hashes are compared as multisets, so a chunk repeated in the document is only unchanged as often as it
+    occurred before. ``removed`` keeps the previous order.
+    """
+
+    remaining = Counter(previous_hashes)
+    added: List[Dict[str, Any]] = []
+    unchanged: List[str] = []
+    for chunk in chunks:
+        digest = chunk["hash"]
+        if remaining[digest] > 0:
+            remaining[digest] -= 1
+            unchanged.append(digest)
+        else:
+            added.append(chunk)
+    removed: List[str] = []
+    for digest in previous_hashes:
+        if remaining[digest] > 0:
+            remaining[digest] -= 1
+            removed.append(digest)
+    return {"added": added, "unchanged": unchanged, "removed": removed}
+
+
+def reslice(
+    text: str,
+    previous_hashes: Optional[Sequence[str]] = None,
+    previous_text: Optional[str] = None,
+    mode: str | None = None,
+    params: Dict[str, Any] | None = None,
+    source_format: str | None = None,
+    custom_cfg: Dict[str, Any] | None = None,
+    include_text: bool = True,
+) -> Dict[str, Any]:
+    """Slice ``text`` with content-defined boundaries and diff it against the previous version.
+
+    Returns the plan, ``total``, ``hashes`` (every chunk hash in order — store it for the next call) and the
+    ``added``/``unchanged``/``removed`` diff; only ``added`` chunks carry offsets and text. Pass the returned
+    ``mode``/``params`` back together with ``hashes`` next time.
+    """
+
+    if previous_hashes is not None and previous_text is not None:
+        raise ValueError("give either previous_hashes or previous_text, not both")
+    if previous_hashes is not None and not mode:
+        raise ValueError("previous_hashes requires the mode and params they were sliced with")
+    plan = resolve_plan(
+        text,
+        mode=mode,
+        params={**(params or {}), "content_defined": True},
+        source_format=source_format,
+        custom_cfg=custom_cfg,
+    )
+    result = slice_text(text, plan["mode"], plan["params"], include_text=include_text)
+    if previous_text is not None:
+        previous = slice_text(previous_text, plan["mode"], plan["params"], include_text=False)
+        previous_hashes = [chunk["hash"] for chunk in previous["chunks"]]
+    diff = diff_chunks(result["chunks"], previous_hashes or [])
+    return {
+        **plan,
+        "total": result["total"],
+        "hashes": [chunk["hash"] for chunk in result["chunks"]],
+        **diff,
+    }
+
+
+__all__ = ["diff_chunks", "reslice"]
@@ -3,7 +3,10 @@
 from __future__ import annotations
 
 import re
-from typing import Any, Dict, Iterable, List, Sequence
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Sequence, Tuple
+
+from .sketch import QuantileSketch
 
 FORMAT_TABLE = {"xlsx", "xls", "csv", "tsv"}
 FORMAT_CODE = {"py", "c", "cpp", "java", "js", "ts", "go", "rs", "rb", "php", "sh", "log"}
@@ -75,6 +78,7 @@ DEFAULT_CUSTOM_CFG = {
     "min_segment_len": 30,
     "max_segment_len": 800,
     "overlap_ratio": None,
+    "target_tokens": None,
 }
 
 
@@ -99,75 +103,209 @@ def _quantile(values: Sequence[float], q: float) -> float:
     return float(sorted_vals[low] * (1 - frac) + sorted_vals[high] * frac)
 
 
-def _paragraph_lengths(samples: Iterable[str]) -> List[int]:
-    """按空行分段，统计每段长度，用于估计段落分布."""
-    lengths: List[int] = []
-    for text in samples:
+# 结构信号用的正则在模块加载时编译一次；逐行判断前先用首字符/子串做廉价预筛。
+_HEADING_PATTERN = re.compile(
+    r"^(#{1,6}\s+|\d+(?:\.\d+)*[\.\)]?\s*|\d+\.\[[^\]]*\]\s*|[一二三四五六七八九十]+、\s*)"
+)
+_LIST_PATTERN = re.compile(r"^(?:[-*+•]\s+|\d+\.\s+)")
+_CODE_WORD_PATTERN = re.compile(r"\b(?:class|def|function)\b")
+_HEADING_LEADS = frozenset("#0123456789一二三四五六七八九十")
+_LIST_LEADS = frozenset("-*+•0123456789")
+_EXTRA_LINE_BREAKS = re.compile("[\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+_ASCII_LETTERS_DROP = {code: None for code in range(128) if chr(code).isalpha()}
+
+
+def _alpha_count(text: str) -> int:
+    if text.isascii():
+        return len(text) - len(text.translate(_ASCII_LETTERS_DROP))
+    return sum(map(str.isalpha, text))
+
+
+class SignalScanner:
+    """单遍流式扫描器：逐段 ``feed`` 文本，一次遍历同时累计行级比例、非字母字符数与段落长度。
+
+    结果与按空行（``\\n\\s*\\n``）分段、逐行 strip 后分别统计完全一致：文本先按 ``\\n``
+    切成片段，仅含空白的片段即段落分隔；片段内再按 ``splitlines`` 取行。字母只出现在非空白
+    字符中，因此非字母数 = strip 后行总长 - 全文字母数。段落长度进入 :class:`QuantileSketch`，
+    少量段落时分位数与排序结果一致，整篇文档则以常数内存近似。
+    """
+
+    def __init__(self) -> None:
+        self.lines = 0
+        self.heading_hits = 0
+        self.list_hits = 0
+        self.table_hits = 0
+        self.code_hits = 0
+        self.chars = 0
+        self.alpha_chars = 0
+        self.para_sketch = QuantileSketch()
+
+    def feed(self, text: str) -> None:
         if not text:
-            continue
-        parts = re.split(r"\n\s*\n", text)
-        for part in parts:
-            clean = part.strip()
-            if clean:
-                lengths.append(len(clean))
-    return lengths
-
+            return
+        self.alpha_chars += _alpha_count(text)
+        # 除 \n 外的换行符（\r、\x0c、\u2028 等）很少见：只有出现时才逐片段 splitlines。
+        split_lines = _EXTRA_LINE_BREAKS.search(text) is not None
+        heading_match = _HEADING_PATTERN.match
+        list_match = _LIST_PATTERN.match
+        code_search = _CODE_WORD_PATTERN.search
+        lines = heading_hits = list_hits = table_hits = code_hits = chars = 0
+        add_para = self.para_sketch.add
+        para_len = -1  # -1 表示当前没有打开的段落
+        para_trail = 0
+        for segment in text.split("\n"):
+            lstripped = segment.lstrip()
+            stripped = lstripped.rstrip()
+            if not stripped:
+                if para_len >= 0:
+                    add_para(para_len - para_trail)
+                    para_len = -1
+                continue
+            if para_len < 0:
+                para_len = len(lstripped)
+            else:
+                para_len += 1 + len(segment)
+            para_trail = len(lstripped) - len(stripped)
+
+            for line in (part.strip() for part in segment.splitlines()) if split_lines else (stripped,):
+                if not line:
+                    continue
+                lines += 1
+                chars += len(line)
+                lead = line[0]
+                if lead in _HEADING_LEADS and heading_match(line):
+                    heading_hits += 1
+                if lead in _LIST_LEADS and list_match(line):
+                    list_hits += 1
+                if line.count("|") >= 2 or line.count(",") >= 3:
+                    table_hits += 1
+                if (
+                    line.endswith(";")
+                    or "```" in line
+                    or (("def" in line or "class" in line or "function" in line) and code_search(line))
+                ):
+                    code_hits += 1
+        if para_len >= 0:
+            add_para(para_len - para_trail)
+        self.lines += lines
+        self.heading_hits += heading_hits
+        self.list_hits += list_hits
+        self.table_hits += table_hits
+        self.code_hits += code_hits
+        self.chars += chars
+
+    def merge(self, other: "SignalScanner") -> None:
+        """并入另一扫描器（如逐页画像）的计数与段落分位草图，无需重新扫描文本。"""
+        self.lines += other.lines
+        self.heading_hits += other.heading_hits
+        self.list_hits += other.list_hits
+        self.table_hits += other.table_hits
+        self.code_hits += other.code_hits
+        self.chars += other.chars
+        self.alpha_chars += other.alpha_chars
+        self.para_sketch.merge(other.para_sketch)
+
+    def signals(self) -> Dict[str, Any]:
+        total_lines = max(self.lines, 1)
+        para_sketch = self.para_sketch
+        return {
+            "heading_ratio": self.heading_hits / total_lines,
+            "list_ratio": self.list_hits / total_lines,
+            "table_ratio": self.table_hits / total_lines,
+            "code_ratio": self.code_hits / total_lines,
+            "p90_para_len": int(para_sketch.quantile(0.9)),
+            "p50_para_len": int(para_sketch.quantile(0.5)),
+            "digit_symbol_ratio": (self.chars - self.alpha_chars) / max(self.chars, 1),
+        }
 
-def _line_iter(samples: Iterable[str]) -> List[str]:
-    """逐行提取非空文本，便于特征计数."""
-    lines: List[str] = []
-    for text in samples:
-        if not text:
-            continue
-        for line in text.splitlines():
-            stripped = line.strip()
-            if stripped:
-                lines.append(stripped)
-    return lines
+    _COUNTERS = ("lines", "heading_hits", "list_hits", "table_hits", "code_hits", "chars", "alpha_chars")
+
+    def to_state(self) -> Dict[str, Any]:
+        """可 JSON 序列化的中间状态，便于跨进程/跨页传递后再 ``merge``。"""
+        return {**{name: getattr(self, name) for name in self._COUNTERS}, "para_sketch": self.para_sketch.to_dict()}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "SignalScanner":
+        scanner = cls()
+        for name in cls._COUNTERS:
+            setattr(scanner, name, int(state.get(name) or 0))
+        scanner.para_sketch = QuantileSketch.from_dict(state.get("para_sketch") or {})
+        return scanner
+
+
+# 段落分隔：仅含空白的一行（两个 \n 之间）。流式切块只在其后切分，保证与整段扫描结果一致。
+_BLANK_LINE = re.compile(r"\n[^\S\n]*\n")
+
+
+class ProfileAccumulator:
+    """常数内存的流式画像：逐块 ``feed`` 同一文档的文本，结果与整篇一次性扫描一致。
+
+    块尾未结束的段落暂存到下一块；只有当单个段落超过 ``max_pending_chars`` 仍未遇到空行时，
+    才在最后一个换行处强制切开（该段长度被拆成两段计入分位数，其余信号不受影响）。
+    """
+
+    def __init__(self, max_pending_chars: int = 1 << 20) -> None:
+        self.scanner = SignalScanner()
+        self.max_pending_chars = max_pending_chars
+        self._pending = ""
+
+    def feed(self, chunk: str) -> None:
+        if not chunk:
+            return
+        # 已检查过的旧尾部不会再出现新的空行，新的匹配最早从旧尾部最后一个换行开始。
+        search_from = max(self._pending.rfind("\n"), 0)
+        text = self._pending + chunk
+        cut = -1
+        for match in _BLANK_LINE.finditer(text, search_from):
+            cut = match.end()
+        if cut < 0 and len(text) > self.max_pending_chars:
+            cut = text.rfind("\n") + 1 or len(text)
+        if cut <= 0:
+            self._pending = text
+            return
+        self.scanner.feed(text[:cut])
+        self._pending = text[cut:]
+
+    def close(self) -> SignalScanner:
+        """冲刷暂存文本并返回底层扫描器（之后不应再 ``feed``）。"""
+        if self._pending:
+            self.scanner.feed(self._pending)
+            self._pending = ""
+        return self.scanner
+
+    def signals(self) -> Dict[str, Any]:
+        return self.close().signals()
+
+
+def profile_stream(chunks: Iterable[str]) -> Dict[str, Any]:
+    """流式画像单个文档（不回传样本），内存占用与文档大小无关。"""
+    accumulator = ProfileAccumulator()
+    for chunk in chunks:
+        accumulator.feed(chunk)
+    return accumulator.signals()
 
 
 def extract_signals_from_samples(samples: Sequence[str]) -> Dict[str, Any]:
-    """基于文本样本提取结构信号（标题/列表/表格/代码比例等）。"""
+    """基于文本样本提取结构信号（标题/列表/表格/代码比例等）；不回传样本，调用方已持有原文。"""
     if not samples:
         raise ValueError("At least one text sample is required for probing")
 
-    lines = _line_iter(samples)
-    total_lines = max(len(lines), 1)
+    scanner = SignalScanner()
+    for text in samples:
+        scanner.feed(text)
+    return scanner.signals()
 
-    heading_pattern = re.compile(
-        r"^(#{1,6}\s+|\d+(?:\.\d+)*[\.\)]?\s*|\d+\.\[[^\]]*\]\s*|[一二三四五六七八九十]+、\s*)"
-    )
-    list_pattern = re.compile(r"^(?:[-*+•]\s+|\d+\.\s+)")
-    table_like_pattern = re.compile(r"\|")
-    code_like_pattern = re.compile(r"(```|\bclass\b|\bdef\b|\bfunction\b|;\s*$)")
-
-    heading_hits = sum(1 for line in lines if heading_pattern.match(line))
-    list_hits = sum(1 for line in lines if list_pattern.match(line))
-    table_hits = sum(
-        1
-        for line in lines
-        if (table_like_pattern.search(line) and line.count("|") >= 2)
-        or line.count(",") >= 3
-    )
-    code_hits = sum(1 for line in lines if code_like_pattern.search(line))
-
-    digit_symbol_count = sum(1 for ch in "".join(lines) if not ch.isalpha())
-    total_chars = max(len("".join(lines)), 1)
-
-    para_lengths = _paragraph_lengths(samples)
-    p90_len = int(_quantile(para_lengths, 0.9)) if para_lengths else 0
-    p50_len = int(_quantile(para_lengths, 0.5)) if para_lengths else 0
-
-    return {
-        "heading_ratio": heading_hits / total_lines,
-        "list_ratio": list_hits / total_lines,
-        "table_ratio": table_hits / total_lines,
-        "code_ratio": code_hits / total_lines,
-        "p90_para_len": p90_len,
-        "p50_para_len": p50_len,
-        "digit_symbol_ratio": digit_symbol_count / total_chars,
-        "samples": list(samples),
-    }
+
+@lru_cache(maxsize=256)
+def compile_delimiters(delimiters: Tuple[str, ...]) -> Tuple[re.Pattern[str], ...]:
+    """编译自定义分隔符（非法正则忽略）；按分隔符元组缓存，同一进程内整批文档/各页只编译一次。"""
+    patterns = []
+    for delim in delimiters:
+        try:
+            patterns.append(re.compile(delim))
+        except re.error:
+            continue
+    return tuple(patterns)
 
 
 def detect_delimiter_hits(samples: Sequence[str], delimiters: Sequence[str]) -> int:
@@ -175,11 +313,7 @@ def detect_delimiter_hits(samples: Sequence[str], delimiters: Sequence[str]) ->
     if not samples or not delimiters:
         return 0
     max_segments = 0
-    for delim in delimiters:
-        try:
-            pattern = re.compile(delim)
-        except re.error:
-            continue
+    for pattern in compile_delimiters(tuple(delimiters)):
         for text in samples:
             if not text:
                 continue
@@ -202,6 +336,14 @@ def _round_scores(scores: Dict[str, Any] | None, places: int = 3) -> Dict[str, A
     return {k: _round_value(v, places) for k, v in scores.items()}
 
 
+# 旧版画像会携带 para_lengths/samples；对外输出时剔除，避免每一跳重复传输原文。
+_PROFILE_PRIVATE_KEYS = frozenset({"para_lengths", "samples"})
+
+
+def _public_profile(profile: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in profile.items() if k not in _PROFILE_PRIVATE_KEYS}
+
+
 def _round_profile(profile: Dict[str, Any], places: int = 3) -> Dict[str, Any]:
     """对探测 profile 的数值字段做精度限制。"""
     return {k: _round_value(v, places) for k, v in profile.items()}
@@ -217,6 +359,9 @@ def estimate_params(profile: Dict[str, Any], strategy: str, custom_cfg: Dict[str
         "target_length": target_length,
         "overlap_ratio": overlap_ratio,
     }
+    # 字符数只是嵌入模型 token 上限的粗略代理；给定 token 预算时切片按 token 打包，target_length 仅作字符兜底。
+    if custom_cfg.get("target_tokens"):
+        params["target_tokens"] = int(custom_cfg["target_tokens"])
 
     if strategy == "custom_delimiter_split":
         params.update(
@@ -297,7 +442,7 @@ def recommend_strategy(
             params=params,
             candidates=scores,
             delimiter_hits_val=delimiter_hits,
-            profile_out=_round_profile({k: v for k, v in profile.items() if k != "para_lengths"}, 3),
+            profile_out=_round_profile(_public_profile(profile), 3),
             notes="格式优先: 表格格式优先使用表格切片",
             extra_note="mapped_to_hierarchical",
         )
@@ -311,7 +456,7 @@ def recommend_strategy(
             params=params,
             candidates=scores,
             delimiter_hits_val=delimiter_hits,
-            profile_out=_round_profile({k: v for k, v in profile.items() if k != "para_lengths"}, 3),
+            profile_out=_round_profile(_public_profile(profile), 3),
             notes="格式优先: 代码/日志格式优先使用代码块切片",
             extra_note="mapped_to_hierarchical",
         )
@@ -325,7 +470,7 @@ def recommend_strategy(
             params=params,
             candidates=scores,
             delimiter_hits_val=delimiter_hits,
-            profile_out=_round_profile({k: v for k, v in profile.items() if k != "para_lengths"}, 3),
+            profile_out=_round_profile(_public_profile(profile), 3),
             notes="格式优先: 幻灯片优先合并文本框",
             extra_note="mapped_to_hierarchical",
         )
@@ -388,7 +533,8 @@ def recommend_strategy(
 
     # 多页样本：逐页打分累加，最后压缩到[-1,1]
     if samples and len(samples) > 1:
-        page_profiles = [extract_signals_from_samples([s]) for s in samples if s]
+        pages = [s for s in samples if s]
+        page_profiles = [extract_signals_from_samples([s]) for s in pages]
         if page_profiles:
             # 若任一页明确命中表格阈值，直接优先表格策略，避免表头/标题页拉高 heading 分。
             table_hit_profiles = [p for p in page_profiles if float(p.get("table_ratio", 0.0)) > thresholds["t1_table"]]
@@ -402,7 +548,7 @@ def recommend_strategy(
                     params=params,
                     candidates=scores_out,
                     delimiter_hits_val=delimiter_hits,
-                    profile_out=_round_profile({k: v for k, v in profile.items() if k != "para_lengths"}, 3),
+                    profile_out=_round_profile(_public_profile(profile), 3),
                     notes="推荐的策略仅供参考(跨页累计打分)",
                     extra_note="table_detected|mapped_to_hierarchical",
                 )
@@ -410,8 +556,8 @@ def recommend_strategy(
             agg_scores: Dict[str, float] = {}
             max_delim_hits = 0
             note_text: str | None = None
-            for prof in page_profiles:
-                page_delim_hits = detect_delimiter_hits(prof.get("samples") or [], cfg.get("delimiters") or [])
+            for page, prof in zip(pages, page_profiles):
+                page_delim_hits = detect_delimiter_hits([page], cfg.get("delimiters") or [])
                 max_delim_hits = max(max_delim_hits, page_delim_hits)
                 _, page_scores, page_note = _score_profile(prof, page_delim_hits)
                 if not note_text and page_note:
@@ -433,7 +579,7 @@ def recommend_strategy(
                 params=params,
                 candidates=scores_out,
                 delimiter_hits_val=max_delim_hits,
-                profile_out=_round_profile({k: v for k, v in profile.items() if k != "para_lengths"}, 3),
+                profile_out=_round_profile(_public_profile(profile), 3),
                 notes="推荐的策略仅供参考(跨页累计打分)",
                 extra_note=note_text,
             )
@@ -451,7 +597,7 @@ def recommend_strategy(
         params=params,
         candidates=scores,
         delimiter_hits_val=delimiter_hits,
-        profile_out=_round_profile({k: v for k, v in profile.items() if k != "para_lengths"}, 3),
+        profile_out=_round_profile(_public_profile(profile), 3),
         notes="推荐的策略仅供参考",
         extra_note=note_text,
     )
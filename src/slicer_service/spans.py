@@ -0,0 +1,143 @@
+"""Compact offset-span representation of chunks over one shared text.
+
+A :class:`SpanTable` stores ``(start, end, level, parent)`` rows in four
+``array`` columns (24 bytes per span) over a single :class:`TextBuffer`.
+Parent/child structure — sections containing chunks, sections nested in
+sections — is expressed by ``parent`` row indices, so a hierarchical slicing
+never copies a character: text is materialised only when a caller asks for
+``span.text``. :class:`Span` is a two-slot view into the table, not a copy.
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+NO_PARENT = -1
+
+
+class TextBuffer:
+    """One shared string; multiple samples are joined once and addressed by offset."""
+
+    __slots__ = ("text",)
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def slice(self, start: int, end: int) -> str:
+        return self.text[start:end]
+
+    @classmethod
+    def from_samples(cls, samples: Sequence[str], separator: str = "\n\n") -> Tuple["TextBuffer", List[Tuple[int, int]]]:
+        """Join ``samples`` into one buffer and return each sample's ``(start, end)`` within it."""
+
+        bounds: List[Tuple[int, int]] = []
+        pos = 0
+        for text in samples:
+            bounds.append((pos, pos + len(text)))
+            pos += len(text) + len(separator)
+        return cls(separator.join(samples)), bounds
+
+
+class Span:
+    __slots__ = ("table", "index")
+
+    def __init__(self, table: "SpanTable", index: int) -> None:
+        self.table = table
+        self.index = index
+
+    @property
+    def start(self) -> int:
+        return self.table.starts[self.index]
+
+    @property
+    def end(self) -> int:
+        return self.table.ends[self.index]
+
+    @property
+    def level(self) -> int:
+        return self.table.levels[self.index]
+
+    @property
+    def parent(self) -> int:
+        return self.table.parents[self.index]
+
+    @property
+    def text(self) -> str:
+        return self.table.buffer.slice(self.start, self.end)
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def __repr__(self) -> str:
+        return f"Span(index={self.index}, start={self.start}, end={self.end}, level={self.level}, parent={self.parent})"
+
+
+class SpanTable:
+    __slots__ = ("buffer", "starts", "ends", "levels", "parents")
+
+    def __init__(self, buffer: TextBuffer) -> None:
+        self.buffer = buffer
+        self.starts = array("q")
+        self.ends = array("q")
+        self.levels = array("i")
+        self.parents = array("q")
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: int) -> Span:
+        if not -len(self) <= index < len(self):
+            raise IndexError(index)
+        return Span(self, index % len(self))
+
+    def __iter__(self) -> Iterator[Span]:
+        return (Span(self, index) for index in range(len(self)))
+
+    def append(self, start: int, end: int, level: int = 0, parent: int = NO_PARENT) -> int:
+        """Add a span (``parent`` must already exist) and return its row index."""
+
+        self.starts.append(start)
+        self.ends.append(end)
+        self.levels.append(level)
+        self.parents.append(parent)
+        return len(self.starts) - 1
+
+    def children(self, index: int) -> Iterator[Span]:
+        return (Span(self, row) for row, parent in enumerate(self.parents) if parent == index)
+
+    def ancestors(self, index: int) -> List[int]:
+        """Row indices from the root down to ``index``'s parent."""
+
+        chain: List[int] = []
+        parent = self.parents[index]
+        while parent != NO_PARENT:
+            chain.append(parent)
+            parent = self.parents[parent]
+        chain.reverse()
+        return chain
+
+    def leaves(self) -> Iterator[Span]:
+        """Spans nobody points to as parent (the chunks of a hierarchical slicing), in row order."""
+
+        has_children = bytearray(len(self))
+        for parent in self.parents:
+            if parent != NO_PARENT:
+                has_children[parent] = 1
+        return (Span(self, row) for row, flag in enumerate(has_children) if not flag)
+
+    def to_columns(self) -> Dict[str, Any]:
+        """Columnar, JSON-ready form: offsets only, no text."""
+
+        return {
+            "starts": self.starts.tolist(),
+            "ends": self.ends.tolist(),
+            "levels": self.levels.tolist(),
+            "parents": self.parents.tolist(),
+        }
+
+
+__all__ = ["NO_PARENT", "Span", "SpanTable", "TextBuffer"]
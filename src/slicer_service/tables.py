@@ -0,0 +1,213 @@
+"""Streaming ``table_batch`` chunker for spreadsheets and delimited text.
+
+Rows are read straight from the source — ``csv.reader`` over a text stream for
+csv/tsv, openpyxl ``read_only`` for xlsx, xlrd for legacy BIFF xls — and
+packed into Markdown table batches of at most ``target_length`` characters (or
+``target_tokens`` tokens), each starting with the sheet's header row so every
+chunk is self-describing. Only the current batch is held in memory, so
+million-row sheets are chunked in constant memory without first converting
+the whole workbook to Markdown (xls files, capped at 65536 rows by the format,
+are read whole).
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import zipfile
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .recommendation import DEFAULT_TEXT_PARAMS, FORMAT_TABLE
+from .tokens import get_token_counter
+
+# Rows are (sheet, row_number, cells); row numbers are 1-based like spreadsheet UIs.
+Row = Tuple[str, int, Sequence[Any]]
+
+_CELL_ESCAPES = str.maketrans({"|": "\\|", "\n": " ", "\r": " "})
+# Keep field size bounded without rejecting long cells outright (csv's default is 128 KiB).
+_CSV_FIELD_LIMIT = 16 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class TableBatch:
+    index: int
+    text: str
+    sheet: str
+    row_start: int
+    row_end: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "text": self.text,
+            "sheet": self.sheet,
+            "row_start": self.row_start,
+            "row_end": self.row_end,
+        }
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip().translate(_CELL_ESCAPES)
+
+
+def _render(cells: Sequence[str]) -> str:
+    return "| " + " | ".join(cells) + " |"
+
+
+def _csv_rows(stream: BinaryIO, delimiter: str, encoding: str) -> Iterator[Row]:
+    csv.field_size_limit(max(csv.field_size_limit(), _CSV_FIELD_LIMIT))
+    text = io.TextIOWrapper(stream, encoding=encoding, errors="replace", newline="")
+    try:
+        for number, cells in enumerate(csv.reader(text, delimiter=delimiter), start=1):
+            yield "", number, cells
+    finally:
+        text.detach()  # the caller owns ``stream``
+
+
+def _workbook_rows(stream: BinaryIO, sheets: Optional[Sequence[str]]) -> Iterator[Row]:
+    from openpyxl import load_workbook  # converter extra; imported lazily
+    from openpyxl.utils.exceptions import InvalidFileException
+
+    # Opened eagerly so an unreadable file fails before any batch is emitted.
+    try:
+        workbook = load_workbook(stream, read_only=True, data_only=True)
+    except (InvalidFileException, zipfile.BadZipFile, KeyError, OSError) as exc:
+        raise ValueError(f"Cannot read workbook: {exc}") from exc
+    return _iter_workbook(workbook, sheets)
+
+
+def _xls_rows(stream: BinaryIO, sheets: Optional[Sequence[str]]) -> Iterator[Row]:
+    # openpyxl only reads OOXML; BIFF .xls needs xlrd (converter extra), imported lazily.
+    try:
+        import xlrd
+        from xlrd.compdoc import CompDocError
+    except ImportError as exc:
+        raise ValueError("Reading xls requires xlrd (install the converter extra)") from exc
+
+    try:
+        book = xlrd.open_workbook(file_contents=stream.read(), on_demand=True)
+    except (xlrd.XLRDError, CompDocError) as exc:
+        raise ValueError(f"Cannot read workbook: {exc}") from exc
+    return _iter_xls(book, sheets)
+
+
+def _iter_xls(book: Any, sheets: Optional[Sequence[str]]) -> Iterator[Row]:
+    try:
+        for name in book.sheet_names():
+            if sheets and name not in sheets:
+                continue
+            sheet = book.sheet_by_name(name)
+            for number in range(sheet.nrows):
+                yield name, number + 1, sheet.row_values(number)
+            book.unload_sheet(name)
+    finally:
+        book.release_resources()
+
+
+def _iter_workbook(workbook: Any, sheets: Optional[Sequence[str]]) -> Iterator[Row]:
+    try:
+        for sheet in workbook.worksheets:
+            if sheets and sheet.title not in sheets:
+                continue
+            for number, cells in enumerate(sheet.iter_rows(values_only=True), start=1):
+                yield sheet.title, number, cells
+    finally:
+        workbook.close()
+
+
+def iter_table_rows(
+    stream: BinaryIO,
+    source_format: str,
+    *,
+    sheets: Optional[Sequence[str]] = None,
+    encoding: str = "utf-8-sig",
+) -> Iterator[Row]:
+    """Yield ``(sheet, row_number, cells)`` lazily; xlsx needs a seekable binary stream."""
+
+    fmt = (source_format or "").lower().lstrip(".")
+    if fmt not in FORMAT_TABLE:
+        raise ValueError(f"Unsupported table format: {source_format}")
+    if fmt in {"csv", "tsv"}:
+        return _csv_rows(stream, "\t" if fmt == "tsv" else ",", encoding)
+    if fmt == "xls":
+        return _xls_rows(stream, sheets)
+    return _workbook_rows(stream, sheets)
+
+
+def iter_table_batches(rows: Iterable[Row], params: Dict[str, Any] | None = None) -> Iterator[TableBatch]:
+    """Pack rows into header-prefixed Markdown batches of ≤ ``target_length`` chars (and ≤ ``max_rows`` rows).
+
+    With ``target_tokens`` the budget is in tokens of the configured counter instead. The first non-empty
+    row of each sheet is its header; empty rows are skipped. A single row longer than the budget becomes
+    its own batch rather than being split mid-row; cells beyond the header's width are merged into its
+    last column so the table stays well-formed.
+    """
+
+    params = params or {}
+    measure: Callable[[str], int] = len
+    if params.get("target_tokens"):
+        budget = max(int(params["target_tokens"]), 1)
+        measure = get_token_counter().count
+    else:
+        budget = max(int(params.get("target_length") or DEFAULT_TEXT_PARAMS["target_length"]), 1)
+    max_rows = int(params.get("max_rows") or 0)
+    index = 0
+    sheet: Optional[str] = None
+    header = ""
+    width = 0
+    batch: List[str] = []
+    size = 0
+    first_row = last_row = 0
+
+    def _flush() -> TableBatch:
+        return TableBatch(index, "\n".join([header, *batch]), sheet or "", first_row, last_row)
+
+    for row_sheet, number, raw in rows:
+        cells = [_cell(value) for value in raw]
+        while cells and not cells[-1]:
+            cells.pop()
+        if row_sheet != sheet:
+            if batch:
+                yield _flush()
+                index += 1
+                batch = []
+            sheet, header = row_sheet, ""
+        if not cells:
+            continue
+        if not header:
+            width = len(cells)
+            header = _render(cells) + "\n" + _render(["---"] * width)
+            continue
+        if len(cells) > width:
+            cells = cells[: width - 1] + [" ".join(cell for cell in cells[width - 1 :] if cell)]
+        line = _render(cells + [""] * (width - len(cells)))
+        cost = measure(line) + 1
+        if batch and (size + cost > budget or (max_rows and len(batch) >= max_rows)):
+            yield _flush()
+            index += 1
+            batch = []
+        if not batch:
+            first_row, size = number, measure(header)
+        batch.append(line)
+        size += cost
+        last_row = number
+    if batch:
+        yield _flush()
+
+
+def slice_table(
+    stream: BinaryIO,
+    source_format: str,
+    params: Dict[str, Any] | None = None,
+    *,
+    sheets: Optional[Sequence[str]] = None,
+) -> Iterator[TableBatch]:
+    return iter_table_batches(iter_table_rows(stream, source_format, sheets=sheets), params)
+
+
+__all__ = ["TableBatch", "iter_table_batches", "iter_table_rows", "slice_table"]
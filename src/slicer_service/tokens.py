@@ -0,0 +1,129 @@
+"""Fast offline token counting for token-budget chunk packing.
+
+Character budgets are a poor proxy for an embedding model's token limit on
+mixed Chinese/English text: a CJK character is roughly one token, an English
+word four characters per token. :class:`TokenEstimator` counts by script
+class using only C-level string operations — the UTF-8 byte length tells
+how many characters are 3-byte (CJK, kana, hangul, CJK punctuation) versus
+2-byte (Latin extensions, Cyrillic, Greek) — so it runs at hundreds of MB/s
+with no vocabulary.
+
+When a local BPE vocabulary is configured (``SLICE_tokens__vocab_path``, in
+the tiktoken ``<base64 token> <rank>`` format), :class:`BPETokenCounter`
+counts exactly by byte-pair merging; merges are memoised per pre-token piece,
+so the repeated words of real text cost a dict lookup.
+"""
+
+from __future__ import annotations
+
+import base64
+import math
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Protocol, Union
+
+from .config import Settings, TokenSettings, get_settings
+
+# GPT-style pre-tokenisation (contractions, letter runs, ≤3-digit groups, punctuation runs, whitespace).
+_PRETOKEN = re.compile(r"'(?:[sdmt]|ll|ve|re)| ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+|\s+(?!\S)|\s+")
+
+
+class TokenCounter(Protocol):
+    def count(self, text: str) -> int: ...
+
+
+class TokenEstimator:
+    """Script-aware heuristic; errs on the high side for scripts it does not know."""
+
+    def __init__(
+        self,
+        cjk_tokens_per_char: float = 1.0,
+        other_tokens_per_char: float = 0.5,
+        ascii_chars_per_token: float = 4.0,
+    ) -> None:
+        self.cjk_tokens_per_char = cjk_tokens_per_char
+        self.other_tokens_per_char = other_tokens_per_char
+        self.ascii_chars_per_token = ascii_chars_per_token
+
+    def count(self, text: str) -> int:
+        # Called once per sentence while packing, so kept to a few C-level calls.
+        if text.isascii():
+            return math.ceil(len(text) / self.ascii_chars_per_token)
+        ascii_chars = len(text.encode("ascii", "ignore"))
+        wide = len(text) - ascii_chars
+        # Non-ASCII chars are 2 bytes (Latin ext., Cyrillic, ...) or 3+ (CJK, kana, hangul, CJK punctuation).
+        cjk = len(text.encode("utf-8", "surrogatepass")) - ascii_chars - 2 * wide
+        if cjk > wide:
+            cjk = wide  # 4-byte chars (emoji, rare ideographs) add two
+        return math.ceil(
+            ascii_chars / self.ascii_chars_per_token
+            + cjk * self.cjk_tokens_per_char
+            + (wide - cjk) * self.other_tokens_per_char
+        )
+
+
+class BPETokenCounter:
+    """Exact counts from a byte-level BPE rank table (lower rank merges first)."""
+
+    def __init__(self, ranks: Dict[bytes, int], cache_size: int = 65536) -> None:
+        self.ranks = ranks
+        self._piece_tokens = lru_cache(maxsize=cache_size)(self._merge_count)
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path], cache_size: int = 65536) -> "BPETokenCounter":
+        ranks: Dict[bytes, int] = {}
+        with open(path, "rb") as handle:
+            for line in handle:
+                parts = line.split()
+                if len(parts) == 2:
+                    ranks[base64.b64decode(parts[0])] = int(parts[1])
+        if not ranks:
+            raise ValueError(f"No BPE ranks in {path}")
+        return cls(ranks, cache_size)
+
+    def _merge_count(self, piece: bytes) -> int:
+        if piece in self.ranks:
+            return 1
+        parts: List[bytes] = [piece[i : i + 1] for i in range(len(piece))]
+        ranks = self.ranks
+        while len(parts) > 1:
+            best: Optional[int] = None
+            best_rank = None
+            for i in range(len(parts) - 1):
+                rank = ranks.get(parts[i] + parts[i + 1])
+                if rank is not None and (best_rank is None or rank < best_rank):
+                    best, best_rank = i, rank
+            if best is None:
+                break
+            parts[best : best + 2] = [parts[best] + parts[best + 1]]
+        return len(parts)
+
+    def count(self, text: str) -> int:
+        piece_tokens = self._piece_tokens
+        return sum(piece_tokens(piece.encode("utf-8", "surrogatepass")) for piece in _PRETOKEN.findall(text))
+
+
+@lru_cache(maxsize=4)
+def _counter(
+    vocab_path: Optional[str], cache_size: int, cjk: float, other: float, ascii_chars: float
+) -> TokenCounter:
+    if vocab_path:
+        return BPETokenCounter.from_file(vocab_path, cache_size)
+    return TokenEstimator(cjk, other, ascii_chars)
+
+
+def get_token_counter(settings: Settings | None = None) -> TokenCounter:
+    """The configured counter: BPE when ``tokens.vocab_path`` is set, else the heuristic. Built once per config."""
+
+    cfg: TokenSettings = (settings or get_settings()).tokens
+    return _counter(
+        cfg.vocab_path, cfg.cache_size, cfg.cjk_tokens_per_char, cfg.other_tokens_per_char, cfg.ascii_chars_per_token
+    )
+
+
+def count_tokens(text: str, settings: Settings | None = None) -> int:
+    return get_token_counter(settings).count(text)
+
+
+__all__ = ["BPETokenCounter", "TokenCounter", "TokenEstimator", "count_tokens", "get_token_counter"]
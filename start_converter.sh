@@ -20,6 +20,8 @@ API_DOCS_FAVICON="${API_DOCS_FAVICON:-}"
 API_DOCS_TARGET_URL="${API_DOCS_TARGET_URL:-http://127.0.0.1:${API_PORT}}"
 HOST_ID="${HOSTNAME:-$(hostname)}"
 CONVERTER_WORKER_NAME="${CONVERTER_WORKER_NAME:-docker-converter-service@${HOST_ID}}"
+# e.g. CONVERTER_AUTOSCALE=8,2 together with RAG_celery__autoscale__enabled=true
+CONVERTER_AUTOSCALE="${CONVERTER_AUTOSCALE:-}"
 
 TEST_ARTIFACTS_DIR_DEFAULT="$ROOT_DIR/tests/artifacts/conversions"
 export RAG_TEST_ARTIFACTS_DIR="${RAG_TEST_ARTIFACTS_DIR:-$TEST_ARTIFACTS_DIR_DEFAULT}"
@@ -74,7 +76,8 @@ start_component "Converter FastAPI" "$RUN_DIR/api.pid" "$LOG_DIR/rag-converter-a
   "$UVICORN" rag_converter.app:app --host 0.0.0.0 --port "$API_PORT"
 
 start_component "Converter Celery" "$RUN_DIR/celery.pid" "$LOG_DIR/rag-converter-celery.log" \
-  "$CELERY" -A rag_converter.celery_app.celery_app worker -l "$CELERY_LOG_LEVEL" -n "$CONVERTER_WORKER_NAME" -Q conversion
+  "$CELERY" -A rag_converter.celery_app.celery_app worker -l "$CELERY_LOG_LEVEL" -n "$CONVERTER_WORKER_NAME" -Q conversion \
+  ${CONVERTER_AUTOSCALE:+--autoscale="$CONVERTER_AUTOSCALE"}
 
 start_component "Converter Flower" "$RUN_DIR/flower.pid" "$LOG_DIR/rag-converter-flower.log" \
   env FLOWER_UNAUTHENTICATED_API="$FLOWER_UNAUTHENTICATED_API" \
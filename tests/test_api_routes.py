@@ -39,8 +39,8 @@ def mock_celery(monkeypatch):
     payloads: list[dict] = []
 
     class _Task:
-        def delay(self, payload):
-            payloads.append(payload)
+        def apply_async(self, args=(), **options):
+            payloads.append(args[0])
 
     monkeypatch.setattr("rag_converter.api.routes.handle_conversion_task", _Task())
     return payloads
@@ -145,6 +145,88 @@ def test_submit_conversion_queues_task(api_client, mock_celery, fixed_uuid):
     assert mock_celery[0]["files"][0]["source_format"] == "doc"
 
 
+def test_submit_conversion_schedules_by_estimate(api_client, monkeypatch, fixed_uuid):
+    sent: list[dict] = []
+
+    class _Task:
+        def apply_async(self, args=(), **options):
+            sent.append({"payload": args[0], **options})
+
+    class _Predictor:
+        def __init__(self, settings):
+            pass
+
+        def estimate(self, source, target, size_mb, pages=None, *, page_limit=None):
+            return 2.0 * size_mb
+
+    monkeypatch.setattr("rag_converter.api.routes.handle_conversion_task", _Task())
+    monkeypatch.setattr("rag_converter.api.routes.DurationPredictor", _Predictor)
+    monkeypatch.setattr("rag_converter.api.routes._PREDICTORS", {})
+
+    response = api_client.post(
+        "/convert",
+        json={
+            "task_name": "demo",
+            "priority": "high",
+            "files": [
+                {"source_format": "doc", "target_format": "docx", "size_mb": 10, "input_url": "https://e.com/a.doc"},
+                {"source_format": "doc", "target_format": "docx", "size_mb": 5, "input_url": "https://e.com/b.doc"},
+            ],
+        },
+    )
+
+    assert response.status_code == 202
+    assert response.json()["estimated_duration_sec"] == 30.0
+    assert sent[0]["priority"] == 1  # high class, medium-length bucket
+    assert sent[0]["payload"]["estimated_duration_sec"] == 30.0
+
+
+def test_validate_request_accepts_multiple_targets(test_settings, monkeypatch):
+    plugins = [
+        type("P", (), {"source_format": "doc", "target_format": "docx"}),
+        type("P", (), {"source_format": "docx", "target_format": "md"}),
+    ]
+    monkeypatch.setattr("rag_converter.api.routes.REGISTRY.list", lambda: plugins)
+    payload = _make_request(files=[_make_file(target_format=None, target_formats=["docx", "MD", "docx"])])
+    _validate_request(payload, test_settings)
+    assert payload.files[0].target_formats == ["docx", "md"]
+    assert payload.files[0].target_format == "docx"
+
+    sync_payload = _make_request(files=[_make_file(target_formats=["docx", "md"])], mode="sync")
+    with pytest.raises(HTTPException) as exc:
+        _validate_request(sync_payload, test_settings)
+    assert "single target format" in exc.value.detail["message"]
+
+
+def test_validate_request_rejects_archive_with_other_files(test_settings):
+    files = [_make_file(source_format="zip", target_format=None, object_key="a.zip"), _make_file()]
+    payload = _make_request(files=files)
+    with pytest.raises(HTTPException) as exc:
+        _validate_request(payload, test_settings)
+    assert exc.value.detail["error_code"] == "ERR_BATCH_LIMIT_EXCEEDED"
+
+
+def test_submit_conversion_expands_archive_under_parent_id(api_client, monkeypatch, fixed_uuid):
+    sent: list[dict] = []
+
+    class _Task:
+        def apply_async(self, args=(), **options):
+            sent.append({"payload": args[0], **options})
+
+    monkeypatch.setattr("rag_converter.api.routes.expand_archive_task", _Task())
+    response = api_client.post(
+        "/convert",
+        json={
+            "task_name": "demo",
+            "files": [{"source_format": "zip", "size_mb": 12, "object_key": "uploads/bundle.zip"}],
+        },
+    )
+
+    assert response.status_code == 202
+    assert sent[0]["task_id"] == fixed_uuid
+    assert sent[0]["payload"]["files"][0]["target_format"] is None
+
+
 def test_submit_conversion_passes_storage_override(api_client, mock_celery, fixed_uuid):
     payload = {
         "task_name": "demo",
@@ -280,7 +362,7 @@ def test_submit_conversion_sync_mode_uploads_sitech(api_client, monkeypatch, tmp
 
 def test_submit_conversion_handles_celery_failure(api_client, monkeypatch):
     class _FailingTask:
-        def delay(self, payload):
+        def apply_async(self, args=(), **options):
             raise CeleryError("boom")
 
     monkeypatch.setattr("rag_converter.api.routes.handle_conversion_task", _FailingTask())
@@ -303,6 +385,21 @@ def test_submit_conversion_handles_celery_failure(api_client, monkeypatch):
     assert response.json()["detail"]["error_code"] == "ERR_TASK_FAILED"
 
 
+def test_cancel_conversion_reports_terminated_processes(api_client, monkeypatch):
+    cancelled: list[str] = []
+
+    def _fake_cancel(task_id):
+        cancelled.append(task_id)
+        return 2
+
+    monkeypatch.setattr("rag_converter.api.routes._cancel_task", _fake_cancel)
+    response = api_client.post("/tasks/abc/cancel")
+
+    assert response.status_code == 202
+    assert response.json() == {"task_id": "abc", "status": "cancelling", "terminated_processes": 2}
+    assert cancelled == ["abc"]
+
+
 def test_list_formats_uses_registry(api_client, monkeypatch):
     class _Plugin:
         source_format = "wav"
@@ -0,0 +1,123 @@
+"""Tests for archive member enumeration and worker-side fan-out."""
+
+from __future__ import annotations
+
+import io
+import zipfile
+from types import SimpleNamespace
+
+import pytest
+
+import rag_converter.celery_app as worker
+from rag_converter.archive import iter_archive_members, member_object_key, sniff_format
+
+
+def _docx_bytes() -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as inner:
+        inner.writestr("[Content_Types].xml", "<Types/>")
+        inner.writestr("word/document.xml", "<w:document/>")
+    return buffer.getvalue()
+
+
+def _write_archive(path, members: dict[str, bytes]):
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("docs/", b"")
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return path
+
+
+def test_sniff_format_recognises_magic_bytes():
+    assert sniff_format(b"%PDF-1.7\n") == "pdf"
+    assert sniff_format(b"RIFF\x00\x00\x00\x00WAVEfmt ") == "wav"
+    assert sniff_format(b"\xef\xbb\xbf<?xml version='1.0'?><svg xmlns='x'>") == "svg"
+    assert sniff_format(b"hello world") is None
+
+
+def test_iter_archive_members_infers_formats_and_skips_metadata(tmp_path):
+    path = _write_archive(
+        tmp_path / "bundle.zip",
+        {
+            "docs/Report.PDF": b"%PDF-1.4 ...",
+            "docs/scan": b"%PDF-1.4 ...",
+            "slides": _docx_bytes(),
+            "__MACOSX/docs/._Report.PDF": b"junk",
+            "docs/.DS_Store": b"junk",
+        },
+    )
+
+    with zipfile.ZipFile(path) as archive:
+        members = list(iter_archive_members(archive))
+
+    assert [(m.index, m.name, m.source_format) for m in members] == [
+        (0, "docs/Report.PDF", "pdf"),
+        (1, "docs/scan", "pdf"),
+        (2, "slides", "docx"),
+    ]
+    assert member_object_key("t1", members[0]) == "archives/t1/00000-Report.PDF"
+
+
+def test_expand_archive_streams_members_and_builds_subtasks(monkeypatch, tmp_path, test_settings):
+    path = _write_archive(
+        tmp_path / "bundle.zip",
+        {"docs/a.pdf": b"%PDF-1.4 a", "b.doc": b"x" * 10, "c.xyz": b"?"},
+    )
+    uploads: list[tuple[str, bytes]] = []
+
+    class _Client:
+        def put_object(self, bucket, object_key, data, length):
+            uploads.append((object_key, data.read()))
+
+    registry = SimpleNamespace(
+        list=lambda: [
+            SimpleNamespace(source_format="pdf", target_format="md"),
+            SimpleNamespace(source_format="doc", target_format="docx"),
+            SimpleNamespace(source_format="doc", target_format="pdf"),
+        ]
+    )
+    monkeypatch.setattr(worker, "_get_minio_client", lambda settings, use_cache=True: _Client())
+    monkeypatch.setattr(worker, "REGISTRY", registry)
+
+    payload = {
+        "task_id": "parent",
+        "priority": "high",
+        "files": [{"source_format": "zip", "target_format": "pdf", "local_path": str(path)}],
+    }
+    subtasks, members, skipped = worker._expand_archive(payload, test_settings, "parent")
+
+    assert uploads == [("archives/parent/00000-a.pdf", b"%PDF-1.4 a"), ("archives/parent/00001-b.doc", b"x" * 10)]
+    assert members == [(0, "docs/a.pdf"), (1, "b.doc")]
+    files = [sub["files"][0] for sub, _ in subtasks]
+    assert [(f["source_format"], f["target_format"]) for f in files] == [("pdf", "md"), ("doc", "pdf")]
+    assert all(sub["task_id"] == "parent" for sub, _ in subtasks)
+    assert skipped[0]["archive_member"] == "c.xyz"
+    assert skipped[0]["status"] == "ignored"
+
+
+def test_expand_archive_enforces_member_limit(monkeypatch, tmp_path, test_settings):
+    path = _write_archive(tmp_path / "many.zip", {f"{i}.pdf": b"%PDF" for i in range(3)})
+    settings = test_settings.model_copy(
+        update={"file_limits": test_settings.file_limits.model_copy(update={"max_archive_members": 2})}
+    )
+    monkeypatch.setattr(worker, "_get_minio_client", lambda settings, use_cache=True: None)
+
+    payload = {"files": [{"source_format": "zip", "local_path": str(path)}]}
+    with pytest.raises(ValueError, match="more than 2 members"):
+        worker._expand_archive(payload, settings, "parent")
+
+
+def test_aggregate_archive_results_orders_by_member(monkeypatch, test_settings):
+    monkeypatch.setattr(worker, "SETTINGS", test_settings)
+    monkeypatch.setattr(worker, "record_result_size", lambda *args, **kwargs: None)
+
+    merged = worker.aggregate_archive_results(
+        [{"task_id": "parent", "results": [{"status": "success", "filename": "b.doc"}]}],
+        task_id="parent",
+        members=[[2, "b.doc"]],
+        skipped=[{"status": "ignored", "archive_index": 0, "archive_member": "a.xyz"}],
+    )
+
+    assert merged["task_id"] == "parent"
+    assert [item["archive_member"] for item in merged["results"]] == ["a.xyz", "b.doc"]
+    assert merged["archive"] == {"members": 2}
@@ -0,0 +1,125 @@
+"""Tests for the resource-aware worker autoscaler."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from rag_converter.autoscale import (
+    ConcurrencyController,
+    ResourceAwareAutoscaler,
+    ResourceSample,
+    ToolLatencyBoard,
+    plugin_tool,
+)
+from rag_converter.config import WorkerAutoscaleSettings
+
+
+def _controller(**overrides) -> ConcurrencyController:
+    return ConcurrencyController(WorkerAutoscaleSettings(enabled=True, **overrides), base_prefetch_multiplier=4)
+
+
+def test_controller_grows_with_backlog_when_resources_are_free():
+    controller = _controller(grow_step=2)
+    decision = controller.decide(
+        processes=2, reserved=10, min_procs=1, max_procs=8,
+        sample=ResourceSample(cpu_load=0.3, mem_available_ratio=0.6),
+    )
+    assert decision.processes == 4
+    assert decision.prefetch_multiplier == 4
+    assert decision.reason == "backlog"
+
+
+def test_controller_respects_max_bound():
+    decision = _controller(grow_step=5).decide(
+        processes=7, reserved=20, min_procs=1, max_procs=8, sample=ResourceSample()
+    )
+    assert decision.processes == 8
+
+
+def test_controller_shrinks_and_throttles_prefetch_on_memory_pressure():
+    decision = _controller().decide(
+        processes=6, reserved=20, min_procs=2, max_procs=8,
+        sample=ResourceSample(cpu_load=0.2, mem_available_ratio=0.05),
+    )
+    assert decision.processes == 5
+    assert decision.prefetch_multiplier == 1
+    assert decision.reason == "memory"
+
+
+def test_controller_detects_pool_rss_and_cpu_pressure():
+    controller = _controller(max_pool_rss_mb=1000, max_cpu_load=0.8)
+    rss = controller.decide(processes=2, reserved=0, min_procs=2, max_procs=4, sample=ResourceSample(pool_rss_mb=1500))
+    assert rss.reason == "rss"
+    assert rss.processes == 2  # never below min
+    cpu = controller.decide(processes=3, reserved=5, min_procs=1, max_procs=4, sample=ResourceSample(cpu_load=1.5))
+    assert cpu.reason == "cpu"
+    assert cpu.processes == 2
+
+
+def test_controller_latency_slowdown_against_baseline():
+    controller = _controller(min_latency_samples=2, latency_slowdown_factor=2.0)
+    fast = ResourceSample(tool_latency={"libreoffice": (1.0, 5)})
+    assert controller.decide(processes=2, reserved=2, min_procs=1, max_procs=4, sample=fast).reason == "steady"
+
+    slow = ResourceSample(tool_latency={"libreoffice": (3.5, 9)})
+    decision = controller.decide(processes=2, reserved=4, min_procs=1, max_procs=4, sample=slow)
+    assert decision.reason == "latency:libreoffice"
+    assert decision.processes == 1
+
+
+def test_controller_idle_shrinks_towards_reserved():
+    decision = _controller().decide(processes=4, reserved=1, min_procs=2, max_procs=8, sample=ResourceSample())
+    assert decision.processes == 2
+    assert decision.reason == "idle"
+
+
+def test_latency_board_tracks_ewma_per_tool():
+    board = ToolLatencyBoard()
+    board.record("ffmpeg", 2.0)
+    board.record("ffmpeg", 4.0)
+    board.record("unknown-tool", 1.0)
+
+    snapshot = board.snapshot()
+    ewma, count = snapshot["ffmpeg"]
+    assert count == 2
+    assert 2.0 < ewma < 4.0
+    assert snapshot["python"] == (1.0, 1)
+
+
+def test_plugin_tool_uses_dependency_file(monkeypatch):
+    monkeypatch.setattr(
+        "rag_converter.autoscale._PLUGIN_TOOLS",
+        {"rag_converter.plugins.builtin.docx_to_pdf": "libreoffice"},
+    )
+    from rag_converter.plugins.builtin.docx_to_pdf import DocxToPdfPlugin
+
+    assert plugin_tool(DocxToPdfPlugin()) == "libreoffice"
+    assert plugin_tool(SimpleNamespace()) == "python"
+
+
+def test_autoscaler_applies_decision(monkeypatch):
+    qos_values: list[int] = []
+    consumer = SimpleNamespace(
+        prefetch_multiplier=4,
+        initial_prefetch_count=8,
+        qos=SimpleNamespace(set=lambda value: qos_values.append(value)),
+    )
+
+    class _Pool:
+        num_processes = 4
+
+        def shrink(self, n):
+            self.num_processes -= n
+
+        def grow(self, n):
+            self.num_processes += n
+
+    pool = _Pool()
+    scaler = ResourceAwareAutoscaler(pool, 8, 1, worker=SimpleNamespace(consumer=consumer))
+    monkeypatch.setattr(scaler, "sample", lambda: ResourceSample(mem_available_ratio=0.01))
+
+    assert scaler._maybe_scale()
+    assert pool.num_processes == 3
+    assert consumer.prefetch_multiplier == 1
+    assert qos_values
+    assert scaler.info()["reason"] == "memory"
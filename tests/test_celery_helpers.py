@@ -4,11 +4,21 @@ from __future__ import annotations
 
 import base64
 from pathlib import Path
+from types import SimpleNamespace
 
 import rag_converter.celery_app as worker
+from rag_converter.config import CeleryQueueSettings, SchedulingSettings, Settings
 from rag_converter.plugins.base import ConversionResult
 
 
+def test_unprioritised_messages_default_to_the_normal_band():
+    app = worker._create_celery(Settings())
+    assert app.conf.task_default_priority == 4  # normal class, medium-length step
+
+    unscheduled = Settings(celery=CeleryQueueSettings(scheduling=SchedulingSettings(enabled=False)))
+    assert worker._create_celery(unscheduled).conf.task_default_priority is None
+
+
 def test_workspace_file_uses_temp_dir(tmp_path, monkeypatch):
     monkeypatch.setattr(worker, "WORK_DIR", tmp_path)
     generated = worker._workspace_file("example.txt")
@@ -74,7 +84,13 @@ def test_upload_output_sends_to_minio(tmp_path, test_settings, monkeypatch):
 
 def test_handle_conversion_task_success(monkeypatch, tmp_path, test_settings):
     statuses: list[str] = []
-    monkeypatch.setattr(worker, "record_task_completed", lambda status: statuses.append(status))
+    recorded: list[dict] = []
+
+    def _record(status, **kwargs):
+        statuses.append(status)
+        recorded.append(kwargs)
+
+    monkeypatch.setattr(worker, "record_task_completed", _record)
     monkeypatch.setattr(worker, "ensure_metrics_server", lambda port: None)
     monkeypatch.setattr(worker, "_worker_metrics_started", False)
     monkeypatch.setattr(worker, "SETTINGS", test_settings)
@@ -90,6 +106,7 @@ def test_handle_conversion_task_success(monkeypatch, tmp_path, test_settings):
                 output_path=str(tmp_path / "output.docx"),
                 object_key="converted/docx",
                 metadata={"size": 12},
+                perf={"pages": 3},
             )
 
     class _Registry:
@@ -119,15 +136,86 @@ def test_handle_conversion_task_success(monkeypatch, tmp_path, test_settings):
     assert result["task_id"] == "task-1"
     assert result["results"][0]["status"] == "success"
     assert statuses == ["success"]
+    # Measured input bytes and converted pages, not the declared size_mb/page_limit.
+    assert recorded[0]["size_bytes"] == 4 and recorded[0]["pages"] == 3
     assert registry.requested == [("doc", "docx")]
 
 
+def test_handle_conversion_task_fans_out_targets_from_one_input(monkeypatch, tmp_path, test_settings):
+    monkeypatch.setattr(worker, "record_task_completed", lambda status, **_: None)
+    monkeypatch.setattr(worker, "ensure_metrics_server", lambda port: None)
+    monkeypatch.setattr(worker, "SETTINGS", test_settings)
+
+    input_file = tmp_path / "input.doc"
+    input_file.write_text("data", encoding="utf-8")
+    downloads: list[str] = []
+
+    def _materialize(file_meta, settings, use_cache=True):
+        downloads.append(file_meta["input_url"])
+        return input_file
+
+    monkeypatch.setattr(worker, "_materialize_input", _materialize)
+    monkeypatch.setattr(worker, "_upload_input_to_sitech", lambda path: None)
+    monkeypatch.setattr(worker, "_upload_output_to_sitech", lambda path: None)
+
+    converted: list[tuple[str, str, str]] = []
+
+    class _Plugin:
+        def __init__(self, target):
+            self.target = target
+            self.slug = f"fake-to-{target}"
+
+        def convert(self, conv_input):
+            converted.append((conv_input.source_format, self.target, Path(conv_input.input_path).name))
+            output = Path(conv_input.input_path).with_suffix(f".{self.target}")
+            return ConversionResult(output_path=str(output), object_key=f"converted/{self.target}", metadata={})
+
+    class _Registry:
+        pairs = {("doc", "docx"), ("doc", "pdf"), ("docx", "md")}
+
+        def get(self, source, target):
+            if (source, target) not in self.pairs:
+                raise KeyError((source, target))
+            return _Plugin(target)
+
+        def list(self):
+            return [SimpleNamespace(source_format=s, target_format=t) for s, t in sorted(self.pairs)]
+
+    monkeypatch.setattr(worker, "REGISTRY", _Registry())
+
+    payload = {
+        "task_id": "task-multi",
+        "files": [
+            {
+                "source_format": "doc",
+                "target_format": "md",
+                "target_formats": ["md", "pdf", "docx"],
+                "input_url": "https://example.com/file.doc",
+                "size_mb": 1,
+            }
+        ],
+    }
+
+    result = worker.handle_conversion_task.run(payload)
+    assert downloads == ["https://example.com/file.doc"]
+    assert converted == [("doc", "docx", "input.doc"), ("docx", "md", "input.docx"), ("doc", "pdf", "input.doc")]
+    assert [item["target"] for item in result["results"]] == ["docx", "md", "pdf"]
+    assert result["results"][1]["metadata"]["intermediate"] == "docx"
+    perf = [item["metadata"]["perf"] for item in result["results"]]
+    assert [p["input_reused"] for p in perf] == [False, True, True]
+    assert perf[0]["plugin"] == perf[0]["engine"] == "fake-to-docx"
+    assert perf[0]["cache_hit"] is False
+    assert perf[0]["input_bytes"] == len("data")
+    assert set(perf[0]["stages"]) == {"materialize", "convert", "upload"}
+    assert perf[0]["total_sec"] >= 0
+
+
 def test_handle_conversion_task_uploads_input_to_sitech(monkeypatch, tmp_path, test_settings):
     statuses: list[str] = []
     sitech_calls: list[Path] = []
     sitech_output_calls: list[Path] = []
 
-    monkeypatch.setattr(worker, "record_task_completed", lambda status: statuses.append(status))
+    monkeypatch.setattr(worker, "record_task_completed", lambda status, **_: statuses.append(status))
     monkeypatch.setattr(worker, "ensure_metrics_server", lambda port: None)
     monkeypatch.setattr(worker, "_worker_metrics_started", False)
     monkeypatch.setattr(worker, "SETTINGS", test_settings)
@@ -172,7 +260,7 @@ def test_handle_conversion_task_persists_artifacts(monkeypatch, tmp_path, test_s
     artifact_dir = tmp_path / "artifacts"
     statuses: list[str] = []
 
-    monkeypatch.setattr(worker, "record_task_completed", lambda status: statuses.append(status))
+    monkeypatch.setattr(worker, "record_task_completed", lambda status, **_: statuses.append(status))
     monkeypatch.setattr(worker, "ensure_metrics_server", lambda port: None)
     monkeypatch.setattr(worker, "_worker_metrics_started", False)
     monkeypatch.setattr(worker, "SETTINGS", test_settings)
@@ -215,7 +303,7 @@ def test_handle_conversion_task_persists_artifacts(monkeypatch, tmp_path, test_s
 
 def test_handle_conversion_task_records_failures(monkeypatch, tmp_path, test_settings):
     statuses: list[str] = []
-    monkeypatch.setattr(worker, "record_task_completed", lambda status: statuses.append(status))
+    monkeypatch.setattr(worker, "record_task_completed", lambda status, **_: statuses.append(status))
     monkeypatch.setattr(worker, "ensure_metrics_server", lambda port: None)
     monkeypatch.setattr(worker, "_worker_metrics_started", False)
     monkeypatch.setattr(worker, "SETTINGS", test_settings)
@@ -248,6 +336,32 @@ def test_handle_conversion_task_records_failures(monkeypatch, tmp_path, test_set
     assert result["results"][0]["status"] == "failed"
     assert result["results"][1]["status"] == "failed"
     assert "Unsupported format ppt->pptx" in result["results"][1]["reason"]
+    failed_perf = result["results"][0]["metadata"]["perf"]
+    assert set(failed_perf["stages"]) == {"materialize", "convert"}
+    assert failed_perf["output_bytes"] is None
+    assert result["results"][1]["metadata"]["perf"]["stages"] == {}
+
+
+def test_passthrough_result_carries_perf(monkeypatch, tmp_path, test_settings):
+    monkeypatch.setattr(worker, "record_task_completed", lambda status, **_: None)
+    monkeypatch.setattr(worker, "ensure_metrics_server", lambda port: None)
+    monkeypatch.setattr(worker, "_worker_metrics_started", False)
+    monkeypatch.setattr(worker, "SETTINGS", test_settings)
+    input_file = tmp_path / "input.pdf"
+    input_file.write_bytes(b"%PDF-1.4 data")
+    monkeypatch.setattr(worker, "_materialize_input", lambda file_meta, settings, use_cache=True: input_file)
+    monkeypatch.setattr(worker, "_upload_output", lambda path, settings, task_id, use_cache=True: "converted/x.pdf")
+    monkeypatch.setattr(worker, "_build_download_url", lambda key, settings, use_cache=True: None)
+    monkeypatch.setattr(worker, "TEST_ARTIFACTS_DIR", tmp_path / "artifacts")
+
+    payload = {"task_id": "task-pt", "files": [{"source_format": "pdf", "target_format": "pdf", "object_key": "a"}]}
+    result = worker.handle_conversion_task.run(payload)["results"][0]
+
+    assert result["status"] == "success" and result["metadata"]["passthrough"] is True
+    perf = result["metadata"]["perf"]
+    assert perf["engine"] == "passthrough" and perf["cache_hit"] is False
+    assert perf["input_bytes"] == perf["output_bytes"] == 13
+    assert set(perf["stages"]) == {"materialize", "upload"}
 
 
 def test_handle_conversion_task_respects_storage_override(monkeypatch, tmp_path, test_settings):
@@ -289,7 +403,7 @@ def test_handle_conversion_task_respects_storage_override(monkeypatch, tmp_path,
     monkeypatch.setattr(worker, "WORK_DIR", tmp_path)
     monkeypatch.setattr(worker, "_get_minio_client", _fake_get_client)
     monkeypatch.setattr(worker, "REGISTRY", _Registry())
-    monkeypatch.setattr(worker, "record_task_completed", lambda status: None)
+    monkeypatch.setattr(worker, "record_task_completed", lambda status, **_: None)
     monkeypatch.setattr(worker, "ensure_metrics_server", lambda port: None)
     monkeypatch.setattr(worker, "_worker_metrics_started", False)
     monkeypatch.setattr(worker, "SETTINGS", test_settings)
@@ -317,3 +431,71 @@ def test_handle_conversion_task_respects_storage_override(monkeypatch, tmp_path,
     assert any(entry[0] == "client" and entry[1] == "http://custom:9100" and entry[2] == "ak" and entry[3] == "custom-bkt" and entry[4] is False for entry in calls)
     assert ("get", "http://custom:9100", "custom-bkt", "foo/in.html") in calls
     assert any(entry[0] == "put" and entry[2] == "custom-bkt" for entry in calls)
+
+
+def test_ignored_file_result_does_not_echo_inline_payload(monkeypatch, test_settings):
+    monkeypatch.setattr(worker, "record_task_completed", lambda status, **_: None)
+    monkeypatch.setattr(worker, "ensure_metrics_server", lambda port: None)
+    monkeypatch.setattr(worker, "_worker_metrics_started", False)
+    monkeypatch.setattr(worker, "SETTINGS", test_settings)
+
+    b64 = base64.b64encode(b"x" * 3000).decode("ascii")
+    response = worker.handle_conversion_task(
+        {"task_id": "t-ignored", "files": [{"source_format": None, "filename": "a.bin", "base64_data": b64}]}
+    )
+
+    result = response["results"][0]
+    assert result["status"] == "ignored"
+    assert result["file_ref"] == {"source": "a.bin", "filename": "a.bin", "inline_bytes": 3000}
+    assert b64 not in str(response)
+
+
+def test_enforce_result_budget_offloads_large_fields(monkeypatch, test_settings):
+    uploads: dict[str, bytes] = {}
+
+    class _Client:
+        def put_object(self, bucket, object_key, data, length, content_type=None):
+            uploads[object_key] = data.read()
+
+    monkeypatch.setattr(worker, "_get_minio_client", lambda settings, use_cache=True: _Client())
+    settings = test_settings.model_copy(
+        update={"celery": test_settings.celery.model_copy(update={"max_inline_field_bytes": 256})}
+    )
+    response = {
+        "task_id": "t-1",
+        "results": [
+            {"status": "success", "metadata": {"note": "ok"}},
+            {"status": "success", "metadata": {"log": "y" * 1000}},
+        ],
+    }
+
+    slimmed = worker._enforce_result_budget(response, settings, "t-1")
+
+    assert slimmed["results"][0]["metadata"] == {"note": "ok"}
+    offloaded = slimmed["results"][1]
+    assert offloaded["metadata"] == {"offloaded": True}
+    object_key = offloaded["diagnostics"]["metadata"]["object_key"]
+    assert object_key.startswith("diagnostics/t-1/1-metadata-")
+    assert b"y" * 1000 in uploads[object_key]
+
+
+def test_enforce_result_budget_keeps_fields_when_offload_fails(monkeypatch, test_settings):
+    offloads: list[str] = []
+    sizes: list[tuple[int, bool]] = []
+
+    class _Client:
+        def put_object(self, *args, **kwargs):
+            raise OSError("minio down")
+
+    monkeypatch.setattr(worker, "_get_minio_client", lambda settings, use_cache=True: _Client())
+    monkeypatch.setattr(worker, "record_result_offload", offloads.append)
+    monkeypatch.setattr(worker, "record_result_size", lambda size, over_budget=False: sizes.append((size, over_budget)))
+    celery = test_settings.celery.model_copy(update={"max_inline_field_bytes": 256, "max_result_bytes": 512})
+    settings = test_settings.model_copy(update={"celery": celery})
+    item = {"status": "failed", "metadata": {"log": "y" * 1000}, "reason": "z" * 1000}
+
+    result = worker._enforce_result_budget({"task_id": "t-2", "results": [dict(item)]}, settings, "t-2")["results"][0]
+
+    assert result == item  # nothing replaced, no diagnostics entry
+    assert offloads == []
+    assert sizes[0][1] is True
@@ -0,0 +1,133 @@
+"""Tests for the MinerU client against a stub /file_parse server."""
+
+from __future__ import annotations
+
+import importlib
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from pypdf import PdfWriter
+
+from rag_converter.config import MinerUSettings, Settings
+from rag_converter.plugins import mineru
+from rag_converter.plugins.base import ConversionInput
+from rag_converter.plugins.mineru import MinerUClient, MinerUError
+from rag_converter.plugins.registry import REGISTRY
+
+
+class _StubMinerU(BaseHTTPRequestHandler):
+    fail_first: int = 0
+    calls: list[str] = []
+
+    def do_POST(self):  # noqa: N802 - http.server API
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        name = re.search(rb'filename="([^"]+)"', body).group(1).decode()
+        type(self).calls.append(name)
+        if type(self).fail_first > 0:
+            type(self).fail_first -= 1
+            self.send_response(503)
+            self.end_headers()
+            return
+        stem = name.rsplit(".", 1)[0]
+        payload = json.dumps({"results": {stem: {"md_content": f"# {stem}\n"}}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):  # keep pytest output quiet
+        pass
+
+
+@pytest.fixture()
+def stub_server():
+    _StubMinerU.calls = []
+    _StubMinerU.fail_first = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubMinerU)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _blank_pdf(path, pages):
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=200, height=200)
+    with path.open("wb") as handle:
+        writer.write(handle)
+    return path
+
+
+def test_mineru_client_shards_merges_in_order_and_caches(tmp_path, stub_server):
+    pdf = _blank_pdf(tmp_path / "scan.pdf", 7)
+    _StubMinerU.fail_first = 1
+    settings = MinerUSettings(
+        endpoints=[stub_server, stub_server + "/"],
+        shard_pages=3,
+        retry_budget=2,
+        cache_dir=str(tmp_path / "cache"),
+    )
+    client = MinerUClient(settings)
+
+    markdown, info = client.parse(pdf)
+    assert markdown == "# scan-p00001-00003\n\n# scan-p00004-00006\n\n# scan-p00007-00007"
+    assert info == {"cache_hit": False, "shards": 3, "pages": 7}
+    assert len(_StubMinerU.calls) == 4  # one 503 retried
+
+    again, info = client.parse(pdf)
+    assert again == markdown
+    assert info == {"cache_hit": True, "shards": 0, "pages": 7}
+    assert len(_StubMinerU.calls) == 4
+
+    limited, info = client.parse(pdf, page_limit=2)
+    assert limited == "# scan-p00001-00002"
+    assert info["shards"] == 1
+
+
+def test_mineru_client_sends_small_documents_whole(tmp_path, stub_server):
+    pdf = _blank_pdf(tmp_path / "short.pdf", 2)
+    client = MinerUClient(MinerUSettings(endpoints=[stub_server], shard_pages=3, cache_dir=None))
+
+    markdown, info = client.parse(pdf)
+    assert markdown == "# short-p00001-00002"
+    assert _StubMinerU.calls == ["short-p00001-00002.pdf"]
+    assert info["shards"] == 1
+
+
+def test_mineru_client_gives_up_when_retry_budget_is_spent(tmp_path, stub_server):
+    pdf = _blank_pdf(tmp_path / "busy.pdf", 1)
+    _StubMinerU.fail_first = 5
+    client = MinerUClient(MinerUSettings(endpoints=[stub_server], retry_budget=1, cache_dir=None))
+
+    with pytest.raises(MinerUError):
+        client.parse(pdf)
+    assert len(_StubMinerU.calls) == 2
+
+
+def test_mineru_plugin_reports_pages_on_cache_hits(tmp_path, stub_server, monkeypatch):
+    # The plugin shares pdf -> md with pdf_to_md, so import it without registering.
+    monkeypatch.setattr(REGISTRY, "register", lambda plugin_cls: None)
+    mineru_pdf_to_md = importlib.import_module("rag_converter.plugins.builtin.mineru_pdf_to_md")
+    cache_dir = tmp_path / "cache"
+    settings = Settings(mineru=MinerUSettings(endpoints=[stub_server], shard_pages=3, cache_dir=str(cache_dir)))
+    monkeypatch.setattr(mineru_pdf_to_md, "get_settings", lambda: settings)
+    monkeypatch.setattr(mineru, "_CLIENT", None)
+    pdf = _blank_pdf(tmp_path / "report.pdf", 4)
+    plugin = mineru_pdf_to_md.MinerUPdfToMarkdownPlugin()
+
+    def _convert():
+        return plugin.convert(ConversionInput(source_format="pdf", target_format="md", input_path=pdf)).perf
+
+    assert _convert() == {"engine": "mineru", "pages": 4, "cache_hit": False, "shards": 2}
+    assert _convert() == {"engine": "mineru", "pages": 4, "cache_hit": True, "shards": 0}
+
+    for sidecar in cache_dir.rglob("*.json"):  # entries cached before page counts were stored
+        sidecar.unlink()
+    assert _convert()["pages"] is None
+    assert len(_StubMinerU.calls) == 2
@@ -65,6 +65,30 @@ def test_record_task_metrics_increment(monkeypatch):
     assert completed.count == 1
 
 
+def test_record_task_completed_observes_size_and_pages(monkeypatch):
+    observed: dict[str, list] = {"duration": [], "bytes": [], "pages": []}
+
+    class _HistogramStub:
+        def __init__(self, name):
+            self.name = name
+
+        def labels(self, **kwargs):
+            return self
+
+        def observe(self, value):
+            observed[self.name].append(value)
+
+    monkeypatch.setattr("rag_converter.monitoring.TASKS_COMPLETED", _CounterStub())
+    monkeypatch.setattr("rag_converter.monitoring.TASK_DURATION", _HistogramStub("duration"))
+    monkeypatch.setattr("rag_converter.monitoring.TASK_INPUT_BYTES", _HistogramStub("bytes"))
+    monkeypatch.setattr("rag_converter.monitoring.TASK_PAGES", _HistogramStub("pages"))
+
+    record_task_completed("success", source="pdf", target="md", duration_sec=2.5, size_bytes=2048, pages=12)
+    record_task_completed("success", source="docx", target="pdf", duration_sec=1.0, size_bytes=10)
+
+    assert observed == {"duration": [2.5, 1.0], "bytes": [2048, 10], "pages": [12]}
+
+
 def test_check_redis_success(monkeypatch, test_settings):
     gauge = _GaugeStub()
     monkeypatch.setattr("rag_converter.monitoring.QUEUE_DEPTH", gauge)
@@ -73,8 +97,8 @@ def test_check_redis_success(monkeypatch, test_settings):
         def ping(self):
             return True
 
-        def llen(self, _queue):
-            return 7
+        def llen(self, queue):
+            return {"conversion": 7, "conversion:4": 2}.get(queue, 0)
 
     monkeypatch.setattr(
         "rag_converter.monitoring.redis.Redis.from_url",
@@ -83,7 +107,7 @@ def test_check_redis_success(monkeypatch, test_settings):
 
     result = _check_redis(test_settings)
     assert result == "ok"
-    assert gauge.values[-1] == 7
+    assert gauge.values[-1] == 9  # base list plus per-priority lists
 
 
 def test_check_redis_failure(monkeypatch, test_settings):
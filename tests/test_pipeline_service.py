@@ -8,6 +8,7 @@ import pytest
 from pypdf import PdfWriter
 
 from pipeline_service.celery_app import pipeline_celery
+from pipeline_service import tasks
 from pipeline_service.tasks import extract_and_probe, run_document_pipeline
 
 
@@ -81,3 +82,17 @@ def test_run_document_pipeline_chain():
     result = run_document_pipeline.apply(args=(payload,)).get()
     assert result["recommendation"]["strategy_id"] == "sentence_split_sliding"
     assert "conversion" in result
+
+
+def test_probe_cache_is_versioned_and_skipped_in_eager_mode(monkeypatch):
+    def _no_redis():
+        raise AssertionError("eager runs must not touch the probe cache")
+
+    monkeypatch.setattr(tasks, "_probe_cache_client", _no_redis)
+    key = tasks._probe_cache_key(["text"], "pdf")
+    assert key.startswith(f"pipeline:probe:v{tasks.PROBE_CACHE_VERSION}:")
+    monkeypatch.setattr(tasks, "PROBE_CACHE_VERSION", "next")
+    assert tasks._probe_cache_key(["text"], "pdf") != key
+
+    assert tasks._probe_cache_get(key) is None
+    tasks._probe_cache_set(key, {"profile": {}})
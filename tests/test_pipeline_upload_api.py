@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from pathlib import Path
+from types import SimpleNamespace
 
 from fastapi.testclient import TestClient
 
@@ -42,3 +43,153 @@ def test_upload_to_minio(monkeypatch, tmp_path):
     assert stored["bucket"] == data["bucket"]
     assert data["object_key"].startswith("uploads/")
     assert stored["content"] == b"hello"
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.hashes: dict[str, dict[str, str]] = {}
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        target = self.hashes.setdefault(key, {})
+        if mapping:
+            target.update(mapping)
+        if field is not None:
+            target[field] = value
+
+    def hget(self, key, field):
+        return self.hashes.get(key, {}).get(field)
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def expire(self, key, ttl):
+        return True
+
+    def exists(self, key):
+        return int(key in self.hashes)
+
+    def delete(self, *keys):
+        for key in keys:
+            self.hashes.pop(key, None)
+
+    def hdel(self, key, field):
+        self.hashes.get(key, {}).pop(field, None)
+
+    def zadd(self, key, mapping):
+        self.hashes.setdefault(key, {}).update(mapping)
+
+    def zrem(self, key, member):
+        self.hdel(key, member)
+
+    def zrangebyscore(self, key, low, high, start=0, num=None):
+        members = sorted((score, member) for member, score in self.hashes.get(key, {}).items() if score <= high)
+        return [member for _, member in members][start : None if num is None else start + num]
+
+
+class _MultipartClient:
+    def __init__(self):
+        self.parts: dict[int, bytes] = {}
+        self.completed: dict[str, bytes] = {}
+        self.aborted: list[str] = []
+
+    def bucket_exists(self, bucket):
+        return True
+
+    def _create_multipart_upload(self, bucket, object_key, headers):
+        return "mp-1"
+
+    def _upload_part(self, bucket, object_key, data, headers, upload_id, part_number):
+        self.parts[part_number] = data
+        return f"etag-{part_number}"
+
+    def _complete_multipart_upload(self, bucket, object_key, upload_id, parts):
+        self.completed[object_key] = b"".join(self.parts[p.part_number] for p in parts)
+
+    def _abort_multipart_upload(self, bucket, object_key, upload_id):
+        self.aborted.append(object_key)
+
+
+def test_resumable_upload_accepts_out_of_order_chunks(monkeypatch):
+    from pipeline_service.uploads import ChunkedUploader, UploadSessionStore
+
+    minio = _MultipartClient()
+    uploader = ChunkedUploader(minio, UploadSessionStore(_FakeRedis(), 60), "qadata", 4, 1024)
+    monkeypatch.setattr("pipeline_service.app.get_minio_client", lambda: minio)
+    monkeypatch.setattr("pipeline_service.app.get_chunked_uploader", lambda: uploader)
+    client = TestClient(create_app())
+
+    created = client.post("/api/v1/pipeline/uploads", json={"filename": "talk.mp4", "size_bytes": 10})
+    assert created.status_code == 200, created.text
+    session = created.json()
+    assert session["total_chunks"] == 3
+    upload_url = f"/api/v1/pipeline/uploads/{session['upload_id']}"
+
+    assert client.put(upload_url, params={"offset": 8}, content=b"ij").status_code == 200
+    assert client.put(upload_url, params={"offset": 3}, content=b"defg").status_code == 400
+    assert client.put(upload_url, params={"offset": 0}, content=b"abc").status_code == 400
+    # Oversized bodies are refused from Content-Length, or while streaming when it is absent.
+    assert client.put(upload_url, params={"offset": 0}, content=b"x" * 4096).status_code == 413
+    streamed = client.put(upload_url, params={"offset": 0}, content=iter([b"ab", b"cd", b"ef"]))
+    assert streamed.status_code == 413
+    assert client.put("/api/v1/pipeline/uploads/missing", params={"offset": 0}, content=b"abcd").status_code == 404
+    assert client.put(upload_url, params={"offset": 0}, content=b"abcd").status_code == 200
+
+    status = client.get(upload_url).json()
+    assert status["received_bytes"] == 6
+    assert status["missing_offsets"] == [4]
+    assert client.post(upload_url + "/complete").status_code == 409
+
+    assert client.put(upload_url, params={"offset": 4}, content=b"efgh").status_code == 200
+    done = client.post(upload_url + "/complete")
+    assert done.status_code == 200, done.text
+    assert done.json()["object_key"] == session["object_key"]
+    assert minio.completed[session["object_key"]] == b"abcdefghij"
+    assert client.get(upload_url).status_code == 404
+
+
+def test_expired_sessions_abort_their_multipart_uploads(monkeypatch):
+    from pipeline_service import uploads
+    from pipeline_service.uploads import ChunkedUploader, UploadSessionStore
+
+    minio = _MultipartClient()
+    fake_redis = _FakeRedis()
+    uploader = ChunkedUploader(minio, UploadSessionStore(fake_redis, 60), "qadata", 4, 1024)
+    stale = uploader.create("old.mp4", 10)
+    done = uploader.create("done.mp4", 4)
+    uploader.put_chunk(done.upload_id, 0, b"abcd")
+    uploader.complete(done.upload_id)
+
+    clock = uploads.time.time()
+    monkeypatch.setattr(uploads.time, "time", lambda: clock + 120)
+    assert uploader.sweep_expired() == 0  # Redis still holds the session
+    fake_redis.delete(f"pipeline:upload:{stale.upload_id}")  # the TTL fires
+    monkeypatch.setattr(uploads.time, "time", lambda: clock + 240)
+
+    uploader.create("new.mp4", 10)
+
+    assert minio.aborted == [stale.object_key]
+    assert uploader.sweep_expired() == 0
+
+
+def test_recommend_sends_conversion_with_the_request_priority(monkeypatch):
+    sent: list[dict] = []
+
+    class _Signature:
+        def __init__(self, name, **options):
+            sent.append({"name": name, **options})
+
+        def __or__(self, other):
+            return self
+
+        def apply_async(self):
+            return SimpleNamespace(id="pipe-1")
+
+    monkeypatch.setattr("pipeline_service.app.pipeline_celery.signature", _Signature)
+    client = TestClient(create_app())
+    files = [{"source_format": "docx", "object_key": "uploads/a.docx"}]
+
+    for priority, expected in (("high", 1), ("low", 7), ("urgent", 4)):
+        sent.clear()
+        resp = client.post("/api/v1/pipeline/recommend", json={"files": files, "priority": priority, "async_mode": True})
+        assert resp.status_code == 200, resp.text
+        assert sent[0]["name"] == "conversion.handle_batch" and sent[0]["priority"] == expected
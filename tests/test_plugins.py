@@ -4,12 +4,21 @@ from __future__ import annotations
 
 from pathlib import Path
 
+import json
+import zipfile
+from types import SimpleNamespace
+
 import pytest
 import yaml
 
+from rag_converter.config import Settings, VideoEncodeSettings
 from rag_converter.plugins.base import ConversionInput, ConversionPlugin, ConversionResult
 from rag_converter.plugins.builtin.svg_to_png import SvgToPngPlugin
 from rag_converter.plugins.builtin.docx_to_pdf import DocxToPdfPlugin
+from rag_converter.plugins.builtin.docx_to_md import DocxToMarkdownPlugin
+from rag_converter.plugins.builtin.pdf_to_md import PdfToMarkdownPlugin
+from rag_converter.plugins.builtin.pptx_to_md import PptxToMarkdownPlugin
+from rag_converter.plugins.builtin.video_to_mp4 import MkvToMp4Plugin
 from rag_converter.plugins.registry import (
     PluginRegistry,
     load_plugins,
@@ -84,13 +93,13 @@ def test_svg_to_png_plugin_converts_image(tmp_path, monkeypatch):
     input_file.write_text(source_svg.read_text(encoding="utf-8"), encoding="utf-8")
     output_file = input_file.with_suffix(".png")
 
-    def fake_run(cmd, check, stdout, stderr):  # pragma: no cover - patched behavior
+    def fake_run(cmd, plugin=None):  # pragma: no cover - patched behavior
         assert cmd[0] == "inkscape"
         assert cmd[1] == str(input_file)
         assert f"--export-filename={output_file}" in cmd
         output_file.write_bytes(b"fake-png-bytes")
 
-    monkeypatch.setattr("rag_converter.plugins.builtin.svg_to_png.subprocess.run", fake_run)
+    monkeypatch.setattr("rag_converter.plugins.builtin.svg_to_png.run_command", fake_run)
 
     plugin = SvgToPngPlugin()
     result = plugin.convert(
@@ -109,12 +118,12 @@ def test_docx_to_pdf_plugin_invokes_soffice(tmp_path, monkeypatch):
     input_file = tmp_path / "sample.docx"
     input_file.write_bytes(b"fake-docx")
 
-    def fake_run(cmd, check, stdout, stderr):  # pragma: no cover - patched behavior
+    def fake_run(cmd, plugin=None):  # pragma: no cover - patched behavior
         outdir = Path(cmd[cmd.index("--outdir") + 1])
         src = Path(cmd[-1])
         (outdir / (src.stem + ".pdf")).write_bytes(b"pdf")
 
-    monkeypatch.setattr("rag_converter.plugins.builtin.docx_to_pdf.subprocess.run", fake_run)
+    monkeypatch.setattr("rag_converter.plugins.builtin.docx_to_pdf.run_command", fake_run)
 
     plugin = DocxToPdfPlugin()
     result = plugin.convert(
@@ -127,4 +136,233 @@ def test_docx_to_pdf_plugin_invokes_soffice(tmp_path, monkeypatch):
 
     assert result.output_path == input_file.with_suffix(".pdf")
     assert Path(result.output_path).exists()
-    assert result.metadata == {"note": "Converted via LibreOffice soffice"}
\ No newline at end of file
+    assert result.metadata == {"note": "Converted via LibreOffice soffice"}
+
+
+def _write_text_pdf(path: Path, page_texts: list[str]) -> None:
+    """Hand-assemble a minimal PDF with one Helvetica text line per page."""
+
+    _write_pdf(path, [f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET" for text in page_texts])
+
+
+def _write_pdf(path: Path, page_streams: list[str]) -> None:
+    """Hand-assemble a minimal PDF from one content stream per page (font ``/F1`` is Helvetica)."""
+
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", b"", b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for content in page_streams:
+        stream = content.encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (len(objects),)
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), len(kids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    path.write_bytes(bytes(out))
+
+
+@pytest.mark.parametrize("inline_threshold", [100, 0])
+def test_pdf_to_md_plugin_stitches_pages_in_order(tmp_path, monkeypatch, inline_threshold):
+    source = tmp_path / "report.pdf"
+    _write_text_pdf(source, [f"Page number {idx}" for idx in range(1, 6)])
+    monkeypatch.setattr(PdfToMarkdownPlugin, "inline_page_threshold", inline_threshold)
+    monkeypatch.setattr(PdfToMarkdownPlugin, "min_pages_per_chunk", 2)
+    monkeypatch.setattr(PdfToMarkdownPlugin, "max_workers", 2)
+
+    result = PdfToMarkdownPlugin().convert(
+        ConversionInput(source_format="pdf", target_format="md", input_path=source, metadata={"page_limit": 4})
+    )
+
+    assert result.output_path == source.with_suffix(".md")
+    assert result.output_path.read_text(encoding="utf-8") == "\n\n".join(
+        f"Page number {idx}" for idx in range(1, 5)
+    )
+    assert result.perf["pages"] == 4
+    assert result.perf["engine"] == ("pypdf-inline" if inline_threshold else "pypdf-pool")
+
+
+def test_pdf_to_md_plugin_keeps_headings_and_paragraphs(tmp_path):
+    source = tmp_path / "layout.pdf"
+    _write_pdf(
+        source,
+        [
+            "BT /F1 24 Tf 72 720 Td (Annual Report) Tj ET "
+            "BT /F1 12 Tf 72 690 Td (First line of the intro.) Tj 0 -14 Td (Second line of the intro.) Tj "
+            "0 -40 Td (Another paragraph.) Tj ET "
+            "BT /F1 18 Tf 72 580 Td (Results) Tj ET "
+            "BT /F1 12 Tf 72 556 Td (Revenue grew.) Tj ET"
+        ],
+    )
+
+    result = PdfToMarkdownPlugin().convert(ConversionInput(source_format="pdf", target_format="md", input_path=source))
+
+    assert result.output_path.read_text(encoding="utf-8") == (
+        "# Annual Report\n\n"
+        "First line of the intro.\nSecond line of the intro.\n\n"
+        "Another paragraph.\n\n"
+        "## Results\n\n"
+        "Revenue grew."
+    )
+
+
+_W_NS = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+_PPTX_NS = (
+    'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" '
+    'xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"'
+)
+
+
+def _write_zip(path: Path, members: dict[str, str]) -> None:
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+
+
+def test_docx_to_md_plugin_maps_headings_lists_and_tables(tmp_path):
+    styles = (
+        f"<w:styles {_W_NS}>"
+        '<w:style w:type="paragraph" w:styleId="1"><w:name w:val="heading 1"/></w:style>'
+        '<w:style w:type="paragraph" w:styleId="Custom"><w:name w:val="Custom"/><w:basedOn w:val="1"/></w:style>'
+        "</w:styles>"
+    )
+    body = (
+        '<w:p><w:pPr><w:pStyle w:val="1"/></w:pPr><w:r><w:t>Overview</w:t></w:r></w:p>'
+        "<w:p><w:r><w:t xml:space=\"preserve\">Plain </w:t></w:r><w:r><w:t>text</w:t></w:r></w:p>"
+        '<w:p><w:pPr><w:numPr><w:ilvl w:val="1"/><w:numId w:val="3"/></w:numPr></w:pPr><w:r><w:t>nested item</w:t></w:r></w:p>'
+        "<w:tbl><w:tr><w:tc><w:p><w:r><w:t>Name</w:t></w:r></w:p></w:tc><w:tc><w:p><w:r><w:t>Qty</w:t></w:r></w:p></w:tc></w:tr>"
+        "<w:tr><w:tc><w:p><w:r><w:t>apple</w:t></w:r></w:p></w:tc><w:tc><w:p><w:r><w:t>3</w:t></w:r></w:p></w:tc></w:tr></w:tbl>"
+        '<w:p><w:pPr><w:pStyle w:val="Custom"/></w:pPr><w:r><w:br w:type="page"/><w:t>Next page</w:t></w:r></w:p>'
+    )
+    source = tmp_path / "spec.docx"
+    _write_zip(
+        source,
+        {"word/styles.xml": styles, "word/document.xml": f"<w:document {_W_NS}><w:body>{body}</w:body></w:document>"},
+    )
+
+    result = DocxToMarkdownPlugin().convert(ConversionInput(source_format="docx", target_format="md", input_path=source))
+    md = result.output_path.read_text(encoding="utf-8")
+    assert md.split("\n\n") == [
+        "# Overview",
+        "Plain text",
+        "  - nested item",
+        "| Name   | Qty   |\n|--------|-------|\n| apple  | 3     |",
+        "# Next page",
+    ]
+
+    limited = DocxToMarkdownPlugin().convert(
+        ConversionInput(source_format="docx", target_format="md", input_path=source, metadata={"page_limit": 1})
+    )
+    assert "Next page" not in limited.output_path.read_text(encoding="utf-8")
+
+
+def test_pptx_to_md_plugin_emits_block_per_slide_in_presentation_order(tmp_path):
+    def slide(title: str, body: str) -> str:
+        return (
+            f"<p:sld {_PPTX_NS}><p:cSld><p:spTree>"
+            '<p:sp><p:nvSpPr><p:cNvPr id="2" name="t"/><p:cNvSpPr/><p:nvPr><p:ph type="title"/></p:nvPr></p:nvSpPr>'
+            f"<p:txBody><a:p><a:r><a:t>{title}</a:t></a:r></a:p></p:txBody></p:sp>"
+            '<p:sp><p:nvSpPr><p:cNvPr id="3" name="b"/><p:cNvSpPr/><p:nvPr><p:ph idx="1"/></p:nvPr></p:nvSpPr>'
+            f'<p:txBody><a:p><a:r><a:t>{body}</a:t></a:r></a:p><a:p><a:pPr lvl="1"/><a:r><a:t>detail</a:t></a:r></a:p>'
+            "</p:txBody></p:sp></p:spTree></p:cSld></p:sld>"
+        )
+
+    rels = "".join(
+        f'<Relationship Id="rId{idx}" Type="slide" Target="slides/slide{idx}.xml"/>' for idx in (1, 2)
+    )
+    source = tmp_path / "deck.pptx"
+    _write_zip(
+        source,
+        {
+            # Presentation order deliberately differs from the part numbering.
+            "ppt/presentation.xml": (
+                f'<p:presentation {_PPTX_NS}><p:sldIdLst><p:sldId id="256" r:id="rId2"/>'
+                '<p:sldId id="257" r:id="rId1"/></p:sldIdLst></p:presentation>'
+            ),
+            "ppt/_rels/presentation.xml.rels": (
+                '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                f"{rels}</Relationships>"
+            ),
+            "ppt/slides/slide1.xml": slide("Second", "beta"),
+            "ppt/slides/slide2.xml": slide("First", "alpha"),
+        },
+    )
+
+    result = PptxToMarkdownPlugin().convert(ConversionInput(source_format="pptx", target_format="md", input_path=source))
+    assert result.output_path.read_text(encoding="utf-8") == (
+        "## Slide 1: First\n\n- alpha\n  - detail\n\n## Slide 2: Second\n\n- beta\n  - detail"
+    )
+
+
+def _fake_ffmpeg(duration: float, calls: list[list[str]]):
+    def fake_run(cmd, plugin=None):  # pragma: no cover - patched behavior
+        calls.append(cmd)
+        if cmd[0] == "ffprobe":
+            info = {"format": {"duration": str(duration)}, "streams": [{"codec_type": "video"}, {"codec_type": "audio"}]}
+            return SimpleNamespace(stdout=json.dumps(info).encode())
+        if "segment" in cmd:
+            pattern = cmd[-1]
+            for idx in range(3):
+                Path(pattern % idx).write_bytes(b"seg")
+        else:
+            Path(cmd[-1]).write_bytes(b"out")
+        return SimpleNamespace(stdout=b"")
+
+    return fake_run
+
+
+def _video_settings(monkeypatch, **overrides):
+    settings = Settings(video=VideoEncodeSettings(**overrides))
+    monkeypatch.setattr("rag_converter.plugins.builtin.video_to_mp4.get_settings", lambda: settings)
+
+
+def test_video_to_mp4_encodes_long_inputs_in_parallel_segments(tmp_path, monkeypatch):
+    source = tmp_path / "lecture.mkv"
+    source.write_bytes(b"video")
+    calls: list[list[str]] = []
+    monkeypatch.setattr("rag_converter.plugins.builtin.video_to_mp4.run_command", _fake_ffmpeg(7200, calls))
+    _video_settings(monkeypatch, max_segments=3, max_parallel=3)
+
+    result = MkvToMp4Plugin().convert(ConversionInput(source_format="mkv", target_format="mp4", input_path=source))
+
+    assert result.output_path == source.with_suffix(".mp4")
+    assert result.metadata == {"note": "Converted mkv->mp4 via FFmpeg (3 parallel segments)"}
+    split = calls[1]
+    assert split[split.index("-segment_time") + 1] == "2400"
+    assert split[split.index("-c") + 1] == "copy"
+    encodes = [cmd for cmd in calls[2:-1] if "-an" in cmd]
+    assert len(encodes) == 3
+    assert any("-vn" in cmd for cmd in calls[2:-1])
+    concat = calls[-1]
+    assert concat[concat.index("-f") + 1] == "concat"
+    assert concat[concat.index("-c") + 1] == "copy"
+    assert concat[-1] == str(result.output_path)
+
+
+def test_video_to_mp4_keeps_single_pass_for_short_inputs(tmp_path, monkeypatch):
+    source = tmp_path / "clip.mkv"
+    source.write_bytes(b"video")
+    calls: list[list[str]] = []
+    monkeypatch.setattr("rag_converter.plugins.builtin.video_to_mp4.run_command", _fake_ffmpeg(7200, calls))
+    _video_settings(monkeypatch, min_duration_sec=600)
+
+    result = MkvToMp4Plugin().convert(
+        ConversionInput(
+            source_format="mkv", target_format="mp4", input_path=source, metadata={"duration_seconds": 30}
+        )
+    )
+
+    assert result.metadata == {"note": "Converted mkv->mp4 via FFmpeg"}
+    assert [cmd[0] for cmd in calls] == ["ffprobe", "ffmpeg"]
+    assert calls[-1][calls[-1].index("-t") + 1] == "30"
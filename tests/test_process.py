@@ -0,0 +1,110 @@
+"""Tests for the external tool supervisor (timeouts, limits, cancellation)."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from rag_converter.config import ProcessSupervisorSettings, Settings
+from rag_converter.plugins import process
+
+
+def _alive(pid: int) -> bool:
+    try:
+        stat = Path(f"/proc/{pid}/stat").read_text()
+    except FileNotFoundError:
+        return False
+    return stat.rsplit(")", 1)[1].split()[0] != "Z"
+
+
+@pytest.fixture(autouse=True)
+def _isolated(tmp_path, monkeypatch):
+    monkeypatch.setattr(process, "PROCS_DIR", tmp_path / "procs")
+    settings = Settings(processes=ProcessSupervisorSettings(kill_grace_sec=0.2, memory_mb={"mem-test": 256}))
+    monkeypatch.setattr(process, "get_settings", lambda: settings)
+
+
+def test_run_command_returns_output_and_raises_on_failure():
+    result = process.run_command(["sh", "-c", "echo hello"])
+    assert result.stdout == b"hello\n"
+
+    with pytest.raises(subprocess.CalledProcessError) as exc:
+        process.run_command(["sh", "-c", "echo oops >&2; exit 3"])
+    assert exc.value.returncode == 3
+    assert exc.value.stderr == b"oops\n"
+
+
+def test_run_command_timeout_kills_the_whole_process_group(tmp_path):
+    pid_file = tmp_path / "child.pid"
+    started = time.monotonic()
+    with pytest.raises(subprocess.TimeoutExpired):
+        process.run_command(["sh", "-c", f"sleep 30 & echo $! > {pid_file}; wait"], timeout=0.5)
+    assert time.monotonic() - started < 5
+
+    grandchild = int(pid_file.read_text())
+    deadline = time.monotonic() + 2
+    while _alive(grandchild) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not _alive(grandchild)
+
+
+def test_run_command_applies_memory_limit():
+    cmd = [sys.executable, "-c", "bytearray(1024 * 1024 * 1024)"]
+    with pytest.raises(subprocess.CalledProcessError) as exc:
+        process.run_command(cmd, plugin="mem-test")
+    assert b"MemoryError" in exc.value.stderr
+
+
+def test_cancel_task_kills_running_tools_and_blocks_new_ones():
+    outcome: dict[str, BaseException] = {}
+
+    def _worker():
+        with process.task_scope("task-42"):
+            try:
+                process.run_command(["sleep", "30"])
+            except BaseException as exc:  # noqa: BLE001 - recorded for assertions
+                outcome["error"] = exc
+            try:
+                process.run_command(["true"])
+            except BaseException as exc:  # noqa: BLE001 - recorded for assertions
+                outcome["next"] = exc
+
+    thread = threading.Thread(target=_worker)
+    thread.start()
+    task_dir = process.PROCS_DIR / "task-42"
+    deadline = time.monotonic() + 5
+    while not any(task_dir.glob("[0-9]*")) and time.monotonic() < deadline:
+        time.sleep(0.02)
+
+    assert process.cancel_task("task-42") == 1
+    thread.join(timeout=5)
+    assert isinstance(outcome["error"], process.ProcessCancelled)
+    assert isinstance(outcome["next"], process.ProcessCancelled)
+
+
+def test_cancel_markers_do_not_outlive_the_task():
+    # Workers not running the task ignore the broadcast.
+    assert process.cancel_task("elsewhere") == 0
+    assert not (process.PROCS_DIR / "elsewhere").exists()
+
+    with process.task_scope("task-7"):
+        with process.task_scope("task-7"):  # archive sub-task sharing the id
+            process.cancel_task("task-7")
+        assert process.is_cancelled("task-7")
+    assert not process.is_cancelled("task-7")
+    assert not (process.PROCS_DIR / "task-7").exists()
+
+
+def test_memory_limit_is_applied_from_a_thread():
+    from concurrent.futures import ThreadPoolExecutor
+
+    cmd = [sys.executable, "-c", "bytearray(1024 * 1024 * 1024)"]
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        future = pool.submit(process.run_command, cmd, plugin="mem-test")
+        with pytest.raises(subprocess.CalledProcessError):
+            future.result()
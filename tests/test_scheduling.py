@@ -0,0 +1,77 @@
+"""Tests for conversion duration prediction and SJF priorities."""
+
+from __future__ import annotations
+
+import pytest
+
+from rag_converter.config import CeleryQueueSettings, SchedulingSettings, Settings
+from rag_converter.scheduling import DurationModel, DurationPredictor, scheduling_priority
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.hashes: dict[str, dict[str, float]] = {}
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def hincrbyfloat(self, key, field, amount):
+        bucket = self.hashes.setdefault(key, {})
+        bucket[field] = bucket.get(field, 0.0) + amount
+
+    def execute(self):
+        return []
+
+    def hmget(self, key, fields):
+        bucket = self.hashes.get(key, {})
+        return [bucket.get(field) for field in fields]
+
+
+def _settings(**scheduling) -> Settings:
+    return Settings(celery=CeleryQueueSettings(scheduling=SchedulingSettings(**scheduling)))
+
+
+def test_duration_model_recovers_linear_relation():
+    model = DurationModel()
+    for size_mb, pages in [(1, 2), (5, 10), (10, 3), (20, 40), (3, 7)]:
+        model.update((1.0, size_mb, pages), 2.0 + 0.5 * size_mb + 0.25 * pages)
+
+    assert model.samples == 5
+    assert model.predict((1.0, 8, 12), ridge=0.0) == pytest.approx(9.0, rel=1e-6)
+
+
+def test_predictor_uses_prior_until_enough_samples():
+    redis_stub = _FakeRedis()
+    predictor = DurationPredictor(_settings(min_samples=3, prior_base_sec=1, prior_sec_per_mb=2), client=redis_stub)
+
+    assert predictor.estimate("docx", "pdf", 4, None) == 9.0
+
+    for size in (1, 2, 3):
+        predictor.observe("DOCX", "pdf", size, None, 10.0 * size)
+    assert set(redis_stub.hashes) == {"conversion:duration:docx:pdf"}
+    assert predictor.estimate("docx", "pdf", 4, None) == pytest.approx(40.0, rel=1e-2)
+    # Other pairs are unaffected.
+    assert predictor.estimate("svg", "png", 4, None) == 9.0
+
+
+def test_predictor_imputes_pages_from_size_and_caps_by_page_limit():
+    predictor = DurationPredictor(_settings(min_samples=3), client=_FakeRedis())
+    for size, pages in [(1, 10), (2, 20), (4, 40), (8, 80)]:
+        predictor.observe("pdf", "md", size, pages, 1.0 + 0.5 * pages)
+
+    assert predictor.load("pdf", "md").impute_pages(3) == pytest.approx(30.0, rel=1e-6)
+    assert predictor.estimate("pdf", "md", 3) == pytest.approx(16.0, rel=1e-2)
+    assert predictor.estimate("pdf", "md", 3, page_limit=5) == pytest.approx(3.5, rel=1e-1)
+
+
+def test_scheduling_priority_orders_by_class_then_estimate():
+    settings = SchedulingSettings(short_job_sec=30, long_job_sec=300)
+    ordered = [
+        scheduling_priority("high", 5, settings),
+        scheduling_priority("high", 900, settings),
+        scheduling_priority("normal", 5, settings),
+        scheduling_priority("normal", None, settings),
+        scheduling_priority("normal", 900, settings),
+        scheduling_priority("low", 5, settings),
+    ]
+    assert ordered == [0, 2, 3, 4, 5, 6]
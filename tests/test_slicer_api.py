@@ -1,6 +1,10 @@
+import asyncio
+import json
+
 from fastapi.testclient import TestClient
 
 from slicer_service.app import create_app
+from slicer_service.config import RequestLimitSettings, Settings, settings_dependency
 
 
 def test_probe_profile_endpoint():
@@ -34,3 +38,158 @@ def test_recommend_strategy_endpoint_custom_delimiter():
     assert rec["mode"] == "direct_delimiter"
     assert rec["mode_id"] == 1
     assert rec.get("mode_desc")
+
+
+def test_slice_endpoint_returns_chunks_with_offsets():
+    app = create_app()
+    client = TestClient(app)
+    text = "# Title\nFirst sentence. Second sentence.\n\n## Sub\nMore text here."
+    resp = client.post(
+        "/api/v1/slice",
+        json={"text": text, "mode": "hierarchical_heading", "params": {"target_length": 40}},
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["mode"] == "hierarchical_heading"
+    assert data["total"] == len(data["chunks"]) > 0
+    for chunk in data["chunks"]:
+        assert text[chunk["start"] : chunk["end"]] == chunk["text"]
+    assert data["chunks"][-1]["section_path"] == ["Title", "Sub"]
+
+    bad = client.post("/api/v1/slice", json={"text": text, "mode": "unknown"})
+    assert bad.status_code == 400
+
+
+def test_recommend_batch_endpoint_keeps_order():
+    app = create_app()
+    client = TestClient(app)
+    payload = {
+        "documents": [
+            {"samples": ["a---b---c---d---e---f"]},
+            {"samples": ["x,y,z,w\n1,2,3,4"], "source_format": "csv"},
+        ],
+        "custom": {"enable": True, "delimiters": ["---"], "min_segments": 2},
+    }
+    resp = client.post("/api/v1/probe/recommend_batch", json=payload)
+    assert resp.status_code == 200
+    results = resp.json()["results"]
+    assert [item["index"] for item in results] == [0, 1]
+    assert results[0]["recommendation"]["strategy_id"] == "custom_delimiter_split"
+    assert results[1]["recommendation"]["strategy_id"] == "table_batch"
+
+
+def test_probe_cache_io_runs_off_the_event_loop(monkeypatch):
+    calls: list[tuple[str, bool]] = []
+
+    def _on_loop() -> bool:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        return True
+
+    class _Cache:
+        def get(self, key):
+            calls.append(("get", _on_loop()))
+            return None
+
+        def set(self, key, value):
+            calls.append(("set", _on_loop()))
+
+    monkeypatch.setattr("slicer_service.api.routes.get_cache", lambda: _Cache())
+    client = TestClient(create_app())
+
+    assert client.post("/api/v1/probe/profile", json={"samples": ["# Title\nParagraph."]}).status_code == 200
+    assert calls == [("get", False), ("set", False)]
+
+
+def test_oversized_requests_are_rejected_with_413():
+    app = create_app()
+    limits = RequestLimitSettings(
+        max_samples=2,
+        max_sample_chars=10,
+        max_slice_chars=10,
+        max_batch_documents=2,
+        max_batch_chars=15,
+        max_stream_bytes=10,
+    )
+    app.dependency_overrides[settings_dependency] = lambda: Settings(limits=limits)
+    client = TestClient(app)
+
+    too_many = client.post("/api/v1/probe/profile", json={"samples": ["a", "b", "c"]})
+    too_long = client.post("/api/v1/probe/recommend_strategy", json={"samples": ["x" * 11]})
+    slice_resp = client.post("/api/v1/slice", json={"text": "y" * 11, "mode": "semantic_sentence"})
+    batch = client.post("/api/v1/probe/recommend_batch", json={"documents": [{"samples": ["a"]}] * 3})
+    batch_doc = client.post("/api/v1/probe/recommend_batch", json={"documents": [{"samples": ["x" * 11]}]})
+    batch_chars = client.post("/api/v1/probe/recommend_batch", json={"documents": [{"samples": ["x" * 8]}] * 2})
+    stream = client.post("/api/v1/probe/profile_stream", content=b"z" * 11)
+
+    rejected = (too_many, too_long, slice_resp, batch, batch_doc, batch_chars, stream)
+    assert [r.status_code for r in rejected] == [413] * 7
+    assert client.post("/api/v1/probe/profile", json={"samples": ["a", "b"]}).status_code == 200
+
+
+def test_profile_stream_endpoint_profiles_raw_body():
+    client = TestClient(create_app())
+    text = "# Title\n\n- a\n- b\n\nParagraph text, with words.\n"
+
+    def _body():
+        for pos in range(0, len(text.encode()), 7):
+            yield text.encode()[pos : pos + 7]
+
+    resp = client.post("/api/v1/probe/profile_stream", content=_body(), headers={"Content-Type": "text/plain"})
+    assert resp.status_code == 200
+    profile = resp.json()["profile"]
+    expected = client.post("/api/v1/probe/profile", json={"samples": [text]}).json()["profile"]
+    assert profile == {**expected, "samples": []}
+    assert client.post("/api/v1/probe/profile_stream", content=b"").status_code == 400
+
+
+def test_slice_table_endpoint_streams_ndjson_batches():
+    client = TestClient(create_app())
+    body = ("a,b\n" + "".join(f"{i},{i * 2}\n" for i in range(50))).encode()
+
+    resp = client.post("/api/v1/slice/table?source_format=csv&max_rows=20&target_length=10000", content=body)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    batches = [json.loads(line) for line in resp.text.splitlines()]
+    assert [(b["row_start"], b["row_end"]) for b in batches] == [(2, 21), (22, 41), (42, 51)]
+    assert all(b["text"].startswith("| a | b |\n| --- | --- |\n") for b in batches)
+
+    assert client.post("/api/v1/slice/table?source_format=xlsx", content=b"not a zip").status_code == 400
+    assert client.post("/api/v1/slice/table?source_format=pdf", content=body).status_code == 400
+
+
+def test_slice_endpoint_drops_near_duplicate_chunks():
+    client = TestClient(create_app())
+    footer = "Confidential - do not distribute outside the company. Page {n}"
+    text = "\n\n".join(["Intro to the system.", footer.format(n=1), "Deployment steps.", footer.format(n=2)])
+    payload = {
+        "text": text,
+        "mode": "direct_delimiter",
+        "params": {"min_segment_len": 1},
+        "dedup": {"action": "drop", "doc_id": "doc"},
+    }
+
+    data = client.post("/api/v1/slice", json=payload).json()
+    assert [c["id"] for c in data["chunks"]] == ["doc#0", "doc#1", "doc#2"]
+    assert data["total"] == 3
+    assert data["dedup"]["dropped"] == 1
+
+
+def test_slice_diff_endpoint_returns_only_changed_chunks():
+    client = TestClient(create_app())
+    old = "\n\n".join(f"第{n}段的内容保持不变，用于验证增量切分。" for n in range(20))
+    new = old.replace("第7段的内容保持不变", "第7段的内容已经修改")
+    params = {"target_length": 60}
+
+    first = client.post("/api/v1/slice/diff", json={"text": old, "mode": "semantic_sentence", "params": params}).json()
+    payload = {"text": new, "mode": "semantic_sentence", "params": params, "previous_hashes": first["hashes"]}
+    data = client.post("/api/v1/slice/diff", json=payload).json()
+
+    assert [c["text"] for c in data["added"]] == ["第7段的内容已经修改，用于验证增量切分。"]
+    assert len(data["removed"]) == 1 and len(data["unchanged"]) == first["total"] - 1
+    assert data["added"][0]["hash"] in data["hashes"]
+
+    unpinned = client.post("/api/v1/slice/diff", json={"text": new, "previous_hashes": first["hashes"]})
+    assert unpinned.status_code == 400
@@ -0,0 +1,58 @@
+"""Tests for the mmap-backed code_log_block chunker."""
+
+from __future__ import annotations
+
+from slicer_service.blocks import iter_block_spans, map_file, slice_file
+
+_LOG = (
+    b"2024-05-01 10:00:00,001 INFO start\n"
+    b"2024-05-01 10:00:01,002 ERROR failed\n"
+    b"Traceback (most recent call last):\n"
+    b'  File "app.py", line 3, in <module>\n'
+    b"ValueError: boom\n"
+    b"\n\n"
+    b"2024-05-01 10:00:02,003 INFO recovered \xe4\xb8\xad\xe6\x96\x87\n"
+)
+
+
+def _texts(buf, params):
+    return [bytes(buf[start:end]) for start, end in iter_block_spans(buf, params)]
+
+
+def test_blocks_end_at_the_last_boundary_within_budget():
+    texts = _texts(_LOG, {"target_length": 120})
+
+    assert texts == [
+        b"2024-05-01 10:00:00,001 INFO start\n2024-05-01 10:00:01,002 ERROR failed",
+        b'Traceback (most recent call last):\n  File "app.py", line 3, in <module>\nValueError: boom',
+        b"2024-05-01 10:00:02,003 INFO recovered \xe4\xb8\xad\xe6\x96\x87",
+    ]
+    assert all(len(text) <= 120 for text in texts)
+    assert _texts(_LOG, {"target_length": 10_000}) == [_LOG.strip()]
+
+
+def test_long_blocks_split_at_lines_then_characters():
+    code = b"def f():\n" + b"".join(b"    x = %d\n" % i for i in range(20))
+    texts = _texts(code, {"target_length": 40})
+    assert all(len(text) <= 40 for text in texts)
+    assert b"\n".join(texts) == code.strip()
+
+    line = "中" * 30
+    texts = _texts(line.encode(), {"target_length": 20})
+    assert "".join(text.decode() for text in texts) == line
+
+
+def test_slice_file_maps_without_copying(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_bytes(_LOG * 100)
+    with map_file(path) as mapped:
+        expected = list(iter_block_spans(mapped, {"target_length": 500}))
+    blocks = list(slice_file(path, {"target_length": 500}))
+
+    assert [(b.start, b.end) for b in blocks] == expected
+    assert [b.index for b in blocks] == list(range(len(blocks)))
+    assert all(b.end - b.start <= 500 for b in blocks)
+
+    empty = tmp_path / "empty.log"
+    empty.write_bytes(b"")
+    assert list(slice_file(empty)) == []
@@ -0,0 +1,88 @@
+"""Tests for the two-tier probe/recommendation cache."""
+
+from __future__ import annotations
+
+import redis
+
+from slicer_service import cache as cache_mod
+from slicer_service.cache import RecommendationCache, cached_recommendation, fingerprint
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.store: dict[str, str] = {}
+        self.ttls: dict[str, int] = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None):
+        self.store[key] = value
+        self.ttls[key] = ex
+
+
+class _DownRedis:
+    calls = 0
+
+    def get(self, key):
+        self.calls += 1
+        raise redis.ConnectionError("refused")
+
+    set = get
+
+
+def test_fingerprint_normalises_options_but_not_sample_framing():
+    base = fingerprint("recommend", ["ab", "c"], source_format=".PDF", custom_cfg={})
+    assert base == fingerprint("recommend", ["ab", "c"], source_format="pdf", custom_cfg={"enable": False})
+    assert base != fingerprint("recommend", ["a", "bc"], source_format="pdf")
+    assert base != fingerprint("recommend", ["ab", "c"], source_format="pdf", emit_candidates=True)
+    assert base != fingerprint("profile", ["ab", "c"], source_format="pdf")
+
+
+def test_lru_tier_evicts_least_recently_used():
+    cache = RecommendationCache(max_entries=2, ttl_sec=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+
+def test_redis_tier_shares_results_across_processes():
+    remote = _FakeRedis()
+    writer = RecommendationCache(max_entries=8, ttl_sec=120, redis_client=remote)
+    writer.set("k", {"strategy_id": "table_batch"})
+    assert remote.ttls == {"slicer:probe:k": 120}
+
+    reader = RecommendationCache(max_entries=8, ttl_sec=120, redis_client=remote)
+    assert reader.get("k") == {"strategy_id": "table_batch"}
+    remote.store.clear()
+    assert reader.get("k") == {"strategy_id": "table_batch"}  # now served by the local LRU
+
+
+def test_redis_outage_degrades_to_lru_with_backoff():
+    remote = _DownRedis()
+    cache = RecommendationCache(max_entries=8, ttl_sec=60, redis_client=remote)
+    assert cache.get("x") is None
+    cache.set("x", 1)
+    assert cache.get("y") is None
+    assert cache.get("x") == 1
+    assert remote.calls == 1
+
+
+def test_cached_recommendation_computes_once(monkeypatch):
+    local = RecommendationCache(max_entries=8, ttl_sec=60)
+    monkeypatch.setattr(cache_mod, "get_cache", lambda: local)
+    calls: list[int] = []
+    original = cache_mod.recommend_strategy
+    monkeypatch.setattr(cache_mod, "recommend_strategy", lambda *a, **kw: calls.append(1) or original(*a, **kw))
+
+    samples = ["# Title\n- a\n- b\nParagraph."]
+    first = cached_recommendation(samples, source_format="md", emit_candidates=True)
+    second = cached_recommendation(list(samples), source_format="md", emit_candidates=True)
+
+    assert second is first
+    assert calls == [1]
+    cached_recommendation(samples, source_format="md", emit_candidates=False)
+    assert calls == [1, 1]
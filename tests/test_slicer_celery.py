@@ -42,3 +42,61 @@ def test_probe_recommend_strategy_task_auto_profile():
     assert result["mode"] in {"direct_delimiter", "semantic_sentence", "hierarchical_heading"}
     assert result.get("mode_id") in {1, 2, 3}
     assert "params" in result
+
+
+def test_slice_chunk_text_task_auto_plan():
+    payload = {"text": "First sentence. Second sentence. Third one!"}
+    result = celery_app.tasks["slice.chunk_text"].apply(args=(payload,)).get()
+    assert result["mode"] in {"direct_delimiter", "semantic_sentence", "hierarchical_heading"}
+    assert result["total"] == len(result["chunks"]) >= 1
+    assert result["chunks"][0]["start"] == 0
+
+
+def test_probe_recommend_batch_task():
+    payload = {"documents": [{"samples": ["# Title\nText"]}, {"samples": []}]}
+    result = celery_app.tasks["probe.recommend_batch"].apply(args=(payload,)).get()
+    assert [item["index"] for item in result] == [0, 1]
+    assert result[0]["recommendation"]["mode"] in {"direct_delimiter", "semantic_sentence", "hierarchical_heading"}
+    assert result[1]["error"]
+
+
+def test_slice_code_log_blocks_task(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_bytes(b"2024-05-01 10:00:00 INFO a\n\n2024-05-01 10:00:01 INFO b\n")
+    payload = {"path": str(path), "params": {"target_length": 30}}
+    result = celery_app.tasks["slice.code_log_blocks"].apply(args=(payload,)).get()
+    assert result["total"] == 2
+    data = path.read_bytes()
+    assert [data[start:end] for start, end in result["spans"]] == [b"2024-05-01 10:00:00 INFO a", b"2024-05-01 10:00:01 INFO b"]
+    assert result["next_offset"] is None
+
+
+def test_slice_code_log_blocks_task_pages_through_large_files(tmp_path):
+    path = tmp_path / "big.log"
+    path.write_bytes(b"".join(b"2024-05-01 10:00:%02d INFO line %d\n" % (i % 60, i) for i in range(50)))
+    params = {"target_length": 40}
+    task = celery_app.tasks["slice.code_log_blocks"]
+    whole = task.apply(args=({"path": str(path), "params": params, "max_spans": 1000},)).get()
+
+    spans, offset, pages = [], 0, 0
+    while offset is not None:
+        page = task.apply(args=({"path": str(path), "params": params, "offset": offset, "max_spans": 7},)).get()
+        assert page["total"] <= 7
+        spans += page["spans"]
+        offset = page["next_offset"]
+        pages += 1
+    assert pages == 8
+    assert spans == whole["spans"]
+
+
+def test_slice_diff_task_against_previous_text():
+    old = "第一段。\n\n第二段。\n\n第三段。"
+    payload = {
+        "text": old.replace("第二段", "第二段已修改"),
+        "previous_text": old,
+        "mode": "semantic_sentence",
+        "params": {"target_length": 8},
+    }
+    result = celery_app.tasks["slice.diff"].apply(args=(payload,)).get()
+    assert [c["text"] for c in result["added"]] == ["第二段已修改。"]
+    assert len(result["unchanged"]) == 2 and len(result["removed"]) == 1
@@ -0,0 +1,75 @@
+"""Tests for the slicer chunk execution engine."""
+
+from __future__ import annotations
+
+import pytest
+
+from slicer_service.chunker import iter_chunks, iter_sections, resolve_plan
+
+_DOC = (
+    "前言说明。\n\n"
+    "# 总则\n本规范适用于知识库。它定义了切分规则！\n\n"
+    "## 1.1 术语\n术语一；术语二。\n1. 列表项。\n"
+    "第二节 细则\n细则内容。The end. Done!\n"
+)
+
+
+@pytest.mark.parametrize(
+    "mode,params",
+    [
+        ("direct_delimiter", {"delimiters": ["\\n\\n"], "min_segment_len": 3, "max_segment_len": 12, "overlap_ratio": 0.25}),
+        ("semantic_sentence", {"target_length": 20, "overlap_ratio": 0.3}),
+        ("hierarchical_heading", {"target_length": 20, "overlap_ratio": 0.0}),
+    ],
+)
+def test_chunks_carry_exact_offsets(mode, params):
+    chunks = list(iter_chunks(_DOC, mode, params))
+
+    assert chunks
+    assert [c.index for c in chunks] == list(range(len(chunks)))
+    for chunk in chunks:
+        assert _DOC[chunk.start : chunk.end] == chunk.text
+        assert chunk.text == chunk.text.strip()
+    # Every non-whitespace character is covered by some chunk.
+    covered = {i for c in chunks for i in range(c.start, c.end)}
+    assert all(i in covered for i, ch in enumerate(_DOC) if not ch.isspace())
+
+
+def test_semantic_mode_packs_sentences_with_overlap():
+    text = "".join(f"第{i}句话。" for i in range(10))  # 5 chars per sentence
+    chunks = list(iter_chunks(text, "semantic_sentence", {"target_length": 15, "overlap_ratio": 0.4}))
+
+    assert [c.text for c in chunks[:2]] == ["第0句话。第1句话。第2句话。", "第2句话。第3句话。第4句话。"]
+    assert all(len(c.text) <= 15 for c in chunks)
+    assert chunks[-1].text.endswith("第9句话。")
+
+
+def test_long_sentence_is_windowed():
+    text = "x" * 50
+    chunks = list(iter_chunks(text, "semantic_sentence", {"target_length": 20, "no_overlap": True}))
+    assert [(c.start, c.end) for c in chunks] == [(0, 20), (20, 40), (40, 50)]
+
+
+def test_direct_mode_merges_short_segments_forward():
+    text = "a---b---cccccccccc---dd"
+    chunks = list(
+        iter_chunks(text, "direct_delimiter", {"delimiters": ["---"], "min_segment_len": 3, "max_segment_len": 100})
+    )
+    assert [c.text for c in chunks] == ["a---b", "cccccccccc", "dd"]
+
+
+def test_sections_track_heading_path():
+    paths = [path for path, _, _ in iter_sections(_DOC)]
+    assert paths == [(), ("总则",), ("总则", "1.1 术语"), ("总则", "第二节 细则")]
+
+
+def test_resolve_plan_uses_recommendation_when_mode_missing():
+    plan = resolve_plan(_DOC * 5)
+    assert plan["mode"] in {"direct_delimiter", "semantic_sentence", "hierarchical_heading"}
+    assert plan["strategy_id"]
+    assert "target_length" in plan["params"]
+
+    with pytest.raises(ValueError):
+        resolve_plan("text", mode="bogus")
+    with pytest.raises(ValueError):
+        list(iter_chunks("a", "direct_delimiter", {"delimiters": ["("]}))
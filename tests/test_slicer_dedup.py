@@ -0,0 +1,108 @@
+"""Tests for MinHash/LSH near-duplicate chunk elimination."""
+
+from __future__ import annotations
+
+import redis
+
+from slicer_service import dedup
+from slicer_service.chunker import slice_text
+from slicer_service.config import Settings
+
+_FOOTER = "本文件仅供内部使用，未经许可不得外传。如有疑问请联系合规部门。第 {n} 页"
+_BODIES = [
+    "第一章介绍系统的总体架构，包括接入层、计算层与存储层的职责划分。",
+    "第二章说明部署流程：准备镜像、配置环境变量并执行滚动发布。",
+    "第三章列出监控指标与告警阈值，例如延迟、错误率与队列长度。",
+]
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.store: dict[str, bytes] = {}
+
+    def mget(self, keys):
+        return [self.store.get(key) for key in keys]
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value if isinstance(value, bytes) else str(value).encode()
+        return True
+
+    def pipeline(self, transaction=False):
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.ops = []
+
+    def set(self, *args, **kwargs):
+        self.ops.append((args, kwargs))
+
+    def execute(self):
+        return [self.client.set(*args, **kwargs) for args, kwargs in self.ops]
+
+
+class _DownRedis:
+    def mget(self, keys):
+        raise redis.ConnectionError("refused")
+
+
+def _document():
+    parts = []
+    for n, body in enumerate(_BODIES, start=1):
+        parts += [body, _FOOTER.format(n=n)]
+    return "\n\n".join(parts)
+
+
+def _chunks(text):
+    params = {"min_segment_len": 1, "max_segment_len": 200}
+    return slice_text(text, "direct_delimiter", params, include_text=False)["chunks"]
+
+
+def test_signatures_estimate_similarity_and_ignore_page_numbers():
+    hasher = dedup.MinHasher()
+    footer = hasher.signature(_FOOTER.format(n=3))
+    assert dedup.similarity(footer, hasher.signature(_FOOTER.format(n=41))) == 1.0
+    assert dedup.similarity(footer, hasher.signature(_BODIES[0])) < 0.2
+    assert hasher.signature("  \n ") is None
+
+
+def test_in_document_duplicates_are_linked_or_dropped():
+    text = _document()
+    linked, stats = dedup.deduplicate(text, _chunks(text), doc_id="doc-1")
+
+    assert [c["duplicate_of"] for c in linked] == [None, None, None, "doc-1#1", None, "doc-1#1"]
+    assert [c["id"] for c in linked][:2] == ["doc-1#0", "doc-1#1"]
+    assert stats == {"checked": 6, "duplicates": 2, "dropped": 0, "knowledge_base": None}
+
+    kept, stats = dedup.deduplicate(text, _chunks(text), doc_id="doc-1", action="drop")
+    assert [c["index"] for c in kept] == [0, 1, 2, 4]
+    assert stats["dropped"] == 2
+
+
+def test_knowledge_base_index_links_across_documents(monkeypatch):
+    fake = _FakeRedis()
+    monkeypatch.setattr(dedup, "_redis_client", lambda url, timeout: fake)
+    text = _document()
+
+    first, _ = dedup.deduplicate(text, _chunks(text), doc_id="doc-1", knowledge_base="kb")
+    again, _ = dedup.deduplicate(text, _chunks(text), doc_id="doc-1", knowledge_base="kb")
+    other_text = _BODIES[2] + "\n\n" + _FOOTER.format(n=9)
+    other, stats = dedup.deduplicate(other_text, _chunks(other_text), doc_id="doc-2", knowledge_base="kb")
+
+    assert [c["duplicate_of"] for c in again] == [c["duplicate_of"] for c in first]
+    assert [c["duplicate_of"] for c in other] == ["doc-1#4", "doc-1#1"]
+    assert stats["knowledge_base"] == "kb"
+
+
+def test_unavailable_redis_falls_back_to_in_document_dedup(monkeypatch):
+    monkeypatch.setattr(dedup, "_redis_client", lambda url, timeout: _DownRedis())
+    monkeypatch.setattr(dedup, "_redis_down_until", 0.0)
+    text = _document()
+
+    chunks, stats = dedup.deduplicate(text, _chunks(text), doc_id="d", knowledge_base="kb", settings=Settings())
+    assert stats["duplicates"] == 2 and stats["knowledge_base"] is None
+    assert dedup._redis_down_until > 0
@@ -0,0 +1,104 @@
+"""Tests for the batch recommendation process pool."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from slicer_service import executor
+from slicer_service.config import ExecutorSettings, Settings
+from slicer_service.recommendation import compile_delimiters, extract_signals_from_samples, recommend_strategy
+
+_DOCS = [
+    {"samples": ["# Title\n- a\n- b\n\nParagraph text."]},
+    {"samples": ["a---b---c---d---e---f"]},
+    {"samples": []},
+    {"samples": ["col1,col2,col3,col4\n1,2,3,4"], "source_format": "csv"},
+    {"samples": ["def foo():\n    return 1;\n", "class Bar:\n    pass"]},
+]
+_CUSTOM = {"enable": True, "delimiters": ["---", "("], "min_segments": 2}
+
+
+@pytest.fixture(autouse=True)
+def _shutdown_pool():
+    yield
+    executor.shutdown_pool()
+
+
+@pytest.mark.parametrize("inline_threshold", [100, 1])
+def test_recommend_batch_matches_single_calls_in_order(inline_threshold):
+    settings = Settings(executor=ExecutorSettings(max_workers=2, inline_threshold=inline_threshold, max_chunk_size=2))
+
+    results = executor.recommend_batch(_DOCS, custom_cfg=_CUSTOM, emit_candidates=True, settings=settings)
+
+    assert [item["index"] for item in results] == list(range(len(_DOCS)))
+    assert results[2]["recommendation"] is None and results[2]["error"]
+    for doc, item in zip(_DOCS, results):
+        if not doc["samples"]:
+            continue
+        expected = recommend_strategy(
+            extract_signals_from_samples(doc["samples"]),
+            samples=doc["samples"],
+            custom_cfg=_CUSTOM,
+            emit_candidates=True,
+            source_format=doc.get("source_format"),
+        )
+        assert item == {"index": item["index"], "recommendation": expected, "error": None}
+    assert results[1]["recommendation"]["strategy_id"] == "custom_delimiter_split"
+
+
+def test_compile_delimiters_is_cached_and_skips_invalid_patterns():
+    first = compile_delimiters(("---", "("))
+    assert [p.pattern for p in first] == ["---"]
+    assert compile_delimiters(("---", "(")) is first
+
+
+def _slow_len(text, delay):
+    time.sleep(delay)
+    return len(text)
+
+
+def test_run_cpu_inlines_small_inputs_and_offloads_large_ones():
+    settings = Settings(executor=ExecutorSettings(max_workers=1, offload_min_chars=10))
+
+    async def _main():
+        loop_thread = threading.get_ident()
+        small = await executor.run_cpu(threading.get_ident, size=9, settings=settings)
+        large = await executor.run_cpu(threading.get_ident, size=10, settings=settings)
+        return loop_thread, small, large
+
+    loop_thread, small, large = asyncio.run(_main())
+    assert small == loop_thread
+    assert large != loop_thread
+
+
+def test_run_cpu_sheds_load_when_the_queue_is_full():
+    settings = Settings(executor=ExecutorSettings(max_workers=1, offload_min_chars=0, max_concurrency=1, max_queued=1))
+
+    async def _main():
+        running = [
+            asyncio.ensure_future(executor.run_cpu(_slow_len, "abc", 0.2, size=3, settings=settings)) for _ in range(2)
+        ]
+        await asyncio.sleep(0.05)
+        with pytest.raises(executor.ExecutorBusy):
+            await executor.run_cpu(_slow_len, "abc", 0, size=3, settings=settings)
+        return await asyncio.gather(*running)
+
+    assert asyncio.run(_main()) == [3, 3]
+
+
+def test_run_batch_is_gated_like_run_cpu():
+    settings = Settings(executor=ExecutorSettings(max_workers=1, offload_min_chars=0, max_concurrency=1, max_queued=0))
+    documents = [{"samples": ["# 标题\n正文内容。"]}]
+
+    async def _main():
+        async with executor._gate(settings):  # the pool slot is taken and nothing may queue
+            with pytest.raises(executor.ExecutorBusy):
+                await executor.run_batch(documents, size=10, settings=settings)
+        return await executor.run_batch(documents, size=10, settings=settings)
+
+    results = asyncio.run(_main())
+    assert results[0]["index"] == 0 and results[0]["recommendation"]["mode"]
@@ -0,0 +1,100 @@
+"""Tests for content-defined chunk boundaries and incremental re-slicing."""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from slicer_service.chunker import chunk_hash, slice_text
+from slicer_service.dedup import deduplicate
+from slicer_service.incremental import diff_chunks, reslice
+
+_WORDS = "知识库 切分 规则 文档 段落 向量 检索 模型 数据 服务".split()
+
+
+def _document(seed: int = 7, paragraphs: int = 120) -> list[str]:
+    rng = random.Random(seed)
+    return [
+        "".join("".join(rng.choice(_WORDS) for _ in range(rng.randint(3, 15))) + "。" for _ in range(rng.randint(2, 6)))
+        for _ in range(paragraphs)
+    ]
+
+
+@pytest.mark.parametrize("mode", ["semantic_sentence", "hierarchical_heading"])
+def test_content_defined_chunks_respect_target_and_offsets(mode):
+    text = "# 总则\n\n" + "\n\n".join(_document())
+    result = slice_text(text, mode, {"target_length": 300, "content_defined": True})
+
+    assert result["total"] > 5
+    for chunk in result["chunks"]:
+        assert chunk["text"] == text[chunk["start"] : chunk["end"]]
+        assert len(chunk["text"]) <= 300
+        assert chunk["hash"] == chunk_hash(chunk["text"], chunk["section_path"])
+
+
+def test_edit_only_changes_nearby_chunks():
+    paragraphs = _document()
+    old = "\n\n".join(paragraphs)
+    paragraphs[30] = "插入一句新的内容。" + paragraphs[30]
+    del paragraphs[90]
+    new = "\n\n".join(paragraphs)
+
+    result = reslice(new, previous_text=old, mode="semantic_sentence", params={"target_length": 300})
+
+    assert result["params"]["content_defined"] is True
+    assert result["total"] == len(result["hashes"]) == len(result["added"]) + len(result["unchanged"])
+    assert 0 < len(result["added"]) <= 4
+    assert 0 < len(result["removed"]) <= 4
+    for chunk in result["added"]:
+        assert chunk["text"] == new[chunk["start"] : chunk["end"]]
+
+    # Positional packing re-cuts everything after the first edit.
+    def texts(doc):
+        return {c["text"] for c in slice_text(doc, "semantic_sentence", {"target_length": 300})["chunks"]}
+
+    assert len(texts(new) - texts(old)) > 10
+
+
+def test_reslice_against_stored_hashes_and_unchanged_document():
+    text = "\n\n".join(_document(seed=3, paragraphs=40))
+    first = reslice(text, mode="hierarchical_heading", params={"target_length": 200})
+    assert len(first["added"]) == first["total"] and not first["removed"]
+
+    again = reslice(text, previous_hashes=first["hashes"], mode="hierarchical_heading", params={"target_length": 200})
+    assert again["hashes"] == first["hashes"]
+    assert again["unchanged"] == first["hashes"] and not again["added"] and not again["removed"]
+
+    with pytest.raises(ValueError):
+        reslice(text, previous_hashes=[], previous_text=text)
+    with pytest.raises(ValueError):  # a re-recommended plan would not match the stored hashes
+        reslice(text, previous_hashes=first["hashes"])
+
+    # The plan returned by a recommended first call pins the next one.
+    auto = reslice(text)
+    pinned = reslice(text, previous_hashes=auto["hashes"], mode=auto["mode"], params=auto["params"])
+    assert not pinned["added"] and not pinned["removed"]
+
+
+def test_moving_a_chunk_under_another_heading_changes_its_hash():
+    assert chunk_hash("同一段内容。", ["一、总则"]) != chunk_hash("同一段内容。", ["二、细则"])
+
+
+def test_diff_chunks_treats_hashes_as_multiset():
+    chunks = [{"hash": "a"}, {"hash": "a"}, {"hash": "b"}]
+
+    diff = diff_chunks(chunks, ["a", "c", "c"])
+
+    assert diff == {"added": [{"hash": "a"}, {"hash": "b"}], "unchanged": ["a"], "removed": ["c", "c"]}
+
+
+def test_dedup_ids_follow_content_hashes():
+    text = "重复的段落内容在这里出现了一次。\n\n重复的段落内容在这里出现了一次。"
+    result = slice_text(text, "semantic_sentence", {"target_length": 20, "content_defined": True})
+
+    kept, stats = deduplicate(text, result["chunks"], doc_id="doc")
+
+    digest = result["chunks"][0]["hash"]
+    assert [c["id"] for c in kept] == [f"doc#{digest}", f"doc#{digest}~1"]
+    assert kept[1]["duplicate_of"] == f"doc#{digest}"
+    assert stats["duplicates"] == 1
@@ -0,0 +1,75 @@
+"""Tests for the streaming profile accumulator and its quantile sketch."""
+
+from __future__ import annotations
+
+import json
+import random
+
+from slicer_service import recommendation as rec
+from slicer_service.sketch import QuantileSketch
+
+_ALPHABET = ["a", "Z", "7", " ", "\t", "\n", "\n\n", "\n \n", "\r\n", "\r", "\x0c", "\x85", "　",
+             "|", ",", ";", "#", "- ", "1. ", "一、", "def ", "```", "中", "é"]
+
+
+def _random_text(rng, size):
+    return "".join(rng.choice(_ALPHABET) for _ in range(size))
+
+
+def _chunked(text, rng):
+    pos = 0
+    while pos < len(text):
+        step = rng.randint(1, 40)
+        yield text[pos : pos + step]
+        pos += step
+
+
+def test_sketch_is_exact_while_buffered_and_close_after_compression():
+    rng = random.Random(44)
+    small = [rng.randint(0, 900) for _ in range(500)]
+    sketch = QuantileSketch()
+    sketch.extend(small)
+    assert sketch.is_exact
+    for q in (0.0, 0.5, 0.9, 1.0):
+        assert sketch.quantile(q) == rec._quantile(small, q)
+
+    values = [int(rng.lognormvariate(5, 1)) for _ in range(100_000)]
+    left, right = QuantileSketch(), QuantileSketch()
+    left.extend(values[:50_000])
+    right.extend(values[50_000:])
+    left.merge(right)
+    restored = QuantileSketch.from_dict(json.loads(json.dumps(left.to_dict())))
+    assert not restored.is_exact and len(restored.to_dict()["centroids"]) <= 100
+    for q in (0.5, 0.9):
+        exact = rec._quantile(values, q)
+        assert abs(restored.quantile(q) - exact) <= 0.02 * exact
+    assert QuantileSketch().quantile(0.9) == 0.0
+
+
+def test_accumulator_matches_whole_text_scan_for_any_chunking():
+    rng = random.Random(44)
+    for _ in range(200):
+        text = _random_text(rng, rng.randint(0, 300))
+        expected = rec.SignalScanner()
+        expected.feed(text)
+        accumulator = rec.ProfileAccumulator()
+        for chunk in _chunked(text, rng):
+            accumulator.feed(chunk)
+        assert accumulator.signals() == expected.signals(), text
+
+
+def test_profile_stream_bounds_pending_text_and_scanners_merge():
+    accumulator = rec.ProfileAccumulator(max_pending_chars=64)
+    for _ in range(1000):
+        accumulator.feed("one long paragraph line without blank lines\n")
+        assert len(accumulator._pending) <= 64 + 44
+    assert accumulator.signals()["p50_para_len"] > 0
+
+    pages = ["# Title\n\nIntro text.\n", "- a\n- b\n\n| x | y |\n", "def f():\n    return 1;\n"]
+    merged = rec.SignalScanner()
+    for page in pages:
+        scanner = rec.SignalScanner()
+        scanner.feed(page)
+        merged.merge(rec.SignalScanner.from_state(json.loads(json.dumps(scanner.to_state()))))
+    assert merged.signals() == rec.extract_signals_from_samples(pages)
+    assert rec.profile_stream(iter(["# Title\n", "\nIntro text.\n"])) == rec.profile_stream(["# Title\n\nIntro text.\n"])
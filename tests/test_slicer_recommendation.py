@@ -100,3 +100,44 @@ def test_recommendation_for_various_samples(label, samples, expected):
     assert result["strategy_id"] in expected, f"{label} -> {result['strategy_id']} not in {expected}"
     # ensure params returned to avoid regressions
     assert "params" in result and isinstance(result["params"], dict)
+
+
+def _reference_signals(samples):
+    """The original multi-pass extractor, kept verbatim as the equivalence oracle."""
+
+    import re
+
+    lines = [line.strip() for text in samples if text for line in text.splitlines() if line.strip()]
+    total_lines = max(len(lines), 1)
+    heading = re.compile(r"^(#{1,6}\s+|\d+(?:\.\d+)*[\.\)]?\s*|\d+\.\[[^\]]*\]\s*|[一二三四五六七八九十]+、\s*)")
+    listing = re.compile(r"^(?:[-*+•]\s+|\d+\.\s+)")
+    code = re.compile(r"(```|\bclass\b|\bdef\b|\bfunction\b|;\s*$)")
+    paras = [
+        len(part.strip()) for text in samples if text for part in re.split(r"\n\s*\n", text) if part.strip()
+    ]
+    return {
+        "heading_ratio": sum(1 for line in lines if heading.match(line)) / total_lines,
+        "list_ratio": sum(1 for line in lines if listing.match(line)) / total_lines,
+        "table_ratio": sum(1 for line in lines if line.count("|") >= 2 or line.count(",") >= 3) / total_lines,
+        "code_ratio": sum(1 for line in lines if code.search(line)) / total_lines,
+        "p90_para_len": int(rec._quantile(paras, 0.9)) if paras else 0,
+        "p50_para_len": int(rec._quantile(paras, 0.5)) if paras else 0,
+        "digit_symbol_ratio": sum(1 for ch in "".join(lines) if not ch.isalpha()) / max(len("".join(lines)), 1),
+    }
+
+
+def test_single_pass_extractor_matches_reference():
+    import random
+
+    alphabet = ["a", "Z", "7", " ", "\t", "\n", "\n\n", "\r\n", "\r", "\x0c", " ", "\x85", "　",
+                "|", ",", ";", "#", "- ", "1. ", "一、", "def ", "class", "```", "中", "²", "é", "function"]
+    rng = random.Random(39)
+    corpus = [
+        ["# Title\n\n  1.2 Section  \n\n\n- item\n* item2\n\n| a | b |\n\n  \n"],
+        ["", "x", "\n\n\n", "  lead\n \t\ntrail  "],
+        ["a\r\n\r\nb;\r\n", "def f():\n    return 1;\n"],
+    ]
+    corpus += [["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 200))) for _ in range(3)] for _ in range(300)]
+
+    for samples in corpus:
+        assert rec.extract_signals_from_samples(samples) == _reference_signals(samples), samples
@@ -0,0 +1,58 @@
+"""Tests for the offset-span chunk representation."""
+
+from __future__ import annotations
+
+import pytest
+
+from slicer_service.chunker import build_span_table, iter_chunks, slice_text
+from slicer_service.spans import NO_PARENT, SpanTable, TextBuffer
+
+_DOC = "intro line.\n# A\nalpha text. more alpha.\n## A.1\nnested body.\n# B\nbeta body."
+
+
+def test_span_table_stores_offsets_and_materialises_text_on_demand():
+    buffer, bounds = TextBuffer.from_samples(["first", "second"], separator="\n")
+    assert bounds == [(0, 5), (6, 12)]
+    table = SpanTable(buffer)
+    root = table.append(0, 12, level=0)
+    child = table.append(*bounds[1], level=1, parent=root)
+
+    assert len(table) == 2
+    assert table[child].text == "second" and table[-1].index == child
+    assert [span.index for span in table.children(root)] == [child]
+    assert table.ancestors(child) == [root]
+    assert [span.index for span in table.leaves()] == [child]
+    assert table.to_columns() == {"starts": [0, 6], "ends": [12, 12], "levels": [0, 1], "parents": [NO_PARENT, 0]}
+    with pytest.raises(IndexError):
+        table[2]
+
+
+def test_hierarchical_table_nests_sections_without_copying_text():
+    table = build_span_table(_DOC, "hierarchical_heading", {"target_length": 400})
+    sections = [span for span in table if span.index not in {leaf.index for leaf in table.leaves()}]
+
+    assert [(s.text.split("\n")[0], s.level, s.parent) for s in sections] == [
+        ("# A", 0, NO_PARENT),
+        ("## A.1", 1, sections[0].index),
+        ("# B", 0, NO_PARENT),
+    ]
+    # A section covers its subsections.
+    assert sections[0].end == sections[1].end
+    leaves = list(table.leaves())
+    assert [(leaf.text, leaf.start, leaf.end) for leaf in leaves] == [
+        (chunk.text, chunk.start, chunk.end) for chunk in iter_chunks(_DOC, "hierarchical_heading", {"target_length": 400})
+    ]
+    assert leaves[0].parent == NO_PARENT and leaves[2].parent == sections[1].index
+
+
+def test_slice_text_matches_iter_chunks_and_can_omit_text():
+    chunks = [c.to_dict() for c in iter_chunks(_DOC, "hierarchical_heading", {"target_length": 15})]
+    result = slice_text(_DOC, "hierarchical_heading", {"target_length": 15})
+    assert result["chunks"] == chunks
+    assert result["chunks"][-1]["section_path"] == ["B"]
+
+    offsets = slice_text(_DOC, "semantic_sentence", {"target_length": 15}, include_text=False)
+    assert all("text" not in chunk for chunk in offsets["chunks"])
+    assert [_DOC[c["start"] : c["end"]] for c in offsets["chunks"]] == [
+        c.text for c in iter_chunks(_DOC, "semantic_sentence", {"target_length": 15})
+    ]
@@ -0,0 +1,107 @@
+"""Tests for the streaming table_batch chunker."""
+
+from __future__ import annotations
+
+import io
+import tracemalloc
+
+import pytest
+
+from slicer_service.tables import iter_table_batches, slice_table
+
+
+def _csv(rows):
+    return io.BytesIO("\n".join(",".join(row) for row in rows).encode("utf-8"))
+
+
+def test_csv_batches_repeat_the_header_and_respect_the_budget():
+    rows = [["name", "qty", "note"]] + [[f"item{i}", str(i), "a|b"] for i in range(1, 21)]
+    batches = list(slice_table(_csv(rows), "csv", {"target_length": 120}))
+
+    header = "| name | qty | note |\n| --- | --- | --- |"
+    assert len(batches) > 1
+    assert [b.index for b in batches] == list(range(len(batches)))
+    for batch in batches:
+        assert batch.text.startswith(header + "\n")
+        assert len(batch.text) <= 120
+    assert "| item1 | 1 | a\\|b |" in batches[0].text
+    assert batches[0].row_start == 2 and batches[-1].row_end == 21
+    assert all(a.row_end + 1 == b.row_start for a, b in zip(batches, batches[1:]))
+
+
+def test_max_rows_blank_rows_oversized_rows_and_tsv():
+    data = "h1\th2\n\n1\t2\n\t\n3\n" + "x" * 50 + "\ty\n"
+    batches = list(slice_table(io.BytesIO(data.encode()), "tsv", {"target_length": 50, "max_rows": 2}))
+
+    assert [b.text.splitlines()[2:] for b in batches] == [["| 1 | 2 |", "| 3 |  |"], ["| " + "x" * 50 + " | y |"]]
+    assert [(b.row_start, b.row_end) for b in batches] == [(3, 5), (6, 6)]
+    with pytest.raises(ValueError):
+        slice_table(io.BytesIO(b""), "docx")
+
+
+def test_rows_wider_than_the_header_are_merged_into_the_last_column():
+    batches = list(slice_table(_csv([["a", "b"], ["1", "2", "3", "", "4"]]), "csv", {}))
+    assert batches[0].text == "| a | b |\n| --- | --- |\n| 1 | 2 3 4 |"
+
+
+def test_batches_respect_a_token_budget():
+    from slicer_service.tokens import get_token_counter
+
+    rows = [["名称", "说明"]] + [[f"项目{i}", "这是一段较长的中文说明文字"] for i in range(30)]
+    batches = list(slice_table(_csv(rows), "csv", {"target_tokens": 80, "target_length": 10_000}))
+
+    count = get_token_counter().count
+    assert len(batches) > 3
+    assert all(count(batch.text) <= 80 for batch in batches)
+
+
+def test_xls_is_read_with_xlrd_or_rejected_clearly():
+    # Garbage bytes fail as ValueError whether or not the optional xlrd reader is installed.
+    with pytest.raises(ValueError):
+        slice_table(io.BytesIO(b"not a BIFF file"), "xls")
+
+
+def test_xlsx_batches_per_sheet(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook(write_only=True)
+    for title in ("first", "second"):
+        sheet = workbook.create_sheet(title)
+        sheet.append(["id", "value"])
+        for i in range(5):
+            sheet.append([i, 1.0 * i if title == "first" else None])
+    path = tmp_path / "book.xlsx"
+    workbook.save(path)
+
+    with path.open("rb") as stream:
+        batches = list(slice_table(stream, "xlsx", {"max_rows": 3}))
+        only_second = list(slice_table(stream, "xlsx", sheets=["second"]))
+
+    assert [(b.sheet, b.row_start, b.row_end) for b in batches] == [
+        ("first", 2, 4),
+        ("first", 5, 6),
+        ("second", 2, 4),
+        ("second", 5, 6),
+    ]
+    assert batches[0].text == "| id | value |\n| --- | --- |\n| 0 | 0 |\n| 1 | 1 |\n| 2 | 2 |"
+    assert batches[2].text.endswith("| 0 |  |\n| 1 |  |\n| 2 |  |")
+    assert {b.sheet for b in only_second} == {"second"}
+    with pytest.raises(ValueError):
+        slice_table(io.BytesIO(b"not a zip"), "xlsx")
+
+
+def test_batching_memory_does_not_grow_with_row_count():
+    def _rows(count):
+        yield "", 1, ["id", "payload"]
+        for i in range(count):
+            yield "", i + 2, [i, "p" * 40]
+
+    def _peak(count):
+        tracemalloc.start()
+        try:
+            for _ in iter_table_batches(_rows(count), {"target_length": 2000}):
+                pass
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    assert _peak(50_000) < 2 * _peak(1_000) + 64 * 1024
@@ -0,0 +1,81 @@
+"""Tests for the offline token estimator and token-budget chunk packing."""
+
+from __future__ import annotations
+
+import base64
+
+import pytest
+
+from slicer_service.chunker import slice_text
+from slicer_service.config import Settings, TokenSettings
+from slicer_service.recommendation import estimate_params
+from slicer_service.tokens import BPETokenCounter, TokenEstimator, count_tokens, get_token_counter
+
+
+def test_estimator_counts_by_script():
+    estimator = TokenEstimator()
+
+    assert estimator.count("") == 0
+    assert estimator.count("abcdefgh") == 2
+    assert estimator.count("知识库切分") == 5
+    assert estimator.count("知识库 rag") == 4  # 3 CJK + 4 ASCII chars
+    assert estimator.count("Привет") == 3  # 2-byte chars at 0.5
+    assert estimator.count("ok😀") == 2  # a 4-byte char counts as one CJK char, not two
+
+
+def _vocab_file(tmp_path, tokens):
+    path = tmp_path / "vocab.tiktoken"
+    lines = [f"{base64.b64encode(bytes([b])).decode()} {b}" for b in range(256)]
+    lines += [f"{base64.b64encode(token).decode()} {256 + rank}" for rank, token in enumerate(tokens)]
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+def test_bpe_counter_merges_by_rank_and_memoises(tmp_path):
+    counter = BPETokenCounter.from_file(_vocab_file(tmp_path, [b"lo", b"low", b" lo", b" low", b"er"]))
+
+    assert counter.count("low") == 1
+    assert counter.count("lower") == 2  # "low" + "er"
+    assert counter.count("low lower") == 3  # "low", " low", "er"
+    assert counter.count("知") == 3  # unknown bytes stay single-byte tokens
+    assert counter._piece_tokens.cache_info().hits >= 1
+
+    empty = tmp_path / "empty.tiktoken"
+    empty.write_text("")
+    with pytest.raises(ValueError):
+        BPETokenCounter.from_file(empty)
+
+
+def test_configured_counter(tmp_path):
+    assert isinstance(get_token_counter(Settings()), TokenEstimator)
+    settings = Settings(tokens=TokenSettings(vocab_path=str(_vocab_file(tmp_path, [b"ab"]))))
+    assert isinstance(get_token_counter(settings), BPETokenCounter)
+    assert count_tokens("abab", settings) == 2
+
+
+@pytest.mark.parametrize("content_defined", [False, True])
+def test_chunks_are_packed_to_a_token_budget(content_defined):
+    estimator = TokenEstimator()
+    text = "\n".join(
+        ["知识库切分规则需要兼顾语义完整与向量模型的长度上限。" * 2, "Chunks must fit the embedding model's token limit."] * 40
+    )
+    params = {"target_tokens": 64, "overlap_ratio": 0.2, "content_defined": content_defined}
+
+    chunks = slice_text(text, "semantic_sentence", params)["chunks"]
+
+    assert len(chunks) > 5
+    assert all(estimator.count(chunk["text"]) <= 64 for chunk in chunks)
+    assert max(len(chunk["text"]) for chunk in chunks) > 64  # English packs more characters per token
+
+
+def test_oversized_sentence_is_windowed_at_its_token_density():
+    text = "知" * 300
+    chunks = slice_text(text, "semantic_sentence", {"target_tokens": 100})["chunks"]
+    assert [len(chunk["text"]) for chunk in chunks] == [100, 100, 100]
+
+
+def test_estimate_params_passes_token_budget():
+    profile = {"p50_para_len": 120}
+    assert "target_tokens" not in estimate_params(profile, "hierarchical_heading", {})
+    params = estimate_params(profile, "hierarchical_heading", {"target_tokens": 512})
+    assert params["target_tokens"] == 512 and params["target_length"] == 150